@@ -0,0 +1,52 @@
+"""
+Gunicorn configuration
+
+SERVER_MODE selects how requests are served:
+    sync    - threaded workers (default): WEB_WORKERS x WEB_THREADS requests
+              in flight per instance
+    gevent  - cooperative workers for I/O-bound traffic: blocking socket calls
+              (chatbot providers, FCM, SMTP, CAS validation, PostgreSQL) yield
+              to other requests, so one worker keeps up to
+              GEVENT_WORKER_CONNECTIONS requests in flight
+
+Usage:
+    gunicorn -c gunicorn.conf.py run:application
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('WEB_WORKERS', 4))
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+accesslog = '-'
+errorlog = '-'
+
+server_mode = os.environ.get('SERVER_MODE', 'sync').lower()
+
+if server_mode == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('GEVENT_WORKER_CONNECTIONS', 1000))
+    # Pools sized for the sync mode would serialize hundreds of concurrent
+    # requests; raise the defaults unless they are configured explicitly
+    os.environ.setdefault('CHATBOT_HTTP_POOL_SIZE', '100')
+    os.environ.setdefault('CHATBOT_ROUTING_MAX_WORKERS', '200')
+    os.environ.setdefault('MAIL_POOL_SIZE', '10')
+    os.environ.setdefault('NOTIFICATION_STREAM_MAX_PER_WORKER', '500')
+elif server_mode == 'sync':
+    worker_class = 'gthread'
+    threads = int(os.environ.get('WEB_THREADS', 2))
+    # A notification stream holds one of these few threads for minutes: give
+    # streams at most half of them so ordinary requests keep the rest
+    os.environ.setdefault('NOTIFICATION_STREAM_MAX_PER_WORKER', str(threads // 2))
+else:
+    raise ValueError(f"Unknown SERVER_MODE '{server_mode}' (expected 'sync' or 'gevent')")
+
+
+def post_fork(server, worker):
+    """Make psycopg2 cooperative under gevent (it talks to libpq, not Python sockets)"""
+    if server_mode != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        server.log.warning('psycogreen not installed: PostgreSQL queries will block the gevent worker')
@@ -5,6 +5,8 @@ Run this script to initialize the database with sample data
 import os
 import sys
 
+from sqlalchemy import inspect, text
+
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
@@ -17,8 +19,36 @@ def init_database(app):
         # Use the db instance that was initialized with the app
         db = app.extensions['sqlalchemy']
         db.create_all()
+        # create_all() skips existing tables, so add columns and indexes introduced later
+        add_missing_columns(db)
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+        # Chat sessions may now be anonymous
+        if db.engine.dialect.name == 'postgresql':
+            with db.engine.begin() as connection:
+                connection.execute(text("ALTER TABLE chat_sessions ALTER COLUMN user_id DROP NOT NULL"))
     print("Database tables created successfully!")
 
+def add_missing_columns(db):
+    """Add nullable columns that exist on the models but not yet in the database"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                print(f"⚠️  Column {table.name}.{column.name} is NOT NULL, add it manually")
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"   Added column {table.name}.{column.name}")
+
 def seed_database(app):
     """Seed database with sample data"""
     with app.app_context():
@@ -752,6 +782,15 @@ def seed_database(app):
         db.session.commit()
         print("Database seeded successfully!")
 
+def setup_job_search(app):
+    """Install full-text search for jobs and backfill existing postings"""
+    with app.app_context():
+        from src.job_search import JobSearch
+        job_search = app.extensions.get('job_search') or JobSearch(app)
+        print("Installing job full-text search...")
+        dialect = job_search.install(backfill=True)
+    print(f"Job full-text search installed and backfilled ({dialect})!")
+
 def reset_database(app):
     """Reset database (drop and recreate)"""
     print("Dropping all tables...")
@@ -780,15 +819,20 @@ if __name__ == '__main__':
         with app.app_context():
             if command == 'init':
                 init_database(app)
+                setup_job_search(app)
             elif command == 'seed':
                 seed_database(app)
             elif command == 'reset':
                 reset_database(app)
+                setup_job_search(app)
                 seed_database(app)
+            elif command == 'fts':
+                setup_job_search(app)
             else:
-                print("Available commands: init, seed, reset")
+                print("Available commands: init, seed, reset, fts")
     else:
-        print("Usage: python migrate.py [init|seed|reset]")
+        print("Usage: python migrate.py [init|seed|reset|fts]")
         print("  init  - Create database tables")
         print("  seed  - Add sample data")
-        print("  reset - Drop and recreate tables with sample data")
\ No newline at end of file
+        print("  reset - Drop and recreate tables with sample data")
+        print("  fts   - Install job full-text search and backfill existing jobs")
\ No newline at end of file
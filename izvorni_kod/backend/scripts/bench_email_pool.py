@@ -0,0 +1,103 @@
+"""
+Benchmark: pooled SMTP connections vs. one connection per message
+
+Runs a local SMTP server (aiosmtpd) and sends the same messages three ways:
+    per-message   Flask-Mail mail.send(): TCP + EHLO + AUTH for every message
+    pooled        EmailService.send_email(): reuses a pooled connection
+    bulk          EmailService.send_bulk(): all messages on one connection
+
+A real provider adds network round trips and a TLS handshake per connection;
+--login-delay-ms adds that cost to each AUTH so the difference is visible
+locally (e.g. 80 for Gmail from Europe).
+
+Usage:
+    pip install aiosmtpd
+    python scripts/bench_email_pool.py [--messages 200] [--login-delay-ms 0]
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, BACKEND_DIR)
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask_mail import Message  # noqa: E402
+
+from src.email_service import EmailService  # noqa: E402
+
+
+class Sink:
+    def __init__(self, login_delay):
+        self.login_delay = login_delay
+        self.logins = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        return '250 OK'
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        if self.login_delay:
+            time.sleep(self.login_delay)
+        return AuthResult(success=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--login-delay-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    sink = Sink(args.login_delay_ms / 1000)
+    controller = Controller(sink, hostname='127.0.0.1', port=free_port(),
+                            authenticator=sink.authenticate, auth_require_tls=False)
+    controller.start()
+
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port,
+        MAIL_USE_TLS=False, MAIL_USE_SSL=False,
+        MAIL_USERNAME='bench@example.com', MAIL_PASSWORD='secret',
+        MAIL_DEFAULT_SENDER='bench@example.com'
+    )
+    service = EmailService(app)
+    items = [{'to': f'user{i}@example.com', 'subject': f'Subject {i}', 'body': 'Body ' * 50}
+             for i in range(args.messages)]
+
+    def per_message():
+        for item in items:
+            service.mail.send(Message(subject=item['subject'], recipients=[item['to']], body=item['body']))
+
+    def pooled():
+        for item in items:
+            service.send_email(item['to'], item['subject'], item['body'])
+
+    def bulk():
+        service.send_bulk(items)
+
+    print(f"{args.messages} messages, login delay {args.login_delay_ms:g} ms")
+    with app.app_context():
+        for name, run in (('per-message', per_message), ('pooled', pooled), ('bulk', bulk)):
+            service.pool.close_all()
+            logins = sink.logins
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            print(f"  {name:12} {elapsed * 1000:8.1f} ms  {args.messages / elapsed:8.1f} msg/s  "
+                  f"{sink.logins - logins} connections")
+    controller.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: pooled keep-alive HTTP session vs. a new session per call
+
+Starts a local HTTPS server with a throwaway self-signed certificate and sends
+the same chatbot request through SmotraUnizgChatbot two ways:
+    per-call   a fresh requests.Session for every message (TCP + TLS handshake
+               and a new SSL context, which loads the system CA store, each time)
+    pooled     one create_http_session() shared by all messages (keep-alive)
+
+--rtt-ms delays each accepted connection to approximate the extra round trips
+a remote provider costs on every new connection.
+
+Usage:
+    python scripts/bench_http_session.py [--requests 200] [--rtt-ms 0]
+"""
+import argparse
+import datetime
+import json
+import os
+import socket
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests  # noqa: E402
+import urllib3  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+from src.chatbot_service import SmotraUnizgChatbot, create_http_session  # noqa: E402
+
+
+def self_signed_certificate(directory):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    with open(cert_path, 'wb') as out:
+        out.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as out:
+        out.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class ChatbotHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # Headers and body are separate writes; avoid the 40 ms Nagle/delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({'reply': 'Upisi traju do 15. srpnja.'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TLSServer(ThreadingHTTPServer):
+    daemon_threads = True
+    tls_context = None
+    rtt = 0.0
+    connections = 0
+
+    def get_request(self):
+        sock, address = self.socket.accept()
+        # Before the handshake, or its small writes stall on Nagle/delayed ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections += 1
+        if self.rtt:
+            # TCP + TLS 1.3 handshake: about two round trips per new connection
+            time.sleep(2 * self.rtt)
+        return self.tls_context.wrap_socket(sock, server_side=True), address
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rtt-ms', type=float, default=0)
+    args = parser.parse_args()
+    urllib3.disable_warnings()
+
+    cert_path, key_path = self_signed_certificate(tempfile.mkdtemp())
+    server = TLSServer(('127.0.0.1', 0), ChatbotHandler)
+    server.rtt = args.rtt_ms / 1000
+    server.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server.tls_context.load_cert_chain(cert_path, key_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'https://127.0.0.1:{server.server_address[1]}'
+
+    def session(http):
+        # Self-signed certificate; ignore REQUESTS_CA_BUNDLE and proxies from the environment
+        http.verify = False
+        http.trust_env = False
+        return http
+
+    def per_call():
+        for _ in range(args.requests):
+            provider = SmotraUnizgChatbot('key', base_url, http_session=session(requests.Session()))
+            result = provider.send_message('Kada su upisi?')
+            assert result['success'], result
+            provider.http.close()
+
+    def pooled():
+        provider = SmotraUnizgChatbot('key', base_url, http_session=session(create_http_session()))
+        for _ in range(args.requests):
+            result = provider.send_message('Kada su upisi?')
+            assert result['success'], result
+
+    print(f"{args.requests} requests over HTTPS, simulated RTT {args.rtt_ms:g} ms")
+    for name, run in (('per-call', per_call), ('pooled', pooled)):
+        connections = server.connections
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f"  {name:9} {elapsed * 1000:8.1f} ms  {elapsed * 1000 / args.requests:6.2f} ms/request  "
+              f"{server.connections - connections} connections")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: password logins per second, and what hashing does to other requests
+
+Verifies --logins passwords from --concurrency concurrent clients while a
+ticker that wakes every 5 ms stands in for the cheap requests sharing the
+worker; its worst delay shows how long they were stalled. Setups:
+    inline     check_password_hash on the request thread (before PasswordHasher)
+    stdlib     concurrent.futures.ThreadPoolExecutor
+    hasher     PasswordHasher.verify(), as used by /api/auth/login
+
+With --gevent the process is monkey-patched like a SERVER_MODE=gevent worker:
+the patched stdlib executor then runs hashes as greenlets on the event loop,
+while PasswordHasher switches to gevent's executor of real OS threads.
+
+Usage:
+    python scripts/bench_password_hashing.py [--gevent] [--logins 40]
+                                             [--concurrency 8] [--method scrypt:32768:8:1]
+"""
+import sys
+
+if '--gevent' in sys.argv:
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask  # noqa: E402
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+
+from src.password_hashing import PasswordHasher  # noqa: E402
+
+
+def run(verify, password_hash, logins, concurrency):
+    """Returns (logins/s, worst ticker delay in ms)"""
+    stop = threading.Event()
+    worst = [0.0]
+
+    def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            time.sleep(0.005)
+            worst[0] = max(worst[0], time.perf_counter() - started - 0.005)
+
+    remaining = iter(range(logins))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            assert verify(password_hash, 'secret1')
+
+    tick = threading.Thread(target=ticker)
+    tick.start()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    tick.join()
+    return logins / elapsed, worst[0] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gevent', action='store_true')
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--method', default='scrypt:32768:8:1')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.update(
+        PASSWORD_HASH_METHOD=args.method,
+        PASSWORD_HASH_WORKERS=args.workers,
+        # Measure throughput, not backpressure
+        PASSWORD_HASH_QUEUE_SIZE=args.concurrency,
+        PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS=60
+    )
+    hasher = PasswordHasher(app)
+    password_hash = generate_password_hash('secret1', method=args.method)
+    stdlib = ThreadPoolExecutor(max_workers=args.workers)
+
+    setups = {
+        'inline': check_password_hash,
+        'stdlib': lambda stored, password: stdlib.submit(check_password_hash, stored, password).result(),
+        'hasher': hasher.verify,
+    }
+    print(f"{args.method}, {args.logins} logins, {args.concurrency} concurrent clients, "
+          f"{args.workers} hashing workers, {os.cpu_count()} core(s), "
+          f"{'gevent' if args.gevent else 'threads'}")
+    for name, verify in setups.items():
+        rate, stall = run(verify, password_hash, args.logins, args.concurrency)
+        print(f'  {name:7} {rate:6.1f} logins/s  other requests stalled up to {stall:6.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Load test: SERVER_MODE=sync vs. SERVER_MODE=gevent for I/O-bound endpoints
+
+Starts a stand-in chatbot upstream that answers after --delay seconds, then
+for each mode runs gunicorn (gunicorn.conf.py, --workers workers, SQLite) with
+the Smotra provider pointed at it and sends --requests POST /api/chatbot/send
+calls from --concurrency concurrent clients. Reports throughput, latency
+percentiles and the peak number of upstream calls in flight.
+
+Usage:
+    pip install gevent gunicorn
+    python scripts/loadtest_gevent.py [--modes sync,gevent] [--requests 600]
+                                      [--concurrency 300] [--delay 1.0] [--workers 1]
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import socket  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+import requests  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_upstream(port, delay):
+    """Stand-in provider: sleeps `delay` per call and tracks peak concurrency (GET /peak resets it)"""
+    state = {'now': 0, 'max': 0}
+
+    def app(environ, start_response):
+        if environ['PATH_INFO'] == '/peak':
+            peak, state['max'] = state['max'], state['now']
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [str(peak).encode()]
+        state['now'] += 1
+        state['max'] = max(state['max'], state['now'])
+        try:
+            gevent.sleep(delay)
+        finally:
+            state['now'] -= 1
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [json.dumps({'message': 'ok'}).encode()]
+
+    WSGIServer(('127.0.0.1', port), app, log=None).serve_forever()
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up')
+
+
+def drive(base_url, total, concurrency):
+    http = requests.Session()
+    http.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    latencies, errors = [], [0]
+
+    def one(i):
+        started = time.monotonic()
+        try:
+            response = http.post(f'{base_url}/api/chatbot/send',
+                                 json={'message': f'question {i}', 'provider': 'smotra'}, timeout=120)
+            if response.status_code != 200:
+                errors[0] += 1
+        except requests.RequestException:
+            errors[0] += 1
+        latencies.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    Pool(concurrency).map(one, range(total))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'errors': errors[0]
+    }
+
+
+def run_mode(mode, args, upstream_url):
+    port = free_port()
+    db_dir = tempfile.mkdtemp(prefix=f'loadtest-{mode}-')
+    env = dict(
+        os.environ,
+        SERVER_MODE=mode,
+        WEB_WORKERS=str(args.workers),
+        PORT=str(port),
+        FLASK_ENV='development',
+        DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'app.db')}",
+        SMOTRA_CHATBOT_API_KEY='loadtest',
+        SMOTRA_BASE_URL=upstream_url,
+        CHATBOT_CACHE_PROVIDERS='none',
+        RATE_LIMIT_ENABLED='false'
+    )
+    log_path = os.path.join(db_dir, 'gunicorn.log')
+    with open(log_path, 'w') as log:
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:application'],
+                                  cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base_url + '/')
+        drive(base_url, min(50, args.requests), min(10, args.concurrency))  # warm up
+        requests.get(f'{upstream_url}/peak')
+        result = drive(base_url, args.requests, args.concurrency)
+        result['upstream_peak'] = int(requests.get(f'{upstream_url}/peak').text)
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+        print(f'  ({mode} server log: {log_path})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='sync,gevent')
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=300)
+    parser.add_argument('--delay', type=float, default=1.0, help='upstream response time in seconds')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--upstream-port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.upstream_port:
+        run_upstream(args.upstream_port, args.delay)
+        return
+
+    upstream_port = free_port()
+    upstream = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                 '--upstream-port', str(upstream_port), '--delay', str(args.delay)])
+    upstream_url = f'http://127.0.0.1:{upstream_port}'
+    try:
+        wait_until_up(f'{upstream_url}/peak')
+        print(f'{args.requests} requests, {args.concurrency} concurrent clients, '
+              f'{args.workers} worker(s), upstream delay {args.delay:g} s')
+        for mode in args.modes.split(','):
+            result = run_mode(mode, args, upstream_url)
+            print(f"  {mode:7} {result['rps']:7.1f} req/s  p50 {result['p50_ms']:7.0f} ms  "
+                  f"p95 {result['p95_ms']:7.0f} ms  upstream in flight {result['upstream_peak']:4d}  "
+                  f"errors {result['errors']}")
+    finally:
+        upstream.terminate()
+        upstream.wait()
+
+
+if __name__ == '__main__':
+    main()
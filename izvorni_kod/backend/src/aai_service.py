@@ -30,6 +30,11 @@ except ImportError:
     print("Warning: python-cas not installed. CAS authentication will not be available.")
     CASClient = None
 
+try:
+    from .saml_settings import SAMLSettingsCache
+except ImportError:
+    from saml_settings import SAMLSettingsCache  # type: ignore
+
 
 class AAIService:
     """AAI@EduHr Authentication Service supporting SAML 2.0, OIDC, and CAS"""
@@ -37,6 +42,7 @@ class AAIService:
     def __init__(self, app=None):
         self.app = None
         self.saml_auth = None
+        self.saml_cache = None
         self.cas_client = None
         self.protocol = 'SAML'  # Default protocol: SAML, OIDC, or CAS
         if app:
@@ -127,8 +133,9 @@ class AAIService:
                 }
             }
             
-            # Initialize SAML auth (will be used in request context)
+            # Parse settings/certificates once; auth instances per request reuse them
             self.saml_settings = saml_settings
+            self.saml_cache = SAMLSettingsCache(self.app, saml_settings, self.aai_entity_id)
         except Exception as e:
             print(f"Warning: Failed to initialize SAML: {str(e)}")
             self.saml_settings = None
@@ -203,7 +210,7 @@ class AAIService:
             req = self._prepare_saml_request()
             
             # Create SAML auth instance
-            auth = OneLogin_Saml2_Auth(req, self.saml_settings)
+            auth = self._saml_auth(req)
             
             # Generate login URL with SAML AuthnRequest
             login_url = auth.login(return_to=redirect_after_login)
@@ -273,6 +280,13 @@ class AAIService:
         
         return login_url
     
+    def _saml_auth(self, req):
+        """SAML auth instance for this request using the cached parsed settings"""
+        settings = self.saml_cache.settings() if self.saml_cache else None
+        if settings is None:
+            raise ValueError('SAML settings are invalid; check SP_* and IDP_* configuration')
+        return OneLogin_Saml2_Auth(req, old_settings=settings)
+    
     def _prepare_saml_request(self):
         """Prepare request dictionary for SAML authentication"""
         return {
@@ -317,7 +331,7 @@ class AAIService:
             req = self._prepare_saml_request()
             
             # Create SAML auth instance
-            auth = OneLogin_Saml2_Auth(req, self.saml_settings)
+            auth = self._saml_auth(req)
             
             # Process SAML Response
             auth.process_response()
@@ -525,7 +539,7 @@ class AAIService:
         
         try:
             req = self._prepare_saml_request()
-            auth = OneLogin_Saml2_Auth(req, self.saml_settings)
+            auth = self._saml_auth(req)
             
             logout_url = auth.logout(
                 name_id=name_id,
@@ -15,6 +15,18 @@ try:
     from .aai_service import AAIService
     from .chatbot_service import ChatbotService
     from .email_service import EmailService
+    from .search_index import SearchIndex
+    from .job_search import JobSearch
+    from .query_stats import QueryStats
+    from .outbox import Outbox
+    from .chat_store import ChatStore
+    from .token_revocation import TokenRevocationList
+    from .refresh_tokens import RefreshTokenStore
+    from .password_hashing import PasswordHasher
+    from .rate_limit import RateLimiter
+    from .push_topics import PushTopics
+    from .notification_counters import NotificationCounters
+    from .notification_stream import NotificationBroker
     from .database import init_db, create_tables  # Import database setup
 except (ImportError, ValueError):
     # Fallback to absolute imports if src is in Python path
@@ -24,6 +36,18 @@ except (ImportError, ValueError):
     from aai_service import AAIService  # type: ignore
     from chatbot_service import ChatbotService  # type: ignore
     from email_service import EmailService  # type: ignore
+    from search_index import SearchIndex  # type: ignore
+    from job_search import JobSearch  # type: ignore
+    from query_stats import QueryStats  # type: ignore
+    from outbox import Outbox  # type: ignore
+    from chat_store import ChatStore  # type: ignore
+    from token_revocation import TokenRevocationList  # type: ignore
+    from refresh_tokens import RefreshTokenStore  # type: ignore
+    from password_hashing import PasswordHasher  # type: ignore
+    from rate_limit import RateLimiter  # type: ignore
+    from push_topics import PushTopics  # type: ignore
+    from notification_counters import NotificationCounters  # type: ignore
+    from notification_stream import NotificationBroker  # type: ignore
     from database import init_db, create_tables  # type: ignore  # Import database setup
 
 def create_app(config_name=None):
@@ -39,6 +63,7 @@ def create_app(config_name=None):
     
     # Initialize database
     init_db(app)
+    QueryStats(app)
     
     # Import models and blueprints within app context
     # This ensures SQLAlchemy is properly bound to this Flask app instance
@@ -91,26 +116,37 @@ def create_app(config_name=None):
         CORS(app, resources={r"/api/*": {"origins": cors_origins, "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}})
     
     # Initialize services
-    oauth_service = OAuth2Service(app)
+    token_revocation = TokenRevocationList(app)
+    refresh_tokens = RefreshTokenStore(app)
+    oauth_service = OAuth2Service(app, token_revocation, refresh_tokens)
+    password_hasher = PasswordHasher(app)
+    rate_limiter = RateLimiter(app)
     firebase_service = FirebaseService(app)
     aai_service = AAIService(app)
     chatbot_service = ChatbotService(app)
     email_service = EmailService(app)
+    search_index = SearchIndex(app)
+    job_search = JobSearch(app)
+    push_topics = PushTopics(app, firebase_service)
+    notification_counters = NotificationCounters(app)
+    notification_stream = NotificationBroker(app)
+    outbox = Outbox(app, email_service, firebase_service, push_topics)
+    chat_store = ChatStore(app)
     
     # Initialize and register blueprints with services (within app context for proper SQLAlchemy binding)
     with app.app_context():
         # Initialize blueprints with services
-        init_auth_routes(oauth_service, firebase_service, aai_service)
+        init_auth_routes(oauth_service, firebase_service, aai_service, password_hasher, rate_limiter, push_topics)
         init_oauth_routes(oauth_service, firebase_service)
-        init_notification_routes(oauth_service, firebase_service)
+        init_notification_routes(oauth_service, firebase_service, push_topics, notification_counters, notification_stream)
         init_aai_routes(oauth_service, firebase_service, aai_service)
-        init_chatbot_routes(oauth_service, firebase_service, chatbot_service)
-        init_associations_routes(oauth_service)
-        init_jobs_routes(oauth_service, email_service, firebase_service)
-        init_admin_routes(oauth_service)
+        init_chatbot_routes(oauth_service, firebase_service, chatbot_service, chat_store)
+        init_associations_routes(oauth_service, search_index)
+        init_jobs_routes(oauth_service, email_service, firebase_service, job_search, outbox)
+        init_admin_routes(oauth_service, search_index)
         init_erasmus_routes(oauth_service)
-        init_favorites_routes(oauth_service)
-        init_inquiries_routes(oauth_service, email_service)
+        init_favorites_routes(oauth_service, push_topics)
+        init_inquiries_routes(oauth_service, email_service, outbox)
         
         # Register blueprints
         app.register_blueprint(auth_bp)
@@ -147,6 +183,13 @@ def create_app(config_name=None):
             }
         })
     
+    # Public keys for verifying access tokens (empty with HS256)
+    @app.route("/.well-known/jwks.json")
+    def jwks():
+        response = jsonify(oauth_service.keys.jwks())
+        response.headers['Cache-Control'] = f"public, max-age={app.config.get('JWT_JWKS_CACHE_SECONDS', 300)}"
+        return response
+    
     # Health check endpoint
     @app.route("/health")
     def health():
@@ -177,8 +177,8 @@ def init_aai_routes(oauth_service, firebase_service, aai_service):
                     user_email = new_user.email
                     user_role = new_user.role
             
-            # Generate JWT token
-            token = oauth_service.generate_token(user_id, user_email, user_role)
+            # Generate access + refresh tokens
+            tokens = oauth_service.generate_token_pair(user_id, user_email, user_role)
             
             # Store SAML NameID and SessionIndex in session for Single Logout (if available)
             if user_info.get('attributes') and SAML_AVAILABLE:
@@ -202,9 +202,11 @@ def init_aai_routes(oauth_service, firebase_service, aai_service):
             
             # Encode user data and token for URL
             user_str = urllib.parse.quote(json.dumps(user_dict))
-            token_str = urllib.parse.quote(token)
+            token_str = urllib.parse.quote(tokens['token'])
+            refresh_str = urllib.parse.quote(tokens['refreshToken'])
             
-            redirect_to = f"{frontend_url}/prijava?token={token_str}&user={user_str}"
+            # Fragment, not query string: never sent to servers, logged or leaked via Referer
+            redirect_to = f"{frontend_url}/prijava#token={token_str}&refresh_token={refresh_str}&user={user_str}"
             
             return redirect(redirect_to)
             
@@ -272,12 +274,8 @@ def init_aai_routes(oauth_service, firebase_service, aai_service):
                     'message': 'SAML settings are not configured. Please check SP_ENTITY_ID, SP_ACS_URL, SP_SLS_URL, SP_X509_CERT, and SP_PRIVATE_KEY in .env file'
                 }), 400
             
-            # Generate SP metadata XML
-            from onelogin.saml2.settings import OneLogin_Saml2_Settings
-            
-            # Create Settings object and generate metadata
-            settings = OneLogin_Saml2_Settings(aai_service.saml_settings, sp_validation_only=True)
-            metadata = settings.get_sp_metadata()
+            # SP metadata XML (generated once from the cached settings)
+            metadata = aai_service.saml_cache.sp_metadata()
             
             return metadata, 200, {'Content-Type': 'application/xml'}
             
@@ -18,9 +18,18 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_admin_routes(oauth_service):
+def init_admin_routes(oauth_service, search_index=None):
     """Initialize admin routes with services"""
     
+    def sync_search_index(action, *args):
+        """Keep the in-process search index in sync after a commit"""
+        if not search_index:
+            return
+        try:
+            getattr(search_index, action)(*args)
+        except Exception as e:
+            print(f"Warning: Failed to update search index: {str(e)}")
+    
     def is_admin(current_user_role):
         """Check if user is admin"""
         return current_user_role == 'admin'
@@ -76,6 +85,7 @@ def init_admin_routes(oauth_service):
             # Add to database
             db.session.add(new_faculty)
             get_db().session.commit()
+            sync_search_index('index_faculty', new_faculty)
             
             # Convert to dict for response
             faculty_dict = new_faculty.to_dict()
@@ -167,6 +177,7 @@ def init_admin_routes(oauth_service):
             
             # Commit changes to database
             get_db().session.commit()
+            sync_search_index('index_faculty', faculty)
             
             return jsonify({
                 'success': True,
@@ -199,8 +210,10 @@ def init_admin_routes(oauth_service):
                     'message': 'Faculty not found'
                 }), 404
             
+            faculty_id = faculty.id
             db.session.delete(faculty)
             get_db().session.commit()
+            sync_search_index('remove_faculty', faculty_id)
             
             return jsonify({
                 'success': True,
@@ -284,6 +297,7 @@ def init_admin_routes(oauth_service):
             
             # Commit changes to database
             get_db().session.commit()
+            sync_search_index('index_association', association)
             
             return jsonify({
                 'success': True,
@@ -318,6 +332,7 @@ def init_admin_routes(oauth_service):
             
             db.session.delete(association)
             get_db().session.commit()
+            sync_search_index('remove_association', association_id)
             
             return jsonify({
                 'success': True,
@@ -19,9 +19,18 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_associations_routes(oauth_service):
+def init_associations_routes(oauth_service, search_index=None):
     """Initialize associations routes with services"""
     
+    def update_search_index(association):
+        """Keep the in-process search index in sync after a commit"""
+        if not search_index:
+            return
+        try:
+            search_index.index_association(association)
+        except Exception as e:
+            print(f"Warning: Failed to update search index: {str(e)}")
+    
     @associations_bp.route('', methods=['POST'])
     @oauth_service.token_required
     def create_association(current_user_id, current_user_email, current_user_role):
@@ -74,6 +83,7 @@ def init_associations_routes(oauth_service):
             
             db_instance.session.add(new_association)
             db_instance.session.commit()
+            update_search_index(new_association)
             
             return jsonify({
                 'success': True,
@@ -139,6 +149,7 @@ def init_associations_routes(oauth_service):
                 association.links = data['links']
             
             db_instance.session.commit()
+            update_search_index(association)
             
             return jsonify({
                 'success': True,
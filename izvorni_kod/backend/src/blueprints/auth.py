@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import HTTPException
 
 # Support both absolute and relative imports
 try:
@@ -22,10 +23,11 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_auth_routes(oauth_service, firebase_service, aai_service):
+def init_auth_routes(oauth_service, firebase_service, aai_service, password_hasher, rate_limiter, push_topics=None):
     """Initialize auth routes with services"""
     
     @auth_bp.route('/register', methods=['POST'])
+    @rate_limiter.limit('register', by=('ip', 'email'))
     def register():
         """Register a new user"""
         try:
@@ -79,12 +81,14 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
             # Faculty role can be registered with any email address
             # Note: AAI@EduHr login is optional, not required
             
+            # Hash on the bounded hashing pool (503 + Retry-After when it is saturated)
+            password_hash = password_hasher.hash(data['password'], requested_role)
+            
             # Create new user using SQLAlchemy model
             try:
                 if is_institutional:
                     new_user = UserModel(
                         email=data['email'],
-                        password=data['password'],
                         username=data['username'],
                         role=requested_role,
                         provider='local'
@@ -92,7 +96,6 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                 else:
                     new_user = UserModel(
                         email=data['email'],
-                        password=data['password'],
                         first_name=data['firstName'],
                         last_name=data['lastName'],
                         role=requested_role,
@@ -100,12 +103,13 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                         interests=data.get('interests'),
                         provider='local'
                     )
+                new_user.password_hash = password_hash
                 
                 db_instance.session.add(new_user)
                 db_instance.session.commit()
                 
-                # Generate JWT token
-                token = oauth_service.generate_token(
+                # Generate access + refresh tokens
+                tokens = oauth_service.generate_token_pair(
                     new_user.id,
                     new_user.email,
                     new_user.role
@@ -115,7 +119,7 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                     'success': True,
                     'message': 'User registered successfully',
                     'user': new_user.to_dict(),
-                    'token': token
+                    **tokens
                 }), 201
                 
             except Exception as db_error:
@@ -125,6 +129,8 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                     'message': f'Database error: {str(db_error)}'
                 }), 500
             
+        except HTTPException:
+            raise
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -132,6 +138,7 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
             }), 500
     
     @auth_bp.route('/login', methods=['POST'])
+    @rate_limiter.limit('login', by=('ip',), failures_by=('email',))
     def login():
         """Login with email and password"""
         try:
@@ -170,12 +177,12 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                     # Create admin user if doesn't exist
                     admin_user = UserModel(
                         email=ADMIN_EMAIL,
-                        password=ADMIN_PASSWORD,
                         first_name='Admin',
                         last_name='User',
                         role='admin',
                         provider='local'
                     )
+                    admin_user.password_hash = password_hasher.hash(ADMIN_PASSWORD, 'admin')
                     db_instance.session.add(admin_user)
                     db_instance.session.commit()
                 
@@ -183,9 +190,10 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                 if admin_user.role != 'admin':
                     admin_user.role = 'admin'
                     db_instance.session.commit()
+                    oauth_service.invalidate_user(admin_user.id)
                 
-                # Generate token
-                token = oauth_service.generate_token(
+                # Generate access + refresh tokens
+                tokens = oauth_service.generate_token_pair(
                     admin_user.id,
                     ADMIN_EMAIL,
                     'admin'
@@ -195,7 +203,7 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                     'success': True,
                     'message': 'Login successful',
                     'user': admin_user.to_dict(),
-                    'token': token
+                    **tokens
                 }), 200
             
             # Regular email/password login (AAI login is optional, not required)
@@ -215,15 +223,26 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                     'message': 'Invalid email or password'
                 }), 401
             
-            # Check password
-            if not user.check_password(data['password']):
+            # Check password (on the hashing pool)
+            if not password_hasher.verify(user.password_hash, data['password']):
                 return jsonify({
                     'success': False,
                     'message': 'Invalid email or password'
                 }), 401
             
-            # Generate token
-            token = oauth_service.generate_token(
+            # Upgrade hashes made with an older method or cost; the password is only known here
+            if password_hasher.needs_rehash(user.password_hash, user.role):
+                try:
+                    user.password_hash = password_hasher.hash(data['password'], user.role)
+                    db_instance.session.commit()
+                except HTTPException:
+                    pass  # Pool busy: upgrade on a later login
+                except Exception as e:
+                    db_instance.session.rollback()
+                    print(f"Warning: Failed to rehash password for user {user.id}: {str(e)}")
+            
+            # Generate access + refresh tokens
+            tokens = oauth_service.generate_token_pair(
                 user.id,
                 user.email,
                 user.role
@@ -233,9 +252,11 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                 'success': True,
                 'message': 'Login successful',
                 'user': user.to_dict(),
-                'token': token
+                **tokens
             }), 200
             
+        except HTTPException:
+            raise
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -247,18 +268,15 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
     def get_current_user(current_user_id, current_user_email, current_user_role):
         """Get current authenticated user"""
         try:
-            db_instance = get_db()
-            user = db_instance.session.query(UserModel).get(current_user_id)
+            # UserModel.to_dict(), cached briefly per user
+            user_response = oauth_service.get_user_profile(current_user_id)
             
-            if not user:
+            if not user_response:
                 return jsonify({
                     'success': False,
                     'message': 'User not found'
                 }), 404
             
-            # UserModel already has to_dict() method
-            user_response = user.to_dict()
-            
             # Return user directly (not wrapped in success/message)
             return jsonify(user_response), 200
             
@@ -274,7 +292,7 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
         """Update current authenticated user profile"""
         try:
             db_instance = get_db()
-            user = db_instance.session.query(UserModel).get(current_user_id)
+            user = oauth_service.current_user(current_user_id)
             
             if not user:
                 return jsonify({
@@ -291,13 +309,17 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                 user.last_name = data['lastName']
             if 'username' in data:
                 user.username = data['username']
-            if 'faculty' in data:
+            if 'faculty' in data and data['faculty'] != user.faculty:
                 user.faculty = data['faculty']
+                if push_topics:
+                    # Move the user's devices to the new faculty topics (outbox worker)
+                    push_topics.schedule_sync(current_user_id)
             if 'interests' in data:
                 user.interests = data['interests']
             
             # Save changes
             db_instance.session.commit()
+            oauth_service.invalidate_user(current_user_id)
             
             return jsonify({
                 'success': True,
@@ -312,12 +334,52 @@ def init_auth_routes(oauth_service, firebase_service, aai_service):
                 'message': f'Failed to update profile: {str(e)}'
             }), 500
     
+    @auth_bp.route('/refresh', methods=['POST'])
+    def refresh():
+        """Exchange a refresh token for a new access token and a rotated refresh token"""
+        data = request.get_json(silent=True) or {}
+        refresh_token = data.get('refreshToken')
+        
+        if not refresh_token:
+            return jsonify({
+                'success': False,
+                'message': 'Refresh token is required'
+            }), 400
+        
+        try:
+            result = oauth_service.refresh_token_pair(refresh_token)
+        except Exception as e:
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Token refresh failed: {str(e)}'
+            }), 500
+        
+        return jsonify(result), 200 if result['success'] else 401
+    
     @auth_bp.route('/logout', methods=['POST'])
     @oauth_service.token_required
     def logout(current_user_id, current_user_email, current_user_role):
-        """Logout user (client should remove token)"""
+        """Logout user: revokes the presented access token and, if sent, the refresh token's login"""
+        try:
+            token = request.headers.get('Authorization', '')
+            if token.startswith('Bearer '):
+                token = token[7:]
+            revoked = oauth_service.revoke_token(token)
+            
+            refresh_token = (request.get_json(silent=True) or {}).get('refreshToken')
+            if refresh_token:
+                oauth_service.refresh_tokens.revoke(refresh_token)
+        except Exception as e:
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Logout failed: {str(e)}'
+            }), 500
+        
         return jsonify({
             'success': True,
-            'message': 'Logout successful'
+            'message': 'Logout successful',
+            'revoked': revoked
         }), 200
 
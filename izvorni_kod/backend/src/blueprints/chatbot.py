@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context
+import json
 
 # Support both absolute and relative imports
 try:
@@ -6,22 +7,24 @@ try:
     from firebase_service import FirebaseService
     from chatbot_service import ChatbotService
     from models import User
+    from pagination import get_pagination_args, InvalidCursorError
 except ImportError:
     from ..oauth2_service import OAuth2Service
     from ..firebase_service import FirebaseService
     from ..chatbot_service import ChatbotService
     from ..models import User
-import uuid
-from datetime import datetime
+    from ..pagination import get_pagination_args, InvalidCursorError
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chatbot')
 
-# Store conversation sessions (in production, use database)
-conversation_sessions = {}
-
-def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
+def init_chatbot_routes(oauth_service, firebase_service, chatbot_service, chat_store):
     """Initialize chatbot routes with services"""
     
+    def session_forbidden(chat_session, current_user_id, is_authenticated):
+        """Authenticated users can only use their own sessions; anonymous sessions are shared by id"""
+        return bool(is_authenticated and current_user_id and chat_session.user_id
+                    and chat_session.user_id != current_user_id)
+    
     @chatbot_bp.route('/send', methods=['POST'])
     @oauth_service.optional_token
     def send_message(current_user_id=None, current_user_email=None, current_user_role=None, is_authenticated=False):
@@ -39,15 +42,23 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
             provider_name = data.get('provider', 'smotra')  # Default to smotra
             session_id = data.get('session_id') or session.get('chatbot_session_id')
             
-            # Create new session if needed
-            if not session_id:
-                session_id = str(uuid.uuid4())
+            # Resume the session, or start a new one if it is unknown or expired
+            chat_session = chat_store.get_session(session_id)
+            new_session = chat_session is None
+            if new_session:
+                chat_session = chat_store.create_session(
+                    user_id=current_user_id if is_authenticated else None
+                )
+                session_id = chat_session.id
                 session['chatbot_session_id'] = session_id
-                conversation_sessions[session_id] = {
-                    'user_id': current_user_id,  # Can be None for anonymous users
-                    'created_at': datetime.now().isoformat(),
-                    'messages': []
-                }
+            elif session_forbidden(chat_session, current_user_id, is_authenticated):
+                return jsonify({
+                    'success': False,
+                    'message': 'Unauthorized: Session does not belong to user'
+                }), 403
+            
+            # Don't hold a pooled DB connection while waiting on the provider
+            chat_store.release(chat_session)
             
             # Get context from session (include user data if authenticated)
             context = {
@@ -63,25 +74,17 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
                 message=message,
                 provider_name=provider_name,
                 context=context,
-                session_id=session_id
+                session_id=session_id,
+                first_turn=new_session
             )
             
-            # Store conversation in session
-            if session_id in conversation_sessions:
-                conversation_sessions[session_id]['messages'].append({
-                    'role': 'user',
-                    'message': message,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                if response.get('success'):
-                    bot_response = response.get('response', {}).get('message', '') or \
-                                 response.get('response', {}).get('response', '')
-                    conversation_sessions[session_id]['messages'].append({
-                        'role': 'assistant',
-                        'message': bot_response,
-                        'timestamp': datetime.now().isoformat()
-                    })
+            # Store conversation
+            exchange = [('user', message, None)]
+            if response.get('success'):
+                bot_response = response.get('response', {}).get('message', '') or \
+                             response.get('response', {}).get('response', '')
+                exchange.append(('assistant', bot_response, response.get('provider', provider_name)))
+            chat_store.add_messages(chat_session, exchange)
             
             return jsonify({
                 'success': response.get('success', False),
@@ -90,6 +93,9 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
                           response.get('error', 'Unknown error'),
                 'session_id': session_id,
                 'provider': response.get('provider', provider_name),
+                'cached': response.get('cached', False),
+                'routed_to': response.get('routed_to'),
+                'hedged': response.get('hedged', False),
                 'error': response.get('error') if not response.get('success') else None
             }), 200 if response.get('success') else 500
             
@@ -99,6 +105,120 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
                 'message': f'Failed to send message: {str(e)}'
             }), 500
     
+    @chatbot_bp.route('/stream', methods=['POST'])
+    @oauth_service.optional_token
+    def stream_message(current_user_id=None, current_user_email=None, current_user_role=None, is_authenticated=False):
+        """
+        Send a message and stream the reply as Server-Sent Events
+        
+        Events: `session` ({session_id}), unnamed deltas ({delta}), then
+        `done` ({message, provider}) or `error` ({message}). The assembled
+        reply is stored in the conversation once the stream completes; a stream
+        that fails or whose client disconnects stores the user's message and the
+        partial reply.
+        """
+        data = request.get_json(silent=True)
+        
+        if not data or not data.get('message'):
+            return jsonify({
+                'success': False,
+                'message': 'Message is required'
+            }), 400
+        
+        message = data['message']
+        provider_name = data.get('provider', 'openai')  # The OpenAI-compatible provider streams tokens
+        session_id = data.get('session_id') or session.get('chatbot_session_id')
+        
+        if not chatbot_service.get_provider(provider_name):
+            return jsonify({
+                'success': False,
+                'message': f'Provider "{provider_name}" not configured or not found',
+                'available_providers': chatbot_service.get_available_providers()
+            }), 400
+        
+        try:
+            # Resolve the session before streaming so the session cookie goes out with the headers
+            chat_session = chat_store.get_session(session_id)
+            new_session = chat_session is None
+            if new_session:
+                chat_session = chat_store.create_session(
+                    user_id=current_user_id if is_authenticated else None
+                )
+                session_id = chat_session.id
+                session['chatbot_session_id'] = session_id
+            elif session_forbidden(chat_session, current_user_id, is_authenticated):
+                return jsonify({
+                    'success': False,
+                    'message': 'Unauthorized: Session does not belong to user'
+                }), 403
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Failed to send message: {str(e)}'
+            }), 500
+        
+        # The stream can run for a long time: give the DB connection back first
+        chat_store.release(chat_session)
+        
+        context = {
+            'session_id': session_id
+        }
+        if is_authenticated and current_user_id:
+            context['user_id'] = current_user_id
+            context['user_email'] = current_user_email
+            context['user_role'] = current_user_role
+        
+        def sse(payload, event=None):
+            prefix = f'event: {event}\n' if event else ''
+            return f'{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n'
+        
+        def store_turn(chunks):
+            turn = [('user', message, None)]
+            if chunks:
+                turn.append(('assistant', ''.join(chunks), provider_name))
+            try:
+                chat_store.add_messages(chat_session, turn)
+            except Exception as e:
+                print(f"Warning: Failed to store chatbot turn for session {session_id}: {str(e)}")
+        
+        def generate():
+            chunks = []
+            stored = False
+            try:
+                yield sse({'session_id': session_id}, event='session')
+                try:
+                    for delta in chatbot_service.stream_message(
+                        message=message,
+                        provider_name=provider_name,
+                        context=context,
+                        session_id=session_id,
+                        first_turn=new_session
+                    ):
+                        chunks.append(delta)
+                        yield sse({'delta': delta})
+                except Exception as e:
+                    yield sse({'message': str(e)}, event='error')
+                    return
+                
+                # Stored before `done`, so a history read right after includes the reply
+                store_turn(chunks)
+                stored = True
+                yield sse({'message': ''.join(chunks), 'provider': provider_name}, event='done')
+            finally:
+                # Provider failure or client disconnect (GeneratorExit at a yield):
+                # keep the user's message and whatever part of the reply was produced
+                if not stored:
+                    store_turn(chunks)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'  # Don't let proxies buffer the stream
+            }
+        )
+    
     @chatbot_bp.route('/providers', methods=['GET'])
     @oauth_service.optional_token
     def get_providers(current_user_id=None, current_user_email=None, current_user_role=None, is_authenticated=False):
@@ -118,10 +238,41 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
                 'message': f'Failed to get providers: {str(e)}'
             }), 500
     
+    @chatbot_bp.route('/cache/stats', methods=['GET'])
+    @oauth_service.token_required
+    def get_cache_stats(current_user_id, current_user_email, current_user_role):
+        """Response cache hit-rate metrics for this worker process (admin only)"""
+        if current_user_role != 'admin':
+            return jsonify({
+                'success': False,
+                'message': 'Only administrators can view chatbot cache statistics'
+            }), 403
+        
+        return jsonify({
+            'success': True,
+            'cache': chatbot_service.get_cache_stats()
+        }), 200
+    
+    @chatbot_bp.route('/routing/stats', methods=['GET'])
+    @oauth_service.token_required
+    def get_routing_stats(current_user_id, current_user_email, current_user_role):
+        """Per-provider latency, error rate and circuit breaker state for this worker process (admin only)"""
+        if current_user_role != 'admin':
+            return jsonify({
+                'success': False,
+                'message': 'Only administrators can view chatbot routing statistics'
+            }), 403
+        
+        return jsonify({
+            'success': True,
+            'routing_enabled': chatbot_service.router is not None,
+            'providers': chatbot_service.get_routing_stats()
+        }), 200
+    
     @chatbot_bp.route('/history', methods=['GET'])
     @oauth_service.optional_token
     def get_conversation_history(current_user_id=None, current_user_email=None, current_user_role=None, is_authenticated=False):
-        """Get conversation history for current session (works with or without authentication)"""
+        """Get conversation history for current session, newest page first (works with or without authentication)"""
         try:
             session_id = request.args.get('session_id') or session.get('chatbot_session_id')
             
@@ -132,32 +283,38 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
                     'message': 'No active session'
                 }), 200
             
-            # Get conversation from session storage
-            if session_id in conversation_sessions:
-                conversation = conversation_sessions[session_id]
-                
-                # Verify session belongs to user (if authenticated)
-                # Anonymous sessions can be accessed by anyone with the session_id
-                if is_authenticated and current_user_id:
-                    if conversation['user_id'] and conversation['user_id'] != current_user_id:
-                        return jsonify({
-                            'success': False,
-                            'message': 'Unauthorized: Session does not belong to user'
-                        }), 403
-                
-                return jsonify({
-                    'success': True,
-                    'session_id': session_id,
-                    'messages': conversation['messages'],
-                    'created_at': conversation['created_at']
-                }), 200
-            else:
+            chat_session = chat_store.get_session(session_id)
+            if chat_session is None:
                 return jsonify({
                     'success': True,
                     'messages': [],
                     'message': 'Session not found'
                 }), 200
+            
+            # Verify session belongs to user (if authenticated)
+            # Anonymous sessions can be accessed by anyone with the session_id
+            if session_forbidden(chat_session, current_user_id, is_authenticated):
+                return jsonify({
+                    'success': False,
+                    'message': 'Unauthorized: Session does not belong to user'
+                }), 403
+            
+            cursor, limit = get_pagination_args()
+            messages, next_cursor = chat_store.history(chat_session, cursor, limit)
+            
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'messages': messages,
+                'created_at': chat_session.created_at.isoformat() if chat_session.created_at else None,
+                'nextCursor': next_cursor
+            }), 200
                 
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -169,18 +326,14 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
     def create_session(current_user_id=None, current_user_email=None, current_user_role=None, is_authenticated=False):
         """Create a new chatbot conversation session (works with or without authentication)"""
         try:
-            session_id = str(uuid.uuid4())
-            session['chatbot_session_id'] = session_id
-            
-            conversation_sessions[session_id] = {
-                'user_id': current_user_id if is_authenticated else None,
-                'created_at': datetime.now().isoformat(),
-                'messages': []
-            }
+            chat_session = chat_store.create_session(
+                user_id=current_user_id if is_authenticated else None
+            )
+            session['chatbot_session_id'] = chat_session.id
             
             return jsonify({
                 'success': True,
-                'session_id': session_id,
+                'session_id': chat_session.id,
                 'message': 'Session created successfully'
             }), 201
             
@@ -195,30 +348,29 @@ def init_chatbot_routes(oauth_service, firebase_service, chatbot_service):
     def delete_session(current_user_id, current_user_email, current_user_role, session_id):
         """Delete a conversation session"""
         try:
-            if session_id in conversation_sessions:
-                conversation = conversation_sessions[session_id]
-                
-                # Verify session belongs to user
-                if conversation['user_id'] != current_user_id:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Unauthorized: Session does not belong to user'
-                    }), 403
-                
-                del conversation_sessions[session_id]
-                
-                if session.get('chatbot_session_id') == session_id:
-                    session.pop('chatbot_session_id', None)
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Session deleted successfully'
-                }), 200
-            else:
+            chat_session = chat_store.get_session(session_id)
+            if chat_session is None:
                 return jsonify({
                     'success': False,
                     'message': 'Session not found'
                 }), 404
+            
+            # Verify session belongs to user
+            if chat_session.user_id != current_user_id:
+                return jsonify({
+                    'success': False,
+                    'message': 'Unauthorized: Session does not belong to user'
+                }), 403
+            
+            chat_store.delete_session(chat_session)
+            
+            if session.get('chatbot_session_id') == session_id:
+                session.pop('chatbot_session_id', None)
+            
+            return jsonify({
+                'success': True,
+                'message': 'Session deleted successfully'
+            }), 200
                 
         except Exception as e:
             return jsonify({
@@ -6,10 +6,12 @@ try:
     from models import ErasmusProjectModel, FacultyModel
     from oauth2_service import OAuth2Service
     from database import db
+    from pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 except ImportError:
     from ..models import ErasmusProjectModel, FacultyModel
     from ..oauth2_service import OAuth2Service
     from ..database import db
+    from ..pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 
 erasmus_bp = Blueprint('erasmus', __name__, url_prefix='/api/erasmus')
 
@@ -106,6 +108,7 @@ def init_erasmus_routes(oauth_service):
         try:
             faculty_slug = request.args.get('faculty')
             field_of_study = request.args.get('fieldOfStudy')
+            cursor, limit = get_pagination_args()
             
             # Start with all active projects
             projects_query = get_db().session.query(ErasmusProjectModel).filter_by(status='active')
@@ -118,15 +121,21 @@ def init_erasmus_routes(oauth_service):
             if field_of_study:
                 projects_query = projects_query.filter_by(field_of_study=field_of_study)
             
-            projects = projects_query.order_by(ErasmusProjectModel.created_at.desc()).all()
+            projects, next_cursor = paginate_keyset(projects_query, ErasmusProjectModel, cursor, limit)
             projects_list = [project.to_dict() for project in projects]
             
             return jsonify({
                 'success': True,
                 'count': len(projects_list),
-                'items': projects_list
+                'items': projects_list,
+                'nextCursor': next_cursor
             }), 200
             
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -5,10 +5,12 @@ try:
     from models import FavoriteFacultyModel, FacultyModel
     from oauth2_service import OAuth2Service
     from database import db
+    from pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 except ImportError:
     from ..models import FavoriteFacultyModel, FacultyModel
     from ..oauth2_service import OAuth2Service
     from ..database import db
+    from ..pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 
 favorites_bp = Blueprint('favorites', __name__, url_prefix='/api/favorites')
 
@@ -16,7 +18,7 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_favorites_routes(oauth_service):
+def init_favorites_routes(oauth_service, push_topics=None):
     """Initialize favorites routes with services"""
     
     @favorites_bp.route('/faculties', methods=['POST'])
@@ -64,6 +66,9 @@ def init_favorites_routes(oauth_service):
             db_instance = get_db()
             favorite = FavoriteFacultyModel(user_id=current_user_id, faculty_slug=faculty_slug)
             db_instance.session.add(favorite)
+            if push_topics:
+                # Subscribe the user's devices to favorite-<slug> (outbox worker)
+                push_topics.schedule_sync(current_user_id)
             db_instance.session.commit()
             
             return jsonify({
@@ -84,15 +89,25 @@ def init_favorites_routes(oauth_service):
     def get_favorite_faculties(current_user_id, current_user_email, current_user_role):
         """Get user's favorite faculties"""
         try:
-            favorites = get_db().session.query(FavoriteFacultyModel).filter_by(user_id=current_user_id).all()
+            cursor, limit = get_pagination_args()
+            favorites_query = get_db().session.query(FavoriteFacultyModel).filter_by(user_id=current_user_id)
+            favorites, next_cursor = paginate_keyset(
+                favorites_query, FavoriteFacultyModel, cursor, limit, unpaginated_order=(FavoriteFacultyModel.id,)
+            )
             favorites_list = [fav.to_dict() for fav in favorites]
             
             return jsonify({
                 'success': True,
                 'count': len(favorites_list),
-                'items': favorites_list
+                'items': favorites_list,
+                'nextCursor': next_cursor
             }), 200
             
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -117,6 +132,8 @@ def init_favorites_routes(oauth_service):
             
             db_instance = get_db()
             db_instance.session.delete(favorite)
+            if push_topics:
+                push_topics.schedule_sync(current_user_id)
             db_instance.session.commit()
             
             return jsonify({
@@ -2,13 +2,15 @@ from flask import Blueprint, request, jsonify, current_app
 
 # Support both absolute and relative imports
 try:
-    from models import FacultyInquiryModel, FacultyModel, UserModel
+    from models import FacultyInquiryModel, FacultyModel
     from oauth2_service import OAuth2Service
     from email_service import EmailService
+    from pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 except ImportError:
-    from ..models import FacultyInquiryModel, FacultyModel, UserModel
+    from ..models import FacultyInquiryModel, FacultyModel
     from ..oauth2_service import OAuth2Service
     from ..email_service import EmailService
+    from ..pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 
 inquiries_bp = Blueprint('inquiries', __name__, url_prefix='/api/inquiries')
 
@@ -16,7 +18,7 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_inquiries_routes(oauth_service, email_service=None):
+def init_inquiries_routes(oauth_service, email_service=None, outbox=None):
     """Initialize inquiries routes with services"""
     
     @inquiries_bp.route('/faculties', methods=['POST'])
@@ -80,21 +82,20 @@ def init_inquiries_routes(oauth_service, email_service=None):
             )
             
             db_instance.session.add(inquiry)
-            db_instance.session.commit()
             
-            # Send email notification to faculty (if email service is configured)
-            if email_service and email_service.initialized:
-                try:
-                    # Get faculty contact email
-                    faculty_email = None
-                    if faculty.contacts and isinstance(faculty.contacts, dict):
-                        faculty_email = faculty.contacts.get('email')
-                    
-                    if faculty_email:
-                        email_service.send_email(
-                            to=faculty_email,
-                            subject=f'Novi upit: {subject}',
-                            body=f'''
+            # Queue email notification to faculty (if email service is configured);
+            # committed together with the inquiry and sent by the outbox worker
+            if outbox and email_service and email_service.initialized:
+                # Get faculty contact email
+                faculty_email = None
+                if faculty.contacts and isinstance(faculty.contacts, dict):
+                    faculty_email = faculty.contacts.get('email')
+                
+                if faculty_email:
+                    outbox.enqueue_email(
+                        to=faculty_email,
+                        subject=f'Novi upit: {subject}',
+                        body=f'''
 Dobili ste novi upit od {sender_name} ({sender_email}).
 
 Fakultet: {faculty.name}
@@ -106,10 +107,9 @@ Poruka:
 ---
 Ovaj upit možete vidjeti i odgovoriti preko sustava.
 '''
-                        )
-                except Exception as e:
-                    # Log error but don't fail the request
-                    print(f"Failed to send email notification: {str(e)}")
+                    )
+            
+            db_instance.session.commit()
             
             return jsonify({
                 'success': True,
@@ -148,7 +148,7 @@ Ovaj upit možete vidjeti i odgovoriti preko sustava.
             
             # Get user's faculty (if not admin)
             if current_user_role != 'admin':
-                user = db_instance.session.query(UserModel).get(current_user_id)
+                user = oauth_service.current_user(current_user_id)
                 if not user:
                     return jsonify({
                         'success': False,
@@ -162,6 +162,7 @@ Ovaj upit možete vidjeti i odgovoriti preko sustava.
             
             # Get inquiries for this faculty
             status_filter = request.args.get('status')  # pending, read, replied, or all
+            cursor, limit = get_pagination_args()
             inquiries_query = db_instance.session.query(FacultyInquiryModel).filter_by(
                 faculty_slug=faculty_slug
             )
@@ -169,14 +170,20 @@ Ovaj upit možete vidjeti i odgovoriti preko sustava.
             if status_filter and status_filter != 'all':
                 inquiries_query = inquiries_query.filter_by(status=status_filter)
             
-            inquiries = inquiries_query.order_by(FacultyInquiryModel.created_at.desc()).all()
+            inquiries, next_cursor = paginate_keyset(inquiries_query, FacultyInquiryModel, cursor, limit)
             
             return jsonify({
                 'success': True,
                 'count': len(inquiries),
-                'items': [inquiry.to_dict(include_user=True) for inquiry in inquiries]
+                'items': [inquiry.to_dict(include_user=True) for inquiry in inquiries],
+                'nextCursor': next_cursor
             }), 200
             
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -252,19 +259,18 @@ Ovaj upit možete vidjeti i odgovoriti preko sustava.
             
             # Mark as replied
             inquiry.mark_as_replied(reply_message)
-            db_instance.session.commit()
             
-            # Send email reply to sender (if email service is configured)
-            if email_service and email_service.initialized:
-                try:
-                    # Get faculty info
-                    faculty = db_instance.session.query(FacultyModel).filter_by(slug=inquiry.faculty_slug).first()
-                    faculty_name = faculty.name if faculty else 'Fakultet'
-                    
-                    email_service.send_email(
-                        to=inquiry.sender_email,
-                        subject=f'Odgovor na vaš upit: {inquiry.subject}',
-                        body=f'''
+            # Queue email reply to sender (if email service is configured);
+            # committed together with the reply and sent by the outbox worker
+            if outbox and email_service and email_service.initialized:
+                # Get faculty info
+                faculty = db_instance.session.query(FacultyModel).filter_by(slug=inquiry.faculty_slug).first()
+                faculty_name = faculty.name if faculty else 'Fakultet'
+                
+                outbox.enqueue_email(
+                    to=inquiry.sender_email,
+                    subject=f'Odgovor na vaš upit: {inquiry.subject}',
+                    body=f'''
 Poštovani/a {inquiry.sender_name},
 
 Hvala vam na upitu. Evo odgovora od {faculty_name}:
@@ -280,10 +286,9 @@ Vaš originalni upit:
 S poštovanjem,
 {faculty_name}
 '''
-                    )
-                except Exception as e:
-                    # Log error but don't fail the request
-                    print(f"Failed to send email reply: {str(e)}")
+                )
+            
+            db_instance.session.commit()
             
             return jsonify({
                 'success': True,
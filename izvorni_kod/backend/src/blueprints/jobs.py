@@ -2,16 +2,19 @@ from flask import Blueprint, request, jsonify, current_app
 import re
 from datetime import datetime
 from sqlalchemy import or_, func, text
+from sqlalchemy.orm import joinedload, contains_eager
 
 # Support both absolute and relative imports
 try:
-    from models import UserModel, JobModel, JobApplicationModel, NotificationModel, FCMTokenModel
+    from models import UserModel, JobModel, JobApplicationModel, NotificationModel
     from oauth2_service import OAuth2Service
     from database import db
+    from pagination import get_pagination_args, paginate_keyset, paginate_ordered, InvalidCursorError
 except ImportError:
-    from ..models import UserModel, JobModel, JobApplicationModel, NotificationModel, FCMTokenModel
+    from ..models import UserModel, JobModel, JobApplicationModel, NotificationModel
     from ..oauth2_service import OAuth2Service
     from ..database import db
+    from ..pagination import get_pagination_args, paginate_keyset, paginate_ordered, InvalidCursorError
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
@@ -19,7 +22,7 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
+def init_jobs_routes(oauth_service, email_service=None, firebase_service=None, job_search=None, outbox=None):
     """Initialize jobs routes with services"""
     
     @jobs_bp.route('', methods=['POST'])
@@ -78,11 +81,12 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
     
     @jobs_bp.route('', methods=['GET'])
     def get_jobs():
-        """Get all job postings"""
+        """Get active job postings, newest first (cursor paginated)"""
         try:
             db_instance = get_db()
             type_filter = request.args.get('type')
             query = request.args.get('q', '').strip()
+            cursor, limit = get_pagination_args()
             
             # Start with all active jobs using get_db().session.query
             jobs_query = db_instance.session.query(JobModel).filter_by(status='active')
@@ -91,8 +95,10 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
             if type_filter:
                 jobs_query = jobs_query.filter_by(type=type_filter)
             
-            # Search by query
-            if query:
+            # Search by query (full-text ranked by relevance when installed)
+            if query and job_search:
+                jobs_query = job_search.apply(jobs_query, query)
+            elif query:
                 search_term = f"%{query.lower()}%"
                 jobs_query = jobs_query.filter(
                     or_(
@@ -102,14 +108,27 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
                     ).params(search=search_term)
                 )
             
-            jobs = jobs_query.all()
+            if query:
+                # Relevance order is not a stable key, so search pages by offset
+                jobs_query = jobs_query.order_by(JobModel.created_at.desc(), JobModel.id.desc())
+                jobs, next_cursor = paginate_ordered(jobs_query, cursor, limit)
+            else:
+                jobs, next_cursor = paginate_keyset(
+                    jobs_query, JobModel, cursor, limit, unpaginated_order=(JobModel.id,)
+                )
             jobs_list = [job.to_dict() for job in jobs]
             
             return jsonify({
                 'success': True,
                 'count': len(jobs_list),
-                'items': jobs_list
+                'items': jobs_list,
+                'nextCursor': next_cursor
             }), 200
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -227,8 +246,12 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
                     'message': 'You can only view applications for your own job postings'
                 }), 403
             
-            # Get applications for this job
-            applications = get_db().session.query(JobApplicationModel).filter_by(job_id=job_id).all()
+            # Get applications for this job, loading applicants in the same query
+            applications = get_db().session.query(JobApplicationModel).filter_by(
+                job_id=job_id
+            ).options(
+                joinedload(JobApplicationModel.applicant)
+            ).order_by(JobApplicationModel.id).all()
             
             applications_list = [app.to_dict(include_user=True) for app in applications]
             
@@ -256,14 +279,18 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
                     'message': 'Only employers can view applications'
                 }), 403
             
-            # Get all jobs created by this employer and their applications
-            employer_jobs = get_db().session.query(JobModel).filter_by(created_by=current_user_id).all()
+            # Load every application for this employer's jobs, together with
+            # the job and applicant, in a single query
+            applications = get_db().session.query(JobApplicationModel).join(
+                JobApplicationModel.job
+            ).filter(
+                JobModel.created_by == current_user_id
+            ).options(
+                contains_eager(JobApplicationModel.job),
+                joinedload(JobApplicationModel.applicant)
+            ).order_by(JobModel.id, JobApplicationModel.id).all()
             
-            all_applications = []
-            for job in employer_jobs:
-                applications = get_db().session.query(JobApplicationModel).filter_by(job_id=job.id).all()
-                for app in applications:
-                    all_applications.append(app.to_dict(include_user=True, include_job=True))
+            all_applications = [app.to_dict(include_user=True, include_job=True) for app in applications]
             
             return jsonify({
                 'success': True,
@@ -317,99 +344,87 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
             # Update application status
             db_instance = get_db()
             application.status = new_status
-            db_instance.session.commit()
             
-            # Send notifications (email + in-app + push) if status is approved or rejected
-            email_sent = False
-            email_result = None
+            # Notify the applicant if status is approved or rejected. The in-app
+            # notification and the queued email/push are committed together with
+            # the status change; the outbox worker (worker.py) delivers them.
             notification_created = False
+            push_queued = False
+            email_queued = False
             
             if new_status in ['approved', 'rejected']:
-                try:
-                    # Get applicant info
-                    applicant = get_db().session.query(UserModel).get(application.user_id)
-                    if applicant:
-                        # Get employer info (job creator)
-                        employer = get_db().session.query(UserModel).get(job.created_by)
-                        employer_name = employer.username if employer and employer.username else (
-                            f"{employer.first_name} {employer.last_name}".strip() if employer else None
-                        )
-                        employer_email = employer.email if employer else None
-                        
-                        # Get applicant name
-                        applicant_name = (
-                            f"{applicant.first_name} {applicant.last_name}".strip() 
-                            if applicant.first_name or applicant.last_name
-                            else applicant.email.split('@')[0]
-                        )
-                        
-                        # 1. Create in-app notification
-                        try:
-                            status_text = 'odobrena' if new_status == 'approved' else 'odbijena'
-                            notification_title = f'Prijava za posao "{job.title}" je {status_text}'
-                            notification_body = (
-                                f'Čestitamo! Vaša prijava za posao "{job.title}" je odobrena.'
-                                if new_status == 'approved'
-                                else f'Vaša prijava za posao "{job.title}" nije odobrena.'
-                            )
-                            
-                            notification = NotificationModel(
-                                user_id=applicant.id,
-                                title=notification_title,
-                                body=notification_body,
-                                type='success' if new_status == 'approved' else 'info',
-                                data={
+                applicant = application.applicant
+                if applicant:
+                    # Get employer info (job creator)
+                    employer = db_instance.session.query(UserModel).get(job.created_by)
+                    employer_name = employer.username if employer and employer.username else (
+                        f"{employer.first_name} {employer.last_name}".strip() if employer else None
+                    )
+                    employer_email = employer.email if employer else None
+                    
+                    # Get applicant name
+                    applicant_name = (
+                        f"{applicant.first_name} {applicant.last_name}".strip() 
+                        if applicant.first_name or applicant.last_name
+                        else applicant.email.split('@')[0]
+                    )
+                    
+                    # 1. In-app notification
+                    status_text = 'odobrena' if new_status == 'approved' else 'odbijena'
+                    notification_title = f'Prijava za posao "{job.title}" je {status_text}'
+                    notification_body = (
+                        f'Čestitamo! Vaša prijava za posao "{job.title}" je odobrena.'
+                        if new_status == 'approved'
+                        else f'Vaša prijava za posao "{job.title}" nije odobrena.'
+                    )
+                    
+                    notification = NotificationModel(
+                        user_id=applicant.id,
+                        title=notification_title,
+                        body=notification_body,
+                        type='success' if new_status == 'approved' else 'info',
+                        data={
+                            'job_id': job.id,
+                            'job_title': job.title,
+                            'application_id': application.id,
+                            'status': new_status
+                        }
+                    )
+                    db_instance.session.add(notification)
+                    db_instance.session.flush()  # assigns notification.id for the push payload
+                    notification_created = True
+                    
+                    if outbox:
+                        # 2. Push notification via Firebase
+                        if firebase_service and firebase_service.initialized:
+                            outbox.enqueue_push(
+                                applicant.id,
+                                notification_title,
+                                notification_body,
+                                {
+                                    'notification_id': notification.id,
                                     'job_id': job.id,
-                                    'job_title': job.title,
                                     'application_id': application.id,
-                                    'status': new_status
+                                    'status': new_status,
+                                    'type': 'job_application_status'
                                 }
                             )
-                            db_instance.session.add(notification)
-                            db_instance.session.commit()
-                            notification_created = True
-                            
-                            # 2. Send push notification via Firebase
-                            if firebase_service and firebase_service.initialized:
-                                try:
-                                    user_tokens = db_instance.session.query(FCMTokenModel).filter_by(user_id=applicant.id).all()
-                                    if user_tokens:
-                                        fcm_tokens = [token.fcm_token for token in user_tokens]
-                                        firebase_service.send_multicast_notification(
-                                            fcm_tokens,
-                                            notification_title,
-                                            notification_body,
-                                            {
-                                                'notification_id': str(notification.id),
-                                                'job_id': str(job.id),
-                                                'application_id': str(application.id),
-                                                'status': new_status,
-                                                'type': 'job_application_status'
-                                            }
-                                        )
-                                except Exception as e:
-                                    print(f"Warning: Failed to send push notification: {str(e)}")
-                        except Exception as e:
-                            print(f"Warning: Failed to create in-app notification: {str(e)}")
+                            push_queued = True
                         
-                        # 3. Send email notification
+                        # 3. Email notification
                         if email_service and email_service.initialized:
-                            try:
-                                email_result = email_service.send_job_application_status_email(
-                                    applicant_email=applicant.email,
-                                    applicant_name=applicant_name,
-                                    job_title=job.title,
-                                    status=new_status,
-                                    employer_name=employer_name,
-                                    employer_email=employer_email
-                                )
-                                email_sent = email_result.get('success', False)
-                            except Exception as e:
-                                print(f"Warning: Failed to send email notification: {str(e)}")
-                                email_result = {'success': False, 'message': str(e)}
-                except Exception as e:
-                    # Don't fail the request if notification sending fails
-                    print(f"Warning: Failed to send notifications: {str(e)}")
+                            content = email_service.build_job_application_status_email(
+                                applicant_name=applicant_name,
+                                job_title=job.title,
+                                status=new_status,
+                                employer_name=employer_name,
+                                employer_email=employer_email
+                            )
+                            if content:
+                                outbox.enqueue_email(applicant.email, **content)
+                                email_queued = True
+            
+            db_instance.session.commit()
             
             response_data = {
                 'success': True,
@@ -417,17 +432,11 @@ def init_jobs_routes(oauth_service, email_service=None, firebase_service=None):
                 'item': application.to_dict(),
                 'notifications': {
                     'in_app': notification_created,
-                    'email_sent': email_sent,
-                    'push_sent': firebase_service and firebase_service.initialized and notification_created
+                    'email_queued': email_queued,
+                    'push_queued': push_queued
                 }
             }
             
-            # Include email status in response
-            if email_service:
-                response_data['email_sent'] = email_sent
-                if email_result:
-                    response_data['email_result'] = email_result
-            
             return jsonify(response_data), 200
             
         except Exception as e:
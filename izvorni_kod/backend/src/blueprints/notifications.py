@@ -1,4 +1,9 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from datetime import datetime, timezone
+from sqlalchemy import delete
+import json
+import queue
+import time
 
 # Support both absolute and relative imports
 try:
@@ -11,9 +16,11 @@ except ImportError:
 try:
     from oauth2_service import OAuth2Service
     from firebase_service import FirebaseService
+    from pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 except ImportError:
     from ..oauth2_service import OAuth2Service
     from ..firebase_service import FirebaseService
+    from ..pagination import get_pagination_args, paginate_keyset, InvalidCursorError
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
@@ -21,7 +28,40 @@ def get_db():
     """Get db instance from current app"""
     return current_app.extensions['sqlalchemy']
 
-def init_notification_routes(oauth_service, firebase_service):
+def parse_bulk_selection(data):
+    """
+    Filter conditions for a bulk request body: {"ids": [...]}, {"before": ISO timestamp}
+    (both may be combined) or {"all": true}
+    
+    Returns:
+        tuple: (list of conditions, error message or None)
+    """
+    if not isinstance(data, dict):
+        return None, 'Request body must be a JSON object'
+    conditions = []
+    ids = data.get('ids')
+    if ids is not None:
+        max_ids = current_app.config.get('NOTIFICATION_BULK_MAX_IDS', 1000)
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return None, 'ids must be a list of notification ids'
+        if len(ids) > max_ids:
+            return None, f'At most {max_ids} ids per request'
+        conditions.append(NotificationModel.id.in_(ids))
+    if data.get('before'):
+        try:
+            before = datetime.fromisoformat(str(data['before']).replace('Z', '+00:00'))
+        except ValueError:
+            return None, 'before must be an ISO 8601 timestamp'
+        if before.tzinfo is not None:
+            # created_at is stored as naive UTC
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        conditions.append(NotificationModel.created_at <= before)
+    if not conditions and data.get('all') is not True:
+        return None, 'Provide ids, before, or all: true'
+    return conditions, None
+
+def init_notification_routes(oauth_service, firebase_service, push_topics=None, notification_counters=None,
+                             notification_stream=None):
     """Initialize notification routes with services"""
     
     @notifications_bp.route('/firebase-status', methods=['GET'])
@@ -77,7 +117,6 @@ def init_notification_routes(oauth_service, firebase_service):
             
             if existing:
                 existing.device_info = device_info or {}
-                db_instance.session.commit()
             else:
                 token = FCMTokenModel(
                     user_id=current_user_id,
@@ -85,7 +124,10 @@ def init_notification_routes(oauth_service, firebase_service):
                     device_info=device_info
                 )
                 db_instance.session.add(token)
-                db_instance.session.commit()
+            if push_topics:
+                # Subscribe the device to its role/faculty/favorite topics (outbox worker)
+                push_topics.schedule_sync(current_user_id)
+            db_instance.session.commit()
             
             return jsonify({
                 'success': True,
@@ -122,6 +164,8 @@ def init_notification_routes(oauth_service, firebase_service):
             ).first()
             
             if token:
+                if push_topics and token.topics:
+                    push_topics.schedule_sync(current_user_id, released={token.fcm_token: token.topics})
                 db_instance.session.delete(token)
                 db_instance.session.commit()
             
@@ -142,6 +186,7 @@ def init_notification_routes(oauth_service, firebase_service):
         """Get user notifications"""
         try:
             unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+            cursor, limit = get_pagination_args()
             
             db_instance = get_db()
             query = db_instance.session.query(NotificationModel).filter_by(user_id=current_user_id)
@@ -149,21 +194,159 @@ def init_notification_routes(oauth_service, firebase_service):
             if unread_only:
                 query = query.filter_by(read=False)
             
-            notifications_list = query.order_by(NotificationModel.created_at.desc()).all()
+            notifications_list, next_cursor = paginate_keyset(query, NotificationModel, cursor, limit)
             notifications = [n.to_dict() for n in notifications_list]
             
             return jsonify({
                 'success': True,
                 'notifications': notifications,
-                'count': len(notifications)
+                'count': len(notifications),
+                'nextCursor': next_cursor
             }), 200
             
+        except InvalidCursorError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Failed to get notifications: {str(e)}'
             }), 500
     
+    @notifications_bp.route('/unread-count', methods=['GET'])
+    @oauth_service.token_required
+    def get_unread_count(current_user_id, current_user_email, current_user_role):
+        """Unread notification count for the badge (one counter row lookup)"""
+        try:
+            return jsonify({
+                'success': True,
+                'unread': notification_counters.unread_count(current_user_id)
+            }), 200
+            
+        except Exception as e:
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Failed to get unread count: {str(e)}'
+            }), 500
+    
+    @notifications_bp.route('/stream/ticket', methods=['POST'])
+    @oauth_service.token_required
+    def create_stream_ticket(current_user_id, current_user_email, current_user_role):
+        """Single-use ticket for opening the notification stream with EventSource"""
+        return jsonify({
+            'success': True,
+            'ticket': oauth_service.generate_stream_ticket(current_user_id),
+            'expiresIn': current_app.config.get('NOTIFICATION_STREAM_TICKET_SECONDS', 30)
+        }), 200
+    
+    @notifications_bp.route('/stream', methods=['GET'])
+    def stream_notifications():
+        """
+        Push new notifications as they are created (Server-Sent Events)
+        
+        EventSource cannot set headers, so instead of the access token it passes
+        ?ticket= from POST /stream/ticket (URLs are logged; tickets are single-use
+        and expire within seconds). Events: `ready` (unread count), `notification`
+        (id = notification id; a reconnect passes it as Last-Event-ID or
+        ?lastEventId= and missed ones are replayed). The server ends the stream
+        after NOTIFICATION_STREAM_MAX_SECONDS and the client reconnects with a
+        new ticket, which re-checks the login.
+        """
+        token = request.headers.get('Authorization', '')
+        ticket = request.args.get('ticket', '')
+        if token.startswith('Bearer '):
+            claims = oauth_service.verify_token(token[7:])
+        else:
+            claims = oauth_service.redeem_stream_ticket(ticket) if ticket else None
+        if not claims:
+            return jsonify({
+                'success': False,
+                'message': 'Token is invalid or expired' if token or ticket else 'Token is missing'
+            }), 401
+        if notification_stream is None:
+            return jsonify({
+                'success': False,
+                'message': 'Notification stream is not available'
+            }), 503
+        
+        user_id = claims.get('user_id')
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId', '')
+        heartbeat = current_app.config.get('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15)
+        max_seconds = current_app.config.get('NOTIFICATION_STREAM_MAX_SECONDS', 300)
+        
+        # Subscribe before reading missed rows so nothing created in between is lost
+        subscription = notification_stream.subscribe(user_id)
+        try:
+            db_instance = get_db()
+            missed = []
+            if last_event_id.isdigit():
+                missed = [n.to_dict() for n in db_instance.session.query(NotificationModel).filter(
+                    NotificationModel.user_id == user_id,
+                    NotificationModel.id > int(last_event_id)
+                ).order_by(NotificationModel.id).limit(current_app.config.get('PAGINATION_MAX_LIMIT', 200))]
+            unread = notification_counters.unread_count(user_id) if notification_counters else None
+            # The stream stays open for minutes: give the DB connection back first
+            db_instance.session.close()
+        except Exception as e:
+            notification_stream.unsubscribe(user_id, subscription)
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Failed to open notification stream: {str(e)}'
+            }), 500
+        
+        def sse(payload, event=None, event_id=None):
+            prefix = f'event: {event}\n' if event else ''
+            if event_id is not None:
+                prefix += f'id: {event_id}\n'
+            return f'{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n'
+        
+        def load(notification_id):
+            # Payload was too large for NOTIFY; read the row
+            db_instance = get_db()
+            notification = db_instance.session.get(NotificationModel, notification_id)
+            result = notification.to_dict() if notification else None
+            db_instance.session.close()
+            return result
+        
+        def generate():
+            try:
+                yield sse({'unread': unread}, event='ready')
+                sent = set()
+                for notification in missed:
+                    sent.add(notification['id'])
+                    yield sse(notification, event='notification', event_id=notification['id'])
+                deadline = time.monotonic() + max_seconds
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    try:
+                        payload = subscription.get(timeout=min(heartbeat, remaining))
+                    except queue.Empty:
+                        # Keeps proxies from closing an idle connection
+                        yield ': keepalive\n\n'
+                        continue
+                    notification = payload.get('notification') or load(payload.get('id'))
+                    if notification is None or notification['id'] in sent:
+                        continue
+                    sent.add(notification['id'])
+                    yield sse(notification, event='notification', event_id=notification['id'])
+            finally:
+                notification_stream.unsubscribe(user_id, subscription)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'  # Don't let proxies buffer the stream
+            }
+        )
+    
     @notifications_bp.route('/<int:notification_id>/read', methods=['PUT'])
     @oauth_service.token_required
     def mark_notification_read(current_user_id, current_user_email, current_user_role, notification_id):
@@ -197,6 +380,84 @@ def init_notification_routes(oauth_service, firebase_service):
                 'message': f'Failed to mark notification as read: {str(e)}'
             }), 500
     
+    @notifications_bp.route('/read', methods=['PUT'])
+    @oauth_service.token_required
+    def mark_notifications_read(current_user_id, current_user_email, current_user_role):
+        """Mark many notifications as read with one UPDATE (ids, before timestamp, or all)"""
+        try:
+            conditions, error = parse_bulk_selection(request.get_json(silent=True))
+            if error:
+                return jsonify({
+                    'success': False,
+                    'message': error
+                }), 400
+            
+            db_instance = get_db()
+            updated = db_instance.session.query(NotificationModel).filter(
+                NotificationModel.user_id == current_user_id,
+                NotificationModel.read.is_(False),
+                *conditions
+            ).update({'read': True}, synchronize_session=False)
+            # Only unread rows matched, so each updated row was one unread
+            if notification_counters:
+                notification_counters.adjust(current_user_id, -updated)
+            db_instance.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': f'{updated} notifications marked as read',
+                'updated': updated,
+                'unread': notification_counters.unread_count(current_user_id) if notification_counters else None
+            }), 200
+            
+        except Exception as e:
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Failed to mark notifications as read: {str(e)}'
+            }), 500
+    
+    @notifications_bp.route('/', methods=['DELETE'])
+    @oauth_service.token_required
+    def delete_notifications(current_user_id, current_user_email, current_user_role):
+        """Delete many notifications with one DELETE (ids, before timestamp, or all)"""
+        try:
+            conditions, error = parse_bulk_selection(request.get_json(silent=True))
+            if error:
+                return jsonify({
+                    'success': False,
+                    'message': error
+                }), 400
+            
+            db_instance = get_db()
+            table = NotificationModel.__table__
+            statement = delete(table).where(table.c.user_id == current_user_id, *conditions)
+            if db_instance.engine.dialect.delete_returning:
+                # RETURNING tells how many of the deleted rows were unread
+                deleted_read = [row.read for row in db_instance.session.execute(statement.returning(table.c.read))]
+                deleted = len(deleted_read)
+                if notification_counters:
+                    notification_counters.adjust(current_user_id, -sum(1 for read in deleted_read if not read))
+            else:
+                deleted = db_instance.session.execute(statement).rowcount
+                if notification_counters:
+                    notification_counters.mark_stale(current_user_id)
+            db_instance.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': f'{deleted} notifications deleted',
+                'deleted': deleted,
+                'unread': notification_counters.unread_count(current_user_id) if notification_counters else None
+            }), 200
+            
+        except Exception as e:
+            get_db().session.rollback()
+            return jsonify({
+                'success': False,
+                'message': f'Failed to delete notifications: {str(e)}'
+            }), 500
+    
     @notifications_bp.route('/send', methods=['POST'])
     @oauth_service.token_required
     def send_notification(current_user_id, current_user_email, current_user_role):
@@ -253,3 +514,61 @@ def init_notification_routes(oauth_service, firebase_service):
                 'message': f'Failed to send notification: {str(e)}'
             }), 500
 
+    @notifications_bp.route('/broadcast', methods=['POST'])
+    @oauth_service.token_required
+    def broadcast_notification(current_user_id, current_user_email, current_user_role):
+        """Push one message to an audience topic (admin only)
+        
+        Audience filters (all optional): role, faculty, favorite (faculty slug).
+        E.g. {"role": "student", "faculty": "fer"} reaches all FER students'
+        devices with a single FCM request. Push only: no inbox rows are created.
+        """
+        try:
+            if current_user_role != 'admin':
+                return jsonify({
+                    'success': False,
+                    'message': 'Unauthorized: Admin access required'
+                }), 403
+            
+            data = request.get_json()
+            
+            if not data or not data.get('title') or not data.get('body'):
+                return jsonify({
+                    'success': False,
+                    'message': 'title and body are required'
+                }), 400
+            
+            if not push_topics or not firebase_service.initialized:
+                return jsonify({
+                    'success': False,
+                    'message': 'Firebase not initialized'
+                }), 503
+            
+            topic = push_topics.audience_topic(
+                role=data.get('role'),
+                faculty=data.get('faculty'),
+                favorite=data.get('favorite')
+            )
+            # FCM data payload values must be strings
+            payload = {key: str(value) for key, value in (data.get('data') or {}).items()}
+            result = firebase_service.send_topic_notification(topic, data['title'], data['body'], payload)
+            
+            if not result.get('success'):
+                return jsonify({
+                    'success': False,
+                    'message': result.get('message'),
+                    'topic': topic
+                }), 502
+            
+            return jsonify({
+                'success': True,
+                'message': 'Broadcast sent',
+                'topic': topic,
+                'message_id': result.get('message_id')
+            }), 200
+            
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Failed to send broadcast: {str(e)}'
+            }), 500
@@ -82,6 +82,7 @@ def init_oauth_routes(oauth_service, firebase_service):
                         # Reset to student role for Google OAuth users (admin should use email/password)
                         existing_user.role = 'student'
                         db_instance.session.commit()
+                        oauth_service.invalidate_user(existing_user.id)
                         user_role = 'student'
                 else:
                     # Check if user exists by email (SQLAlchemy)
@@ -132,8 +133,8 @@ def init_oauth_routes(oauth_service, firebase_service):
                     user_email = new_user.email
                     user_role = new_user.role
                 
-                # Generate JWT token
-                token = oauth_service.generate_token(user_id, user_email, user_role)
+                # Generate access + refresh tokens
+                tokens = oauth_service.generate_token_pair(user_id, user_email, user_role)
                 
                 # Prepare user data for frontend
                 # Use DB user info if available, fallback to OAuth user_info
@@ -146,11 +147,13 @@ def init_oauth_routes(oauth_service, firebase_service):
                     'role': user_role
                 }
                 
-                # Redirect to frontend with token and user data in URL
+                # Redirect to frontend with tokens and user data in the URL fragment:
+                # unlike the query string it is not sent to servers, logged or leaked via Referer
                 import urllib.parse
                 frontend_url = request.headers.get('Origin') or request.args.get('frontend_url') or 'http://localhost:5173'
                 user_json = urllib.parse.quote(json.dumps(user_data))
-                redirect_url = f"{frontend_url}/prijava?token={token}&user={user_json}"
+                redirect_url = (f"{frontend_url}/prijava#token={urllib.parse.quote(tokens['token'])}"
+                                f"&refresh_token={urllib.parse.quote(tokens['refreshToken'])}&user={user_json}")
                 return redirect(redirect_url)
             else:
                 return jsonify({
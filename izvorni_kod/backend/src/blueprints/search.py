@@ -5,9 +5,11 @@ from typing import Optional
 try:
     from models import AssociationModel, FacultyModel
     from database import db
+    from pagination import get_pagination_args, paginate_keyset, paginate_list, InvalidCursorError
 except ImportError:
     from ..models import AssociationModel, FacultyModel
     from ..database import db
+    from ..pagination import get_pagination_args, paginate_keyset, paginate_list, InvalidCursorError
 
 search_bp = Blueprint('search', __name__, url_prefix='/api')
 
@@ -17,59 +19,18 @@ def get_db():
 
 # Note: Mock data has been migrated to database. See migrate.py for seed data.
 
+def get_search_index():
+    """Get the in-process search index registered on the current app"""
+    return current_app.extensions['search_index']
+
 def search_associations(query: str, faculty: Optional[str] = None):
     """Search associations by query and optionally filter by faculty"""
-    query_lower = query.lower()
-    results = []
-    
-    # Get all associations from database
-    db_instance = get_db()
-    associations_query = db_instance.session.query(AssociationModel)
-    
-    # Filter by faculty if specified
-    if faculty:
-        associations_query = associations_query.filter_by(faculty=faculty)
-    
-    db_associations = associations_query.all()
-    
-    for assoc in db_associations:
-        assoc_dict = assoc.to_dict()
-        # Search in name, description, tags
-        name_match = query_lower in assoc_dict.get('name', '').lower()
-        desc_match = query_lower in assoc_dict.get('shortDescription', '').lower() or query_lower in assoc_dict.get('description', '').lower()
-        tags_match = any(query_lower in tag.lower() for tag in assoc_dict.get('tags', []))
-        
-        if name_match or desc_match or tags_match:
-            results.append(assoc_dict)
-    
-    return results
+    return get_search_index().search('associations', query, filter_value=faculty)
 
 def search_faculties(query: str, faculty: Optional[str] = None):
     """Search faculties by query"""
-    query_lower = query.lower()
-    results = []
-    
-    # Get all faculties from database
-    db_instance = get_db()
-    faculties_query = db_instance.session.query(FacultyModel)
-    
     # Filter by faculty abbreviation if specified (for filtering by user's faculty)
-    if faculty:
-        faculties_query = faculties_query.filter_by(abbreviation=faculty)
-    
-    db_faculties = faculties_query.all()
-    
-    for fac in db_faculties:
-        fac_dict = fac.to_dict()
-        # Search in name, abbreviation
-        name_match = query_lower in fac_dict.get('name', '').lower()
-        abbrev_match = query_lower in fac_dict.get('abbreviation', '').lower()
-        address_match = query_lower in fac_dict.get('contacts', {}).get('address', '').lower() if fac_dict.get('contacts') else False
-        
-        if name_match or abbrev_match or address_match:
-            results.append(fac_dict)
-    
-    return results
+    return get_search_index().search('faculties', query, filter_value=faculty)
 
 @search_bp.route('/search', methods=['GET'])
 def search_all():
@@ -101,9 +62,10 @@ def search_all():
 
 @search_bp.route('/associations', methods=['GET'])
 def get_associations():
-    """Get all associations, optionally filtered by faculty and search query"""
+    """Get associations (cursor paginated), optionally filtered by faculty and search query"""
     faculty = request.args.get('faculty', '').strip() or None
     query = request.args.get('q', '').strip() or None
+    cursor, limit = get_pagination_args()
     
     # Get associations from database
     db_instance = get_db()
@@ -114,16 +76,25 @@ def get_associations():
         associations_query = associations_query.filter_by(faculty=faculty)
     
     # Search by query
-    if query:
-        results = search_associations(query, faculty)
-    else:
-        db_associations = associations_query.all()
-        results = [assoc.to_dict() for assoc in db_associations]
+    try:
+        if query:
+            results, next_cursor = paginate_list(search_associations(query, faculty), cursor, limit)
+        else:
+            db_associations, next_cursor = paginate_keyset(
+                associations_query, AssociationModel, cursor, limit, unpaginated_order=(AssociationModel.id,)
+            )
+            results = [assoc.to_dict() for assoc in db_associations]
+    except InvalidCursorError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     
     return jsonify({
         'success': True,
         'count': len(results),
-        'items': results
+        'items': results,
+        'nextCursor': next_cursor
     }), 200
 
 @search_bp.route('/associations/<slug>', methods=['GET'])
@@ -145,21 +116,32 @@ def get_association(slug):
 
 @search_bp.route('/faculties', methods=['GET'])
 def get_faculties():
-    """Get all faculties, optionally filtered by search query"""
+    """Get faculties (cursor paginated), optionally filtered by search query"""
     query = request.args.get('q', '').strip() or None
+    cursor, limit = get_pagination_args()
     
     # Get faculties from database
     db_instance = get_db()
-    if query:
-        results = search_faculties(query)
-    else:
-        db_faculties = db_instance.session.query(FacultyModel).all()
-        results = [fac.to_dict() for fac in db_faculties]
+    try:
+        if query:
+            results, next_cursor = paginate_list(search_faculties(query), cursor, limit)
+        else:
+            faculties_query = db_instance.session.query(FacultyModel)
+            db_faculties, next_cursor = paginate_keyset(
+                faculties_query, FacultyModel, cursor, limit, unpaginated_order=(FacultyModel.id,)
+            )
+            results = [fac.to_dict() for fac in db_faculties]
+    except InvalidCursorError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     
     return jsonify({
         'success': True,
         'count': len(results),
-        'items': results
+        'items': results,
+        'nextCursor': next_cursor
     }), 200
 
 @search_bp.route('/faculties/<slug>', methods=['GET'])
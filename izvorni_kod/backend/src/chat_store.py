@@ -0,0 +1,174 @@
+"""
+Database-backed chatbot conversation store
+Sessions live in chat_sessions, messages are appended to chat_messages, so
+history is shared by every worker and reads are one indexed page query.
+Idle sessions expire after CHATBOT_SESSION_TTL_SECONDS and are purged lazily.
+"""
+from datetime import datetime, timedelta
+import time
+import uuid
+
+from sqlalchemy import inspect as sa_inspect
+
+try:
+    from .models import ChatSessionModel, ChatMessageModel
+except ImportError:
+    from models import ChatSessionModel, ChatMessageModel  # type: ignore
+# Same import order as the blueprints, so they catch this module's InvalidCursorError
+try:
+    from pagination import encode_cursor, decode_cursor, InvalidCursorError
+except ImportError:
+    from .pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+
+class ChatStore:
+    """Persistent chatbot sessions with append-only history and TTL eviction"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._last_purge = 0.0
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize chat store with Flask app"""
+        self.app = app
+        app.extensions['chat_store'] = self
+        self.ttl = timedelta(seconds=app.config.get('CHATBOT_SESSION_TTL_SECONDS', 7 * 24 * 3600))
+        self.purge_interval = app.config.get('CHATBOT_SESSION_PURGE_INTERVAL_SECONDS', 3600)
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    def create_session(self, user_id=None, session_id=None):
+        """Create and commit a new session; returns the ChatSessionModel"""
+        self.maybe_purge()
+        chat_session = ChatSessionModel(
+            id=session_id or str(uuid.uuid4()),
+            user_id=user_id,
+            expires_at=datetime.utcnow() + self.ttl
+        )
+        db_session = self._session()
+        db_session.add(chat_session)
+        db_session.commit()
+        return chat_session
+
+    def get_session(self, session_id):
+        """Get a live session, or None if it does not exist or has expired"""
+        if not session_id:
+            return None
+        chat_session = self._session().get(ChatSessionModel, session_id)
+        if chat_session is None or chat_session.is_expired():
+            return None
+        return chat_session
+
+    def add_messages(self, chat_session, messages):
+        """
+        Append messages to a session and extend its TTL (one commit)
+
+        Args:
+            chat_session: ChatSessionModel from get_session/create_session (attached or released)
+            messages: List of (role, message, provider) tuples
+        """
+        db_session = self._session()
+        # Re-attach a session handed to release()
+        db_session.add(chat_session)
+        for role, message, provider in messages:
+            db_session.add(ChatMessageModel(
+                session_id=chat_session.id,
+                role=role,
+                message=message,
+                provider=provider
+            ))
+        now = datetime.utcnow()
+        chat_session.updated_at = now
+        chat_session.expires_at = now + self.ttl
+        db_session.commit()
+
+    def release(self, chat_session):
+        """
+        Detach a session and return the DB connection to the pool
+
+        Call before a slow upstream request (chatbot provider) so the pooled
+        connection is not held for its whole duration; add_messages re-attaches
+        the session afterwards.
+        """
+        db_session = self._session()
+        if sa_inspect(chat_session).expired_attributes:
+            db_session.refresh(chat_session)
+        db_session.close()
+
+    def history(self, chat_session, cursor=None, limit=50):
+        """
+        One page of a session's messages, oldest first
+
+        The first page holds the most recent `limit` messages; `nextCursor`
+        pages backwards through older ones.
+
+        Returns:
+            tuple: (list of message dicts, next cursor or None)
+        """
+        query = self._session().query(ChatMessageModel).filter(
+            ChatMessageModel.session_id == chat_session.id
+        )
+        if cursor:
+            payload = decode_cursor(cursor)
+            try:
+                before_id = int(payload['i'])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursorError('Invalid cursor')
+            query = query.filter(ChatMessageModel.id < before_id)
+
+        query = query.order_by(ChatMessageModel.id.desc())
+        # limit=None: the whole history (unpaginated request)
+        rows = query.all() if limit is None else query.limit(limit + 1).all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({'i': rows[-1].id})
+        messages = [row.to_dict() for row in reversed(rows)]
+
+        # Sessions created before chat_messages existed kept history inline
+        if next_cursor is None and chat_session.messages:
+            messages = list(chat_session.messages) + messages
+        return messages, next_cursor
+
+    def delete_session(self, chat_session):
+        """Delete a session and all of its messages"""
+        db_session = self._session()
+        db_session.query(ChatMessageModel).filter(
+            ChatMessageModel.session_id == chat_session.id
+        ).delete(synchronize_session=False)
+        db_session.delete(chat_session)
+        db_session.commit()
+
+    def purge_expired(self):
+        """Delete every expired session and its messages; returns the session count"""
+        db_session = self._session()
+        now = datetime.utcnow()
+        expired_ids = db_session.query(ChatSessionModel.id).filter(
+            ChatSessionModel.expires_at <= now
+        )
+        db_session.query(ChatMessageModel).filter(
+            ChatMessageModel.session_id.in_(expired_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        count = db_session.query(ChatSessionModel).filter(
+            ChatSessionModel.expires_at <= now
+        ).delete(synchronize_session=False)
+        db_session.commit()
+        return count
+
+    def maybe_purge(self):
+        """Purge expired sessions at most once per purge interval per process"""
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        try:
+            count = self.purge_expired()
+            if count:
+                print(f"🧹 Purged {count} expired chatbot sessions")
+        except Exception as e:
+            self._session().rollback()
+            print(f"Warning: Failed to purge expired chatbot sessions: {str(e)}")
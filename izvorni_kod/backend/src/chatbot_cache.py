@@ -0,0 +1,166 @@
+"""
+Response cache for chatbot providers
+Repeated FAQ-style questions are answered from memory instead of calling the
+external API. Keys are (provider, normalized message); entries expire after a
+TTL and the least recently used entry is evicted when the cache is full.
+Optionally, paraphrases hit the cache through character-trigram Jaccard
+similarity, which tolerates Croatian inflection ("prijavu" / "prijave").
+"""
+from collections import OrderedDict, defaultdict
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from .search_index import tokenize
+except ImportError:
+    from search_index import tokenize  # type: ignore
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, strip diacritics and punctuation, collapse whitespace"""
+    return ' '.join(tokenize(message))
+
+
+def shingles(normalized: str) -> frozenset:
+    """Character trigrams of each word of a normalized message (word boundaries padded)"""
+    result = set()
+    for word in normalized.split():
+        padded = f' {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+class _Entry:
+    __slots__ = ('response', 'expires_at', 'shingles')
+
+    def __init__(self, response, expires_at, entry_shingles):
+        self.response = response
+        self.expires_at = expires_at
+        self.shingles = entry_shingles
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache of successful chatbot responses"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600,
+                 similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # 0 disables near-duplicate matching; ~0.75 lets light paraphrases hit
+        # while questions that only share wording ("rok za prijavu na ...") miss
+        self.similarity_threshold = similarity_threshold
+        self._entries: 'OrderedDict[Tuple[str, str], _Entry]' = OrderedDict()
+        # (provider, shingle) -> keys containing it, for similarity candidates
+        self._shingle_index = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, provider_name: str, message: str) -> Optional[Dict]:
+        """Cached response for the message (or a close paraphrase), else None"""
+        normalized = normalize_message(message)
+        if not normalized:
+            return None
+        key = (provider_name, normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+
+            if self.similarity_threshold > 0:
+                similar_key = self._find_similar(provider_name, shingles(normalized), now)
+                if similar_key is not None:
+                    self._entries.move_to_end(similar_key)
+                    self.similar_hits += 1
+                    return self._entries[similar_key].response
+
+            self.misses += 1
+            return None
+
+    def put(self, provider_name: str, message: str, response: Dict):
+        """Store a successful response"""
+        normalized = normalize_message(message)
+        if not normalized:
+            return
+        key = (provider_name, normalized)
+        entry_shingles = shingles(normalized)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(response, time.monotonic() + self.ttl_seconds, entry_shingles)
+            for shingle in entry_shingles:
+                self._shingle_index[(provider_name, shingle)].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._shingle_index.clear()
+
+    def stats(self) -> Dict:
+        """Hit-rate metrics for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'similarity_threshold': self.similarity_threshold,
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        provider_name = key[0]
+        for shingle in entry.shingles:
+            keys = self._shingle_index.get((provider_name, shingle))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._shingle_index[(provider_name, shingle)]
+
+    def _find_similar(self, provider_name, query_shingles, now):
+        """Best live entry with Jaccard similarity >= threshold (caller holds the lock)"""
+        overlaps = defaultdict(int)
+        for shingle in query_shingles:
+            for key in self._shingle_index.get((provider_name, shingle), ()):
+                overlaps[key] += 1
+
+        best_key, best_score = None, self.similarity_threshold
+        for key, overlap in overlaps.items():
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            score = overlap / (len(query_shingles) + len(entry.shingles) - overlap)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
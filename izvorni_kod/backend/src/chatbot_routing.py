@@ -0,0 +1,222 @@
+"""
+Latency-aware routing for chatbot providers
+Tracks per-provider latency and error rate (EWMA), opens a circuit breaker on
+providers that keep failing, and can hedge a slow request by firing the same
+message at the next provider after the preferred one's p95 latency, returning
+whichever successful answer arrives first.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderHealth:
+    """EWMA latency/error statistics and circuit breaker for one provider"""
+
+    def __init__(self, alpha=0.2, failure_threshold=5, error_rate_threshold=0.5,
+                 min_samples=10, cooldown_seconds=30.0, clock=time.monotonic):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+
+        self.ewma_latency = None  # seconds
+        self.ewma_error_rate = 0.0
+        self.samples = 0
+        self.latencies = deque(maxlen=200)  # successful calls, for p95
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a call may go out now (one probe at a time while half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """Open and still cooling down (a half-open probe would be allowed otherwise)"""
+        with self._lock:
+            return self.state == OPEN and self.clock() - self.opened_at < self.cooldown_seconds
+
+    def record(self, latency: float, success: bool):
+        """Fold one finished call into the statistics and breaker state"""
+        with self._lock:
+            self.samples += 1
+            error = 0.0 if success else 1.0
+            self.ewma_error_rate += self.alpha * (error - self.ewma_error_rate)
+            if success:
+                self.latencies.append(latency)
+                if self.ewma_latency is None:
+                    self.ewma_latency = latency
+                else:
+                    self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                self._probe_in_flight = False
+                return
+
+            self.consecutive_failures += 1
+            tripped = (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+                or (self.samples >= self.min_samples and self.ewma_error_rate >= self.error_rate_threshold)
+            )
+            if tripped and self.state != OPEN:
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self._probe_in_flight = False
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency of recent successful calls (None until min_samples)"""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self) -> float:
+        """Lower is better: expected latency inflated by the error rate"""
+        latency = self.ewma_latency if self.ewma_latency is not None else 0.0
+        return latency * (1 + 4 * self.ewma_error_rate)
+
+    def stats(self) -> Dict:
+        p95 = self.p95()
+        return {
+            'state': self.state,
+            'ewma_latency_ms': round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            'p95_latency_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'ewma_error_rate': round(self.ewma_error_rate, 4),
+            'consecutive_failures': self.consecutive_failures,
+            'samples': self.samples
+        }
+
+
+class ProviderRouter:
+    """Runs provider calls with failover, hedging and per-provider health tracking"""
+
+    def __init__(self, hedging=True, hedge_default_delay=1.0, hedge_min_delay=0.05,
+                 max_workers=16, clock=time.monotonic, **health_options):
+        self.hedging = hedging
+        self.clock = clock
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.health_options = health_options
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chatbot-route')
+
+    def health(self, provider_name: str) -> ProviderHealth:
+        with self._lock:
+            if provider_name not in self._health:
+                self._health[provider_name] = ProviderHealth(clock=self.clock, **self.health_options)
+            return self._health[provider_name]
+
+    def order(self, preferred: str, candidates: List[str]) -> List[str]:
+        """Preferred provider first (unless its circuit is open), the rest by score"""
+        others = sorted(
+            (name for name in candidates if name != preferred),
+            key=lambda name: self.health(name).score()
+        )
+        if preferred not in candidates:
+            return others
+        if self.health(preferred).is_open():
+            return others + [preferred]
+        return [preferred] + others
+
+    def hedge_delay(self, provider_name: str) -> float:
+        p95 = self.health(provider_name).p95()
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    def call(self, order: List[str], invoke: Callable[[str], Dict]) -> Tuple[Optional[Dict], Optional[str], bool]:
+        """
+        Call providers in `order` until one succeeds
+
+        The first provider is called right away. If it has not answered after
+        its p95 latency the next one is hedged in parallel; if it fails the next
+        one is called immediately. Providers with an open circuit are skipped.
+
+        Returns:
+            tuple: (response dict or None if no provider was allowed,
+                    name of the provider that produced it, whether a hedge was sent)
+        """
+        pending = list(order)
+        in_flight = {}
+
+        def launch_next():
+            while pending:
+                name = pending.pop(0)
+                health = self.health(name)
+                if not health.allow_request():
+                    continue
+                started = self.clock()
+                future = self._executor.submit(invoke, name)
+                future.add_done_callback(
+                    lambda f, h=health, s=started: h.record(self.clock() - s, self._succeeded(f))
+                )
+                in_flight[future] = name
+                return name
+            return None
+
+        first = launch_next()
+        if first is None:
+            return None, None, False
+
+        hedged = False
+        hedge_at = self.hedge_delay(first) if self.hedging else None
+        last_response, last_name = None, first
+
+        while in_flight:
+            done, _ = wait(list(in_flight), timeout=hedge_at, return_when=FIRST_COMPLETED)
+            if not done:
+                # Preferred provider is slower than usual: race the next one
+                hedge_at = None
+                if launch_next() is not None:
+                    hedged = True
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                response = self._result(future)
+                if response.get('success'):
+                    # Losers keep running in the pool; their outcome still updates health
+                    return response, name, hedged
+                last_response, last_name = response, name
+
+            if not in_flight:
+                # Everything in flight failed: fail over to the next provider
+                launch_next()
+
+        return last_response, last_name, hedged
+
+    def stats(self) -> Dict:
+        with self._lock:
+            names = list(self._health)
+        return {name: self.health(name).stats() for name in names}
+
+    @staticmethod
+    def _succeeded(future) -> bool:
+        return future.exception() is None and bool(future.result().get('success'))
+
+    @staticmethod
+    def _result(future) -> Dict:
+        if future.exception() is not None:
+            return {'success': False, 'error': str(future.exception())}
+        return future.result()
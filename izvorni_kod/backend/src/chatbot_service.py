@@ -4,10 +4,41 @@ Supports integration with various chatbot providers and external services
 """
 from flask import Flask, session
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Union, Iterator
 from abc import ABC, abstractmethod
 
+try:
+    from .chatbot_cache import ResponseCache
+    from .chatbot_routing import ProviderRouter
+except ImportError:
+    from chatbot_cache import ResponseCache  # type: ignore
+    from chatbot_routing import ProviderRouter  # type: ignore
+
+# (connect, read) seconds, or a single number for both
+Timeout = Union[float, Tuple[float, float]]
+
+def create_http_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool
+    
+    Reusing the session skips the TCP + TLS handshake on every message after
+    the first one to each host. `pool_size` bounds the open connections per host.
+    """
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    http.mount('https://', adapter)
+    http.mount('http://', adapter)
+    return http
+
+def reply_text(response: Dict) -> str:
+    """Reply text of a successful provider response (providers nest it differently)"""
+    body = response.get('response') or {}
+    if not isinstance(body, dict):
+        return str(body)
+    return body.get('message') or body.get('response') or ''
+
 class ChatbotProvider(ABC):
     """Abstract base class for chatbot providers"""
     
@@ -20,14 +51,32 @@ class ChatbotProvider(ABC):
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         """Get conversation history for a session"""
         pass
+    
+    def stream_message(self, message: str, context: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Yield the response text in chunks as it is generated
+        
+        The default sends the message normally and yields the whole reply as one
+        chunk; providers that can forward partial output override this.
+        
+        Raises:
+            RuntimeError: If the provider returns an error
+        """
+        response = self.send_message(message, context)
+        if not response.get('success'):
+            raise RuntimeError(response.get('error', 'Unknown error'))
+        yield reply_text(response)
 
 class SmotraUnizgChatbot(ChatbotProvider):
     """Integration with Smotra UNIZG chatbot"""
     
-    def __init__(self, api_key: str, base_url: str = "https://smotra.unizg.hr"):
+    def __init__(self, api_key: str, base_url: str = "https://smotra.unizg.hr",
+                 http_session: Optional[requests.Session] = None, timeout: Timeout = 10):
         self.api_key = api_key
         self.base_url = base_url
         self.api_endpoint = f"{base_url}/api/chatbot"  # Adjust based on actual API
+        self.http = http_session or create_http_session()
+        self.timeout = timeout
     
     def send_message(self, message: str, context: Optional[Dict] = None) -> Dict:
         """Send message to Smotra chatbot"""
@@ -42,11 +91,11 @@ class SmotraUnizgChatbot(ChatbotProvider):
                 'context': context or {}
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_endpoint,
                 headers=headers,
                 json=payload,
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -76,10 +125,10 @@ class SmotraUnizgChatbot(ChatbotProvider):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = self.http.get(
                 f"{self.api_endpoint}/history/{session_id}",
                 headers=headers,
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -92,10 +141,13 @@ class SmotraUnizgChatbot(ChatbotProvider):
 class CareerDevelopmentOfficeChatbot(ChatbotProvider):
     """Integration with Ured za razvoj karijera chatbot"""
     
-    def __init__(self, api_key: str, base_url: str = "https://www.unizg.hr"):
+    def __init__(self, api_key: str, base_url: str = "https://www.unizg.hr",
+                 http_session: Optional[requests.Session] = None, timeout: Timeout = 10):
         self.api_key = api_key
         self.base_url = base_url
         self.api_endpoint = f"{base_url}/o-sveucilistu/sveucilisna-tijela-i-sluzbe/rektorat/ured-za-razvoj-karijera/api/chatbot"
+        self.http = http_session or create_http_session()
+        self.timeout = timeout
     
     def send_message(self, message: str, context: Optional[Dict] = None) -> Dict:
         """Send message to Career Development Office chatbot"""
@@ -112,11 +164,11 @@ class CareerDevelopmentOfficeChatbot(ChatbotProvider):
                 'source': 'career_hub'
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_endpoint,
                 headers=headers,
                 json=payload,
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -146,10 +198,10 @@ class CareerDevelopmentOfficeChatbot(ChatbotProvider):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = self.http.get(
                 f"{self.api_endpoint}/history/{session_id}",
                 headers=headers,
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -162,10 +214,13 @@ class CareerDevelopmentOfficeChatbot(ChatbotProvider):
 class OpenAIChatbot(ChatbotProvider):
     """Generic OpenAI-compatible chatbot provider"""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", base_url: Optional[str] = None):
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", base_url: Optional[str] = None,
+                 http_session: Optional[requests.Session] = None, timeout: Timeout = 30):
         self.api_key = api_key
         self.model = model
         self.base_url = base_url or "https://api.openai.com/v1"
+        self.http = http_session or create_http_session()
+        self.timeout = timeout
     
     def send_message(self, message: str, context: Optional[Dict] = None) -> Dict:
         """Send message using OpenAI-compatible API"""
@@ -185,11 +240,11 @@ class OpenAIChatbot(ChatbotProvider):
                 'max_tokens': 500
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -216,6 +271,54 @@ class OpenAIChatbot(ChatbotProvider):
                 'provider': 'openai'
             }
     
+    def stream_message(self, message: str, context: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Stream a completion (`stream: true`), yielding content deltas as they arrive
+        
+        Raises:
+            RuntimeError: If the API does not return 200
+        """
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        }
+        
+        messages = context.get('messages', []) if context else []
+        messages.append({'role': 'user', 'content': message})
+        
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'temperature': 0.7,
+            'max_tokens': 500,
+            'stream': True
+        }
+        
+        with self.http.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f'API returned status {response.status_code}')
+            
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-sent events: "data: {...}" lines, blank separators, "data: [DONE]"
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                choices = chunk.get('choices') or []
+                if choices:
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+    
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         """OpenAI doesn't store history, return empty"""
         return []
@@ -226,19 +329,52 @@ class ChatbotService:
     def __init__(self, app=None):
         self.app = None
         self.providers: Dict[str, ChatbotProvider] = {}
+        self.cache = ResponseCache(max_entries=0)
+        self.cache_providers = set()
+        self.router: Optional[ProviderRouter] = None
+        self.routing_group: List[str] = []
         if app:
             self.init_app(app)
     
     def init_app(self, app: Flask):
         """Initialize chatbot service with Flask app"""
         self.app = app
+        app.extensions['chatbot_service'] = self
+        
+        # Response cache for repeated FAQ questions (per process)
+        self.cache = ResponseCache(
+            max_entries=app.config.get('CHATBOT_CACHE_MAX_ENTRIES', 1000),
+            ttl_seconds=app.config.get('CHATBOT_CACHE_TTL_SECONDS', 3600),
+            similarity_threshold=app.config.get('CHATBOT_CACHE_SIMILARITY', 0.0)
+        )
+        self.cache_providers = set(app.config.get('CHATBOT_CACHE_PROVIDERS', ['smotra', 'career_office']))
+        
+        # Latency-aware routing with circuit breakers and hedged requests
+        if app.config.get('CHATBOT_ROUTING_ENABLED', False):
+            self.router = ProviderRouter(
+                hedging=app.config.get('CHATBOT_HEDGING_ENABLED', True),
+                hedge_default_delay=app.config.get('CHATBOT_HEDGE_DEFAULT_DELAY', 1.0),
+                hedge_min_delay=app.config.get('CHATBOT_HEDGE_MIN_DELAY', 0.05),
+                max_workers=app.config.get('CHATBOT_ROUTING_MAX_WORKERS', 16),
+                alpha=app.config.get('CHATBOT_EWMA_ALPHA', 0.2),
+                failure_threshold=app.config.get('CHATBOT_BREAKER_FAILURE_THRESHOLD', 5),
+                error_rate_threshold=app.config.get('CHATBOT_BREAKER_ERROR_RATE', 0.5),
+                cooldown_seconds=app.config.get('CHATBOT_BREAKER_COOLDOWN_SECONDS', 30)
+            )
+            self.routing_group = app.config.get('CHATBOT_ROUTING_GROUP', ['smotra', 'career_office'])
+        
+        # Each provider gets its own keep-alive connection pool
+        pool_size = app.config.get('CHATBOT_HTTP_POOL_SIZE', 10)
+        connect_timeout = app.config.get('CHATBOT_CONNECT_TIMEOUT', 3.05)
         
         # Initialize Smotra UNIZG chatbot if API key is configured
         smotra_api_key = app.config.get('SMOTRA_CHATBOT_API_KEY')
         if smotra_api_key:
             self.providers['smotra'] = SmotraUnizgChatbot(
                 api_key=smotra_api_key,
-                base_url=app.config.get('SMOTRA_BASE_URL', 'https://smotra.unizg.hr')
+                base_url=app.config.get('SMOTRA_BASE_URL', 'https://smotra.unizg.hr'),
+                http_session=create_http_session(pool_size),
+                timeout=(connect_timeout, app.config.get('SMOTRA_TIMEOUT', 10))
             )
         
         # Initialize Career Development Office chatbot if API key is configured
@@ -246,7 +382,9 @@ class ChatbotService:
         if career_api_key:
             self.providers['career_office'] = CareerDevelopmentOfficeChatbot(
                 api_key=career_api_key,
-                base_url=app.config.get('CAREER_OFFICE_BASE_URL', 'https://www.unizg.hr')
+                base_url=app.config.get('CAREER_OFFICE_BASE_URL', 'https://www.unizg.hr'),
+                http_session=create_http_session(pool_size),
+                timeout=(connect_timeout, app.config.get('CAREER_OFFICE_TIMEOUT', 10))
             )
         
         # Initialize OpenAI-compatible chatbot if API key is configured
@@ -256,7 +394,9 @@ class ChatbotService:
             self.providers['openai'] = OpenAIChatbot(
                 api_key=openai_api_key,
                 model=app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
-                base_url=openai_base_url if openai_base_url else None
+                base_url=openai_base_url if openai_base_url else None,
+                http_session=create_http_session(pool_size),
+                timeout=(connect_timeout, app.config.get('OPENAI_TIMEOUT', 30))
             )
     
     def get_provider(self, provider_name: str) -> Optional[ChatbotProvider]:
@@ -268,7 +408,8 @@ class ChatbotService:
         return list(self.providers.keys())
     
     def send_message(self, message: str, provider_name: str = 'smotra', 
-                    context: Optional[Dict] = None, session_id: Optional[str] = None) -> Dict:
+                    context: Optional[Dict] = None, session_id: Optional[str] = None,
+                    first_turn: bool = False) -> Dict:
         """
         Send a message to the specified chatbot provider
         
@@ -277,6 +418,7 @@ class ChatbotService:
             provider_name: Name of the provider ('smotra', 'career_office', 'openai')
             context: Additional context for the conversation
             session_id: Session ID for conversation tracking
+            first_turn: The session has no earlier messages (required for caching)
             
         Returns:
             Dict with response from chatbot
@@ -297,7 +439,108 @@ class ChatbotService:
         if session_id:
             context['session_id'] = session_id
         
-        return provider.send_message(message, context)
+        cacheable = self._is_cacheable(provider_name, context, first_turn)
+        if cacheable:
+            cached = self.cache.get(provider_name, message)
+            if cached is not None:
+                return {**cached, 'cached': True}
+        
+        if self.router is not None:
+            response = self._send_routed(message, provider_name, context)
+        else:
+            response = provider.send_message(message, context)
+        # A failover answer came from another provider: don't file it under this one
+        if cacheable and response.get('success') and response.get('routed_to') in (None, provider_name):
+            self.cache.put(provider_name, message, response)
+        return response
+    
+    def _send_routed(self, message: str, provider_name: str, context: Dict) -> Dict:
+        """
+        Send through the router: skip providers with an open circuit, hedge to
+        the next provider in the routing group when the preferred one is slow,
+        and fail over when it errors
+        """
+        candidates = [provider_name]
+        if provider_name in self.routing_group:
+            candidates += [name for name in self.routing_group
+                           if name != provider_name and name in self.providers]
+        
+        response, routed_to, hedged = self.router.call(
+            self.router.order(provider_name, candidates),
+            # Each attempt gets its own context copy; providers may mutate it
+            lambda name: self.providers[name].send_message(message, dict(context))
+        )
+        if response is None:
+            return {
+                'success': False,
+                'error': f'Provider "{provider_name}" is temporarily unavailable',
+                'provider': provider_name
+            }
+        return {**response, 'routed_to': routed_to, 'hedged': hedged}
+    
+    def get_routing_stats(self) -> Dict:
+        """Per-provider latency, error rate and circuit state (empty when routing is off)"""
+        return self.router.stats() if self.router is not None else {}
+    
+    def stream_message(self, message: str, provider_name: str = 'openai',
+                       context: Optional[Dict] = None, session_id: Optional[str] = None,
+                       first_turn: bool = False) -> Iterator[str]:
+        """
+        Stream a response from the specified provider
+        
+        Providers without streaming support yield their full response as a
+        single chunk.
+        
+        Raises:
+            ValueError: If the provider is not configured
+            RuntimeError: If the provider returns an error
+        """
+        provider = self.get_provider(provider_name)
+        
+        if not provider:
+            raise ValueError(f'Provider "{provider_name}" not configured or not found')
+        
+        if context is None:
+            context = {}
+        
+        if session_id:
+            context['session_id'] = session_id
+        
+        cacheable = self._is_cacheable(provider_name, context, first_turn)
+        cached = self.cache.get(provider_name, message) if cacheable else None
+        if cached is not None:
+            yield reply_text(cached)
+            return
+        
+        chunks = []
+        for delta in provider.stream_message(message, context):
+            chunks.append(delta)
+            yield delta
+        if cacheable:
+            self.cache.put(provider_name, message, {
+                'success': True,
+                'response': {'message': ''.join(chunks)},
+                'provider': provider_name
+            })
+    
+    # Context keys that let a provider tailor the answer to the user
+    USER_CONTEXT_KEYS = ('user_id', 'user_email', 'user_role', 'messages')
+    
+    def _is_cacheable(self, provider_name: str, context: Dict, first_turn: bool) -> bool:
+        """
+        Only stateless questions to FAQ-style providers are answered from cache
+        
+        The key is just (provider, message), so the answer must not depend on who
+        asks or on earlier turns: the cached providers keep history upstream per
+        session and receive the user's identity. That leaves the first message of
+        an anonymous session.
+        """
+        return (self.cache.enabled and provider_name in self.cache_providers and first_turn
+                and not any(context.get(key) for key in self.USER_CONTEXT_KEYS))
+    
+    def get_cache_stats(self) -> Dict:
+        """Response cache metrics (hit rate, size, evictions) for this process"""
+        return self.cache.stats()
     
     def register_provider(self, name: str, provider: ChatbotProvider):
         """Register a custom chatbot provider"""
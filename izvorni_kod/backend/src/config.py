@@ -25,10 +25,86 @@ class Config:
     # Option 2: Firebase credentials as JSON string (alternative to file path)
     # Set FIREBASE_CREDENTIALS_JSON in environment if not using file path
     FIREBASE_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID', '')
+    # Multicast fan-out: chunks of up to 500 tokens sent concurrently, transient
+    # failures retried with backoff; unregistered/invalid tokens are deleted
+    FCM_FANOUT_CHUNK_SIZE = int(os.environ.get('FCM_FANOUT_CHUNK_SIZE', 500))
+    FCM_FANOUT_MAX_WORKERS = int(os.environ.get('FCM_FANOUT_MAX_WORKERS', 4))
+    FCM_FANOUT_MAX_RETRIES = int(os.environ.get('FCM_FANOUT_MAX_RETRIES', 3))
+    FCM_FANOUT_BACKOFF_SECONDS = float(os.environ.get('FCM_FANOUT_BACKOFF_SECONDS', 0.5))
+    FCM_PRUNE_INVALID_TOKENS = os.environ.get('FCM_PRUNE_INVALID_TOKENS', 'true').lower() == 'true'
+    # Prefix for role/faculty/favorite broadcast topics, when environments share a Firebase project
+    FCM_TOPIC_PREFIX = os.environ.get('FCM_TOPIC_PREFIX', '')
+    # Unread counters are maintained on every change; a periodic recount repairs drift
+    NOTIFICATION_UNREAD_RECOUNT_SECONDS = int(os.environ.get('NOTIFICATION_UNREAD_RECOUNT_SECONDS', 3600))
+    NOTIFICATION_BULK_MAX_IDS = int(os.environ.get('NOTIFICATION_BULK_MAX_IDS', 1000))
+    # GET /api/notifications/stream: pub/sub backend (auto = postgres LISTEN/NOTIFY on
+    # PostgreSQL, in-process otherwise), keepalive interval and per-connection lifetime
+    NOTIFICATION_STREAM_BACKEND = os.environ.get('NOTIFICATION_STREAM_BACKEND', 'auto')
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15))
+    NOTIFICATION_STREAM_MAX_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_MAX_SECONDS', 300))
+    NOTIFICATION_STREAM_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_STREAM_QUEUE_SIZE', 100))
+    # Lifetime of the single-use ?ticket= that EventSource opens the stream with
+    NOTIFICATION_STREAM_TICKET_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_TICKET_SECONDS', 30))
+    # Open streams per user and per worker process; beyond them 429/503 + Retry-After
+    # (gunicorn.conf.py defaults the per-worker cap to WEB_THREADS // 2 in sync mode, 500 in gevent mode)
+    NOTIFICATION_STREAM_MAX_PER_USER = int(os.environ.get('NOTIFICATION_STREAM_MAX_PER_USER', 3))
+    NOTIFICATION_STREAM_MAX_PER_WORKER = int(os.environ.get('NOTIFICATION_STREAM_MAX_PER_WORKER', 100))
+    NOTIFICATION_STREAM_RETRY_AFTER_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_RETRY_AFTER_SECONDS', 60))
     
     # JWT Configuration
-    JWT_ALGORITHM = 'HS256'
-    JWT_EXPIRATION_DAYS = 30
+    # HS256 signs with SECRET_KEY; RS256/EdDSA sign with JWT_PRIVATE_KEY_PATH (or the PEM in
+    # JWT_PRIVATE_KEY) and publish public keys at /.well-known/jwks.json
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+    JWT_PRIVATE_KEY_PATH = os.environ.get('JWT_PRIVATE_KEY_PATH', '')
+    JWT_PRIVATE_KEY = os.environ.get('JWT_PRIVATE_KEY', '')
+    # Previous keys (PEM paths, comma-separated) still accepted while their tokens are live
+    JWT_RETIRED_KEY_PATHS = os.environ.get('JWT_RETIRED_KEY_PATHS', '').split(',')
+    # Verifier-only nodes: fetch public keys from the signing API instead
+    JWT_JWKS_URL = os.environ.get('JWT_JWKS_URL', '')
+    JWT_JWKS_CACHE_SECONDS = int(os.environ.get('JWT_JWKS_CACHE_SECONDS', 300))
+    JWT_JWKS_MIN_REFRESH_SECONDS = int(os.environ.get('JWT_JWKS_MIN_REFRESH_SECONDS', 30))
+    # Access tokens are verified statelessly; refresh tokens rotate via /api/auth/refresh
+    JWT_ACCESS_TOKEN_MINUTES = int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15))
+    JWT_REFRESH_TOKEN_DAYS = int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30))
+    # A rotated refresh token presented again this soon (parallel tabs, lost response)
+    # gets another successor instead of revoking the login
+    JWT_REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.environ.get('JWT_REFRESH_TOKEN_REUSE_GRACE_SECONDS', 10))
+    # Per-process caches: verified token claims, and /api/auth/me profiles
+    # (other workers see a profile change once their entry expires)
+    JWT_CACHE_MAX_ENTRIES = int(os.environ.get('JWT_CACHE_MAX_ENTRIES', 10000))
+    JWT_CACHE_TTL_SECONDS = int(os.environ.get('JWT_CACHE_TTL_SECONDS', 300))
+    USER_PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get('USER_PROFILE_CACHE_MAX_ENTRIES', 5000))
+    USER_PROFILE_CACHE_TTL_SECONDS = int(os.environ.get('USER_PROFILE_CACHE_TTL_SECONDS', 30))
+    # Revoked tokens (logout): per-worker bloom filter over revoked_tokens, refreshed
+    # incrementally and rebuilt (dropping expired ids) every REBUILD seconds
+    TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.environ.get('TOKEN_REVOCATION_BLOOM_CAPACITY', 100000))
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('TOKEN_REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    TOKEN_REVOCATION_REFRESH_SECONDS = int(os.environ.get('TOKEN_REVOCATION_REFRESH_SECONDS', 30))
+    TOKEN_REVOCATION_REBUILD_SECONDS = int(os.environ.get('TOKEN_REVOCATION_REBUILD_SECONDS', 3600))
+    # Password hashing runs on a bounded pool per worker; when WORKERS + QUEUE_SIZE
+    # hashes are in flight, login/register answer 503 with Retry-After.
+    # Methods are werkzeug strings ("scrypt:N:r:p" or "pbkdf2:sha256:iterations");
+    # per-role overrides as "admin=scrypt:131072:8:1,employer=...". Older hashes are
+    # upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_METHODS_BY_ROLE = dict(
+        item.split('=', 1) for item in os.environ.get('PASSWORD_HASH_METHODS_BY_ROLE', '').split(',') if '=' in item
+    )
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 8))
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS', 0.5))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER_SECONDS', 2))
+    # Login/registration rate limits as "count/seconds" (sliding window; empty disables).
+    # Backend "memory" counts per worker, "database" shares rate_limit_counters
+    # between workers. TRUSTED_PROXIES: proxies in front of the app that append to
+    # X-Forwarded-For (1 on Cloud Run/Heroku), 0 to use the socket address
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))
+    RATE_LIMIT_LOGIN_PER_IP = os.environ.get('RATE_LIMIT_LOGIN_PER_IP', '30/60')
+    RATE_LIMIT_LOGIN_PER_EMAIL = os.environ.get('RATE_LIMIT_LOGIN_PER_EMAIL', '10/900')
+    RATE_LIMIT_REGISTER_PER_IP = os.environ.get('RATE_LIMIT_REGISTER_PER_IP', '10/3600')
+    RATE_LIMIT_REGISTER_PER_EMAIL = os.environ.get('RATE_LIMIT_REGISTER_PER_EMAIL', '5/3600')
     
     # CORS Configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
@@ -48,6 +124,32 @@ class Config:
         'pool_pre_ping': True
     }
     
+    # Search index: how often (seconds) a worker checks whether another worker
+    # changed associations/faculties and its in-process index must be rebuilt
+    SEARCH_INDEX_REFRESH_SECONDS = int(os.environ.get('SEARCH_INDEX_REFRESH_SECONDS', 30))
+    
+    # Job search: 'fulltext' (Postgres tsvector / SQLite FTS5) or 'like'
+    JOB_SEARCH_MODE = os.environ.get('JOB_SEARCH_MODE', 'fulltext').lower()
+    # Create full-text structures on startup (production uses: python migrate.py fts)
+    JOB_SEARCH_AUTO_INSTALL = False
+    
+    # Cursor pagination for listing endpoints (?cursor=...&limit=...); requests
+    # with neither get the whole list, as before pagination
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get('PAGINATION_DEFAULT_LIMIT', 50))
+    PAGINATION_MAX_LIMIT = int(os.environ.get('PAGINATION_MAX_LIMIT', 200))
+    
+    # Per-request SQL instrumentation (X-DB-Queries / X-DB-Time-ms headers + JSON log line)
+    QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED', 'False').lower() == 'true'
+    # Same statement shape repeated this many times in one request is reported as N+1
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_STATS_N_PLUS_ONE_THRESHOLD', 5))
+    
+    # Outbox worker (python worker.py): email/push deliveries queued by request handlers
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_POLL_INTERVAL_SECONDS', 2))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 30))  # doubles per attempt
+    OUTBOX_LOCK_TIMEOUT_SECONDS = int(os.environ.get('OUTBOX_LOCK_TIMEOUT_SECONDS', 300))
+    
     # AAI@EduHr Configuration
     # Protocol: SAML (recommended), OIDC, or CAS
     AAI_PROTOCOL = os.environ.get('AAI_PROTOCOL', 'SAML').upper()
@@ -57,6 +159,12 @@ class Config:
     AAI_LOGIN_URL = os.environ.get('AAI_LOGIN_URL', 'https://aai.fer.hr/idp/profile/SAML2/Redirect/SSO')
     AAI_LOGOUT_URL = os.environ.get('AAI_LOGOUT_URL', 'https://aai.fer.hr/idp/profile/Logout')
     AAI_METADATA_URL = os.environ.get('AAI_METADATA_URL', 'https://aai.fer.hr/idp/shibboleth')
+    # IdP metadata is refetched in the background (conditional GET) and saved for
+    # offline restarts; REFRESH_SECONDS=0 uses only the static IDP_* settings
+    AAI_METADATA_REFRESH_SECONDS = int(os.environ.get('AAI_METADATA_REFRESH_SECONDS', 21600))
+    AAI_METADATA_RETRY_SECONDS = int(os.environ.get('AAI_METADATA_RETRY_SECONDS', 300))
+    AAI_METADATA_TIMEOUT_SECONDS = int(os.environ.get('AAI_METADATA_TIMEOUT_SECONDS', 10))
+    AAI_METADATA_CACHE_PATH = os.environ.get('AAI_METADATA_CACHE_PATH', '')  # default: instance/aai_idp_metadata.xml
     
     # Service Provider (SP) Configuration for AAI/SAML
     SP_ENTITY_ID = os.environ.get('SP_ENTITY_ID', '')
@@ -97,6 +205,41 @@ class Config:
     OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
     OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL', '')
     
+    # Chatbot HTTP clients: keep-alive pool per provider, (connect, read) timeouts in seconds
+    CHATBOT_HTTP_POOL_SIZE = int(os.environ.get('CHATBOT_HTTP_POOL_SIZE', 10))
+    CHATBOT_CONNECT_TIMEOUT = float(os.environ.get('CHATBOT_CONNECT_TIMEOUT', 3.05))
+    SMOTRA_TIMEOUT = float(os.environ.get('SMOTRA_TIMEOUT', 10))
+    CAREER_OFFICE_TIMEOUT = float(os.environ.get('CAREER_OFFICE_TIMEOUT', 10))
+    OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', 30))
+    
+    # Chatbot response cache (per process); 0 entries disables it
+    CHATBOT_CACHE_MAX_ENTRIES = int(os.environ.get('CHATBOT_CACHE_MAX_ENTRIES', 1000))
+    CHATBOT_CACHE_TTL_SECONDS = int(os.environ.get('CHATBOT_CACHE_TTL_SECONDS', 3600))
+    # Trigram Jaccard similarity (0-1) for paraphrases to hit the cache, ~0.75 works
+    # for FAQ traffic; 0 = exact (normalized) match only
+    CHATBOT_CACHE_SIMILARITY = float(os.environ.get('CHATBOT_CACHE_SIMILARITY', 0))
+    # Only providers answering the same for everyone; conversational ones stay uncached.
+    # Only the first message of an anonymous session is cached (no user or history state)
+    CHATBOT_CACHE_PROVIDERS = os.environ.get('CHATBOT_CACHE_PROVIDERS', 'smotra,career_office').split(',')
+    
+    # Chatbot routing: EWMA latency/error tracking, circuit breakers, hedged requests
+    CHATBOT_ROUTING_ENABLED = os.environ.get('CHATBOT_ROUTING_ENABLED', 'False').lower() == 'true'
+    # Providers that may answer for each other (hedging / failover targets)
+    CHATBOT_ROUTING_GROUP = os.environ.get('CHATBOT_ROUTING_GROUP', 'smotra,career_office').split(',')
+    CHATBOT_HEDGING_ENABLED = os.environ.get('CHATBOT_HEDGING_ENABLED', 'True').lower() == 'true'
+    # Hedge after the preferred provider's p95 latency; this until enough samples exist
+    CHATBOT_HEDGE_DEFAULT_DELAY = float(os.environ.get('CHATBOT_HEDGE_DEFAULT_DELAY', 1.0))
+    CHATBOT_HEDGE_MIN_DELAY = float(os.environ.get('CHATBOT_HEDGE_MIN_DELAY', 0.05))
+    CHATBOT_ROUTING_MAX_WORKERS = int(os.environ.get('CHATBOT_ROUTING_MAX_WORKERS', 16))
+    CHATBOT_EWMA_ALPHA = float(os.environ.get('CHATBOT_EWMA_ALPHA', 0.2))
+    CHATBOT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CHATBOT_BREAKER_FAILURE_THRESHOLD', 5))
+    CHATBOT_BREAKER_ERROR_RATE = float(os.environ.get('CHATBOT_BREAKER_ERROR_RATE', 0.5))
+    CHATBOT_BREAKER_COOLDOWN_SECONDS = float(os.environ.get('CHATBOT_BREAKER_COOLDOWN_SECONDS', 30))
+    
+    # Chatbot conversation store: sessions expire after this much inactivity
+    CHATBOT_SESSION_TTL_SECONDS = int(os.environ.get('CHATBOT_SESSION_TTL_SECONDS', 7 * 24 * 3600))
+    CHATBOT_SESSION_PURGE_INTERVAL_SECONDS = int(os.environ.get('CHATBOT_SESSION_PURGE_INTERVAL_SECONDS', 3600))
+    
     # Email Configuration (for notifications)
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
@@ -105,11 +248,17 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME', '')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', os.environ.get('MAIL_USERNAME', ''))
+    # SMTP connection pool (per process): reuse authenticated sessions across messages
+    MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE', 4))
+    MAIL_POOL_MAX_IDLE_SECONDS = int(os.environ.get('MAIL_POOL_MAX_IDLE_SECONDS', 60))
+    MAIL_POOL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('MAIL_POOL_MAX_MESSAGES_PER_CONNECTION', 100))
+    MAIL_POOL_ACQUIRE_TIMEOUT = int(os.environ.get('MAIL_POOL_ACQUIRE_TIMEOUT', 10))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
+    JOB_SEARCH_AUTO_INSTALL = True
 
 class ProductionConfig(Config):
     """Production configuration"""
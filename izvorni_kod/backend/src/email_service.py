@@ -1,17 +1,124 @@
 """
 Email Service for sending notifications
-Uses Flask-Mail for SMTP email delivery
+Uses Flask-Mail for SMTP email delivery over a pool of persistent,
+authenticated SMTP connections
 """
 from flask import Flask
-from flask_mail import Mail, Message
+from flask_mail import Mail, Message, Connection
+from contextlib import contextmanager
+import atexit
+import queue
+import smtplib
+import socket
+import threading
+import time
 import os
 
+# Errors meaning the SMTP session is gone (idle timeout, server restart);
+# the connection is discarded and the message retried on a fresh one
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of open Flask-Mail connections
+    
+    Each connection pays the TCP + TLS + AUTH handshake once and is then reused
+    for many messages. Connections idle longer than `max_idle_seconds` or that
+    have sent `max_messages` messages are closed and replaced.
+    """
+    
+    def __init__(self, mail, size=4, max_idle_seconds=60, max_messages=100, acquire_timeout=10):
+        self.mail = mail
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()  # most recently used first, so spare connections age out
+        self._slots = threading.BoundedSemaphore(size)
+    
+    def _open(self):
+        connection = Connection(self.mail)
+        connection.host = connection.configure_host()
+        connection.num_emails = 0
+        connection.sent_total = 0
+        connection.last_used = time.monotonic()
+        return connection
+    
+    @staticmethod
+    def _close(connection):
+        try:
+            if connection.host is not None:
+                connection.host.quit()
+        except Exception:
+            pass
+        connection.host = None
+    
+    def _checkout(self):
+        """Return an idle connection that is still fresh, or open a new one"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if time.monotonic() - connection.last_used < self.max_idle_seconds:
+                return connection
+            self._close(connection)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; broken connections are not returned to the pool"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError('No SMTP connection available')
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+        except CONNECTION_ERRORS:
+            if connection is not None:
+                self._close(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                connection.last_used = time.monotonic()
+                if connection.sent_total >= self.max_messages:
+                    self._close(connection)
+                else:
+                    self._idle.put(connection)
+            self._slots.release()
+    
+    def send(self, connection, message):
+        """
+        Send one message on a borrowed connection
+        
+        A pooled connection may have been dropped by the server while idle; in
+        that case reconnect once and resend.
+        """
+        try:
+            connection.send(message)
+        except CONNECTION_ERRORS:
+            self._close(connection)
+            fresh = self._open()
+            connection.host = fresh.host
+            connection.num_emails = 0
+            connection.send(message)
+        connection.sent_total += 1
+    
+    def close_all(self):
+        """Close every idle connection (on shutdown)"""
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
 class EmailService:
     """Email service for sending notifications"""
     
     def __init__(self, app=None):
         self.app = None
         self.mail = None
+        self.pool = None
         self.initialized = False
         if app:
             self.init_app(app)
@@ -33,6 +140,14 @@ class EmailService:
         if app.config.get('MAIL_USERNAME') and app.config.get('MAIL_PASSWORD'):
             try:
                 self.mail = Mail(app)
+                self.pool = SMTPConnectionPool(
+                    self.mail,
+                    size=app.config.get('MAIL_POOL_SIZE', 4),
+                    max_idle_seconds=app.config.get('MAIL_POOL_MAX_IDLE_SECONDS', 60),
+                    max_messages=app.config.get('MAIL_POOL_MAX_MESSAGES_PER_CONNECTION', 100),
+                    acquire_timeout=app.config.get('MAIL_POOL_ACQUIRE_TIMEOUT', 10)
+                )
+                atexit.register(self.pool.close_all)
                 self.initialized = True
                 print("✅ Email service initialized successfully")
                 print(f"   SMTP Server: {app.config['MAIL_SERVER']}:{app.config['MAIL_PORT']}")
@@ -62,36 +177,88 @@ class EmailService:
                 'message': 'Email service not initialized'
             }
         
+        return self.send_bulk([{
+            'to': to,
+            'subject': subject,
+            'body': body,
+            'html_body': html_body
+        }])[0]
+    
+    def send_bulk(self, messages):
+        """
+        Send many emails over a single pooled SMTP connection
+        
+        Args:
+            messages: List of dicts with 'to', 'subject', 'body' and optional 'html_body'
+        
+        Returns:
+            list: One {'success': bool, 'message': str} per input message, in order
+        """
+        if not self.initialized or self.mail is None:
+            return [{
+                'success': False,
+                'message': 'Email service not initialized'
+            } for _ in messages]
+        
+        results = []
         try:
-            msg = Message(
-                subject=subject,
-                recipients=[to],
-                body=body,
-                html=html_body
-            )
+            # MAIL_SUPPRESS_SEND (testing): Flask-Mail records messages without connecting
+            if self.mail.suppress:
+                for item in messages:
+                    self.mail.send(self._build_message(item))
+                    results.append(self._sent(item))
+                return results
             
-            self.mail.send(msg)
-            return {
-                'success': True,
-                'message': f'Email sent successfully to {to}'
-            }
+            with self.pool.connection() as connection:
+                for item in messages:
+                    try:
+                        self.pool.send(connection, self._build_message(item))
+                        results.append(self._sent(item))
+                    except CONNECTION_ERRORS:
+                        raise
+                    except Exception as e:
+                        # Rejected recipient or bad headers: the session is still usable
+                        results.append({
+                            'success': False,
+                            'message': f'Failed to send email: {str(e)}'
+                        })
         except Exception as e:
-            return {
+            # Connection lost for good: everything not yet sent failed
+            results.extend({
                 'success': False,
                 'message': f'Failed to send email: {str(e)}'
-            }
+            } for _ in messages[len(results):])
+        return results
     
-    def send_job_application_status_email(self, applicant_email, applicant_name, job_title, status, employer_name=None, employer_email=None):
+    @staticmethod
+    def _build_message(item):
+        return Message(
+            subject=item['subject'],
+            recipients=[item['to']],
+            body=item['body'],
+            html=item.get('html_body')
+        )
+    
+    @staticmethod
+    def _sent(item):
+        return {
+            'success': True,
+            'message': f'Email sent successfully to {item["to"]}'
+        }
+    
+    def build_job_application_status_email(self, applicant_name, job_title, status, employer_name=None, employer_email=None):
         """
-        Send email notification when job application status changes
+        Build subject and bodies of the job application status email
         
         Args:
-            applicant_email: Applicant's email address
             applicant_name: Applicant's name
             job_title: Job title
             status: Application status ('approved' or 'rejected')
             employer_name: Employer's name (optional)
             employer_email: Employer's email for replies (optional)
+        
+        Returns:
+            dict: {'subject', 'body', 'html_body'} or None for other statuses
         """
         if status == 'approved':
             subject = f'Vaša prijava za posao "{job_title}" je odobrena'
@@ -142,6 +309,30 @@ Tim za karijere"""
         
         else:
             # For pending status or other statuses, don't send email
+            return None
+        
+        return {
+            'subject': subject,
+            'body': body,
+            'html_body': html_body
+        }
+    
+    def send_job_application_status_email(self, applicant_email, applicant_name, job_title, status, employer_name=None, employer_email=None):
+        """
+        Send email notification when job application status changes
+        
+        Args:
+            applicant_email: Applicant's email address
+            applicant_name: Applicant's name
+            job_title: Job title
+            status: Application status ('approved' or 'rejected')
+            employer_name: Employer's name (optional)
+            employer_email: Employer's email for replies (optional)
+        """
+        content = self.build_job_application_status_email(
+            applicant_name, job_title, status, employer_name, employer_email
+        )
+        if content is None:
             return {
                 'success': False,
                 'message': f'Email not sent for status: {status}'
@@ -149,8 +340,8 @@ Tim za karijere"""
         
         return self.send_email(
             to=applicant_email,
-            subject=subject,
-            body=body,
-            html_body=html_body
+            subject=content['subject'],
+            body=content['body'],
+            html_body=content['html_body']
         )
 
@@ -3,18 +3,34 @@ from firebase_admin import credentials, messaging
 import os
 import json
 
+try:
+    from .push_fanout import PushFanout
+    from .models import FCMTokenModel
+except ImportError:
+    from push_fanout import PushFanout  # type: ignore
+    from models import FCMTokenModel  # type: ignore
+
 class FirebaseService:
     """Firebase Cloud Messaging Service for Push Notifications"""
     
     def __init__(self, app=None):
         self.app = None
         self.initialized = False
+        self.fanout = None
         if app:
             self.init_app(app)
     
     def init_app(self, app):
         """Initialize Firebase Admin SDK"""
         self.app = app
+        self.prune_invalid_tokens = app.config.get('FCM_PRUNE_INVALID_TOKENS', True)
+        self.fanout = PushFanout(
+            messaging,
+            chunk_size=app.config.get('FCM_FANOUT_CHUNK_SIZE', 500),
+            max_workers=app.config.get('FCM_FANOUT_MAX_WORKERS', 4),
+            max_retries=app.config.get('FCM_FANOUT_MAX_RETRIES', 3),
+            backoff_seconds=app.config.get('FCM_FANOUT_BACKOFF_SECONDS', 0.5)
+        )
         
         # Suppress importlib.metadata warnings
         import warnings
@@ -122,7 +138,7 @@ class FirebaseService:
             }
     
     def send_multicast_notification(self, fcm_tokens, title, body, data=None):
-        """Send push notification to multiple devices"""
+        """Send push notification to multiple devices (any number; chunked and retried)"""
         if not self.initialized:
             return {'success': False, 'message': 'Firebase not initialized'}
         
@@ -130,35 +146,43 @@ class FirebaseService:
             return {'success': False, 'message': 'No FCM tokens provided'}
         
         try:
-            message = messaging.MulticastMessage(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body
-                ),
-                data=data or {},
-                tokens=fcm_tokens
-            )
+            result = self.fanout.send(fcm_tokens, title, body, data)
+            result['pruned'] = self.prune_tokens(result['invalid_tokens']) if self.prune_invalid_tokens else 0
             
-            response = messaging.send_multicast(message)
-            return {
-                'success': True,
-                'success_count': response.success_count,
-                'failure_count': response.failure_count,
-                'responses': [
-                    {
-                        'success': resp.success,
-                        'message_id': resp.message_id if resp.success else None,
-                        'error': str(resp.exception) if resp.exception else None
-                    }
-                    for resp in response.responses
-                ]
-            }
+            # Nothing delivered and some devices only failed transiently: let the caller retry
+            if result['success_count'] == 0 and result['transient_failures']:
+                return {
+                    'success': False,
+                    'message': f"FCM unavailable for {result['transient_failures']} tokens after retries",
+                    **result
+                }
+            return {'success': True, **result}
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Failed to send multicast notification: {str(e)}'
             }
     
+    def prune_tokens(self, fcm_tokens):
+        """Delete device tokens FCM reported as unregistered or invalid (bulk, in chunks)"""
+        if not fcm_tokens or self.app is None:
+            return 0
+        session = self.app.extensions['sqlalchemy'].session
+        deleted = 0
+        try:
+            for i in range(0, len(fcm_tokens), 500):
+                deleted += session.query(FCMTokenModel).filter(
+                    FCMTokenModel.fcm_token.in_(fcm_tokens[i:i + 500])
+                ).delete(synchronize_session=False)
+            session.commit()
+            if deleted:
+                print(f"🧹 Pruned {deleted} invalid FCM tokens")
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: Failed to prune invalid FCM tokens: {str(e)}")
+            return 0
+        return deleted
+    
     def send_topic_notification(self, topic, title, body, data=None):
         """Send push notification to all devices subscribed to a topic"""
         if not self.initialized:
@@ -196,7 +220,8 @@ class FirebaseService:
             return {
                 'success': True,
                 'success_count': response.success_count,
-                'failure_count': response.failure_count
+                'failure_count': response.failure_count,
+                'failed_indexes': [error.index for error in response.errors]
             }
         except Exception as e:
             return {
@@ -214,7 +239,8 @@ class FirebaseService:
             return {
                 'success': True,
                 'success_count': response.success_count,
-                'failure_count': response.failure_count
+                'failure_count': response.failure_count,
+                'failed_indexes': [error.index for error in response.errors]
             }
         except Exception as e:
             return {
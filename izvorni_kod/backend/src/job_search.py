@@ -0,0 +1,222 @@
+"""
+Database-native full-text search for job postings
+- PostgreSQL: trigger-maintained tsvector column with a GIN index, using a
+  'croatian' text search configuration (unaccent + simple dictionary)
+- SQLite: FTS5 external-content shadow table kept in sync by triggers
+Falls back to LIKE matching when full-text search is not installed.
+"""
+import re
+
+from sqlalchemy import or_, text, Integer, Float
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'croatian') THEN
+            CREATE TEXT SEARCH CONFIGURATION croatian (COPY = simple);
+            ALTER TEXT SEARCH CONFIGURATION croatian
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+        END IF;
+    END
+    $$
+    """,
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION jobs_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('croatian', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('croatian', coalesce(NEW.company, '')), 'B') ||
+            setweight(to_tsvector('croatian', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS jobs_search_vector_trigger ON jobs",
+    """
+    CREATE TRIGGER jobs_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, company ON jobs
+        FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+POSTGRES_BACKFILL = """
+    UPDATE jobs SET search_vector =
+        setweight(to_tsvector('croatian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('croatian', coalesce(company, '')), 'B') ||
+        setweight(to_tsvector('croatian', coalesce(description, '')), 'C')
+"""
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, company,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description, company ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+        INSERT INTO jobs_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END
+    """,
+]
+
+SQLITE_BACKFILL = "INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"
+
+# bm25 column weights for (title, description, company); lower score is better
+SQLITE_RANKED_MATCH = """
+    SELECT rowid AS job_id, bm25(jobs_fts, 10.0, 1.0, 5.0) AS rank
+    FROM jobs_fts WHERE jobs_fts MATCH :fts_query
+"""
+
+POSTGRES_RANKED_MATCH = """
+    SELECT jobs.id AS job_id, -ts_rank(jobs.search_vector, q) AS rank
+    FROM jobs, to_tsquery('croatian', :fts_query) AS q
+    WHERE jobs.search_vector @@ q
+"""
+
+
+class JobSearch:
+    """Full-text search over job title, description and company"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._available = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize job search with Flask app"""
+        self.app = app
+        app.extensions['job_search'] = self
+
+        # Development databases are created on startup, so install there too
+        if app.config.get('JOB_SEARCH_AUTO_INSTALL'):
+            with app.app_context():
+                try:
+                    self.install()
+                except Exception as e:
+                    print(f"⚠️  Job full-text search not installed: {str(e)}")
+
+    def _db(self):
+        return self.app.extensions['sqlalchemy']
+
+    def _dialect(self):
+        return self._db().engine.dialect.name
+
+    def install(self, backfill=True):
+        """Create the full-text structures for the current database (idempotent)"""
+        db = self._db()
+        dialect = self._dialect()
+        if dialect == 'postgresql':
+            statements, backfill_sql = POSTGRES_INSTALL, POSTGRES_BACKFILL
+        elif dialect == 'sqlite':
+            statements, backfill_sql = SQLITE_INSTALL, SQLITE_BACKFILL
+        else:
+            raise RuntimeError(f'Full-text search is not supported for {dialect}')
+
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+            if backfill:
+                connection.execute(text(backfill_sql))
+
+        self._available = True
+        return dialect
+
+    def backfill(self):
+        """Re-index every existing job posting"""
+        db = self._db()
+        dialect = self._dialect()
+        backfill_sql = POSTGRES_BACKFILL if dialect == 'postgresql' else SQLITE_BACKFILL
+        with db.engine.begin() as connection:
+            connection.execute(text(backfill_sql))
+
+    def is_available(self):
+        """Check (once per process) whether the full-text structures exist"""
+        if self._available is None:
+            db = self._db()
+            dialect = self._dialect()
+            try:
+                if dialect == 'sqlite':
+                    found = db.session.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+                    )).first()
+                elif dialect == 'postgresql':
+                    found = db.session.execute(text(
+                        "SELECT 1 FROM information_schema.columns "
+                        "WHERE table_name = 'jobs' AND column_name = 'search_vector'"
+                    )).first()
+                else:
+                    found = None
+                self._available = found is not None
+            except Exception:
+                self._available = False
+            if not self._available:
+                print("⚠️  Job full-text search not installed, using LIKE search. Run: python migrate.py fts")
+        return self._available
+
+    @staticmethod
+    def _build_query(dialect, query):
+        """Turn free text into a prefix-matching AND query for the dialect"""
+        tokens = TOKEN_PATTERN.findall(query.lower())
+        if not tokens:
+            return None
+        if dialect == 'postgresql':
+            return ' & '.join(f'{token}:*' for token in tokens)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def apply(self, jobs_query, query):
+        """
+        Restrict a JobModel query to postings matching `query`
+
+        Ordered by relevance when full-text search is available,
+        otherwise falls back to case-insensitive LIKE matching.
+        """
+        # Use the caller's mapped class: blueprints may import models under a
+        # different module name than this service
+        job_model = jobs_query.column_descriptions[0]['entity']
+
+        if self.app.config.get('JOB_SEARCH_MODE', 'fulltext') == 'fulltext' and self.is_available():
+            dialect = self._dialect()
+            fts_query = self._build_query(dialect, query)
+            if fts_query is None:
+                return jobs_query.filter(job_model.id.is_(None))
+
+            ranked_sql = POSTGRES_RANKED_MATCH if dialect == 'postgresql' else SQLITE_RANKED_MATCH
+            ranked = text(ranked_sql).bindparams(fts_query=fts_query).columns(
+                job_id=Integer, rank=Float
+            ).subquery('ranked_jobs')
+            return jobs_query.join(ranked, ranked.c.job_id == job_model.id).order_by(
+                ranked.c.rank, job_model.id.desc()
+            )
+
+        search_term = f"%{query.lower()}%"
+        return jobs_query.filter(
+            or_(
+                text("LOWER(title) LIKE :search"),
+                text("LOWER(description) LIKE :search"),
+                text("LOWER(company) LIKE :search")
+            ).params(search=search_term)
+        )
@@ -0,0 +1,171 @@
+"""
+Signing and verification keys for JWT access tokens
+With JWT_ALGORITHM=HS256 tokens are signed with SECRET_KEY, as before. With
+RS256 or EdDSA the API signs with a private key and publishes the public keys
+at /.well-known/jwks.json; every token names its key in the `kid` header
+(RFC 7638 thumbprint), so nodes that only verify (other services, workers)
+need the JWKS URL rather than the signing secret.
+
+Rotating keys: deploy the new key as JWT_PRIVATE_KEY_PATH and list the old one
+in JWT_RETIRED_KEY_PATHS until tokens signed with it have expired
+(JWT_ACCESS_TOKEN_MINUTES).
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+
+import jwt
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import get_default_algorithms
+
+ASYMMETRIC_ALGORITHMS = {
+    'RS256': (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    'EdDSA': (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+}
+SUPPORTED_ALGORITHMS = ('HS256',) + tuple(ASYMMETRIC_ALGORITHMS)
+
+
+def jwk_thumbprint(jwk):
+    """RFC 7638 thumbprint of a public JWK (stable key id across nodes)"""
+    required = {'RSA': ('e', 'kty', 'n'), 'OKP': ('crv', 'kty', 'x')}[jwk['kty']]
+    canonical = json.dumps({name: jwk[name] for name in required}, separators=(',', ':'), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode('utf-8')).digest()
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+
+
+def _load_pem(data):
+    """Private or public key from PEM bytes"""
+    if b'PRIVATE KEY' in data:
+        return serialization.load_pem_private_key(data, password=None)
+    return serialization.load_pem_public_key(data)
+
+
+class JWTKeyRing:
+    """Current signing key, accepted verification keys, and the public JWKS"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.algorithm = 'HS256'
+        self._signing = None  # (kid, private key)
+        self._local_keys = {}  # kid -> (public key, public JWK)
+        self._remote_keys = {}  # kid -> public key, from JWT_JWKS_URL
+        self._remote_fetched_at = 0.0
+        self._remote_lock = threading.Lock()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize key ring with Flask app"""
+        self.app = app
+        app.extensions['jwt_keys'] = self
+        self.algorithm = app.config.get('JWT_ALGORITHM', 'HS256')
+        if self.algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT_ALGORITHM '{self.algorithm}' (expected one of {', '.join(SUPPORTED_ALGORITHMS)})")
+        self.jwks_url = app.config.get('JWT_JWKS_URL', '')
+        self.jwks_cache_seconds = app.config.get('JWT_JWKS_CACHE_SECONDS', 300)
+        self.jwks_min_refresh_seconds = app.config.get('JWT_JWKS_MIN_REFRESH_SECONDS', 30)
+        if not self.asymmetric:
+            return
+
+        private_pem = app.config.get('JWT_PRIVATE_KEY', '').replace('\\n', '\n').encode('utf-8')
+        private_path = app.config.get('JWT_PRIVATE_KEY_PATH', '')
+        if private_path:
+            with open(private_path, 'rb') as key_file:
+                private_pem = key_file.read()
+        if private_pem:
+            private_key = _load_pem(private_pem)
+            self._signing = (self._add_local_key(private_key.public_key()), private_key)
+        elif not self.jwks_url:
+            # Tokens from this key die with the process and are not shared between workers,
+            # so a production node without a key must not start
+            if not (app.debug or app.config.get('TESTING')):
+                raise ValueError(f'JWT_ALGORITHM {self.algorithm} needs JWT_PRIVATE_KEY_PATH, JWT_PRIVATE_KEY '
+                                 'or JWT_JWKS_URL (a temporary key is only generated with DEBUG or TESTING)')
+            print(f"⚠️  No JWT_PRIVATE_KEY_PATH set for {self.algorithm}: using a temporary key (development only)")
+            private_key = self._generate_key()
+            self._signing = (self._add_local_key(private_key.public_key()), private_key)
+
+        for path in filter(None, (p.strip() for p in app.config.get('JWT_RETIRED_KEY_PATHS', []))):
+            with open(path, 'rb') as key_file:
+                key = _load_pem(key_file.read())
+            self._add_local_key(key.public_key() if hasattr(key, 'public_key') else key)
+
+        if self._signing:
+            print(f"✅ JWT signing with {self.algorithm} (kid {self._signing[0]})")
+
+    @property
+    def asymmetric(self):
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    @property
+    def can_sign(self):
+        return not self.asymmetric or self._signing is not None
+
+    def _generate_key(self):
+        if self.algorithm == 'RS256':
+            return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def _add_local_key(self, public_key):
+        if not isinstance(public_key, ASYMMETRIC_ALGORITHMS[self.algorithm][1]):
+            raise ValueError(f'JWT key does not match JWT_ALGORITHM {self.algorithm}')
+        jwk = get_default_algorithms()[self.algorithm].to_jwk(public_key, as_dict=True)
+        kid = jwk_thumbprint(jwk)
+        self._local_keys[kid] = (public_key, {**jwk, 'kid': kid, 'use': 'sig', 'alg': self.algorithm})
+        return kid
+
+    def signing_key(self):
+        """
+        Key for new tokens
+
+        Returns:
+            tuple: (kid or None for HS256, key)
+        """
+        if not self.asymmetric:
+            return None, self.app.config.get('SECRET_KEY')
+        if self._signing is None:
+            raise RuntimeError('This node only verifies tokens: no JWT private key configured')
+        return self._signing
+
+    def verification_key(self, kid):
+        """Key for a token's `kid` header, or None if it is unknown"""
+        if not self.asymmetric:
+            return self.app.config.get('SECRET_KEY')
+        if kid in self._local_keys:
+            return self._local_keys[kid][0]
+        if not self.jwks_url:
+            return None
+
+        key = self._remote_keys.get(kid)
+        stale = time.monotonic() - self._remote_fetched_at >= self.jwks_cache_seconds
+        if key is None or stale:
+            self._fetch_remote_keys(force=key is None)
+            key = self._remote_keys.get(kid)
+        return key
+
+    def _fetch_remote_keys(self, force):
+        """Refresh the cached JWKS; an unknown kid refetches at most every JWT_JWKS_MIN_REFRESH_SECONDS"""
+        with self._remote_lock:
+            age = time.monotonic() - self._remote_fetched_at
+            if age < (self.jwks_min_refresh_seconds if force else self.jwks_cache_seconds):
+                return
+            self._remote_fetched_at = time.monotonic()
+            try:
+                response = requests.get(self.jwks_url, timeout=5)
+                response.raise_for_status()
+                keys = {}
+                for jwk in response.json().get('keys', []):
+                    if jwk.get('alg', self.algorithm) == self.algorithm and jwk.get('kid'):
+                        keys[jwk['kid']] = jwt.PyJWK(jwk, algorithm=self.algorithm).key
+                self._remote_keys = keys
+            except Exception as e:
+                # Keep serving the previously cached keys
+                print(f"Warning: Failed to fetch JWKS from {self.jwks_url}: {str(e)}")
+
+    def jwks(self):
+        """Public keys this node signs or has signed with, as a JWK Set"""
+        return {'keys': [jwk for _, jwk in self._local_keys.values()]}
@@ -358,6 +358,12 @@ class NotificationModel(db.Model):
     read = db.Column(db.Boolean, nullable=False, default=False, index=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    # Keyset pagination index: per-user, newest first; unread recount per user
+    __table_args__ = (
+        db.Index('ix_notifications_user_created_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_notifications_user_read', 'user_id', 'read'),
+    )
+    
     def __init__(self, user_id, title, body, type='info', data=None, read=False):
         self.user_id = user_id
         self.title = title
@@ -431,6 +437,7 @@ class FCMTokenModel(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     fcm_token = db.Column(db.String(500), nullable=False)
     device_info = db.Column(db.JSON, nullable=True)
+    topics = db.Column(db.JSON, nullable=True)  # FCM topics this device is subscribed to
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     # Unique constraint for user_id + fcm_token combination
@@ -496,6 +503,9 @@ class FacultyModel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination index
+    __table_args__ = (db.Index('ix_faculties_created_id', 'created_at', 'id'),)
+    
     # Relationships
     # Note: associations are linked via faculty field (string), not foreign key
     
@@ -564,6 +574,9 @@ class AssociationModel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination index
+    __table_args__ = (db.Index('ix_associations_created_id', 'created_at', 'id'),)
+    
     def __init__(self, slug, name, faculty=None, type=None, logo_text=None, logo_bg=None,
                  short_description=None, description=None, tags=None, links=None, created_by=None):
         self.slug = slug
@@ -647,6 +660,9 @@ class JobModel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination index: active postings, newest first
+    __table_args__ = (db.Index('ix_jobs_status_created_id', 'status', 'created_at', 'id'),)
+    
     # Relationships
     applications = db.relationship('JobApplicationModel', lazy='dynamic', cascade='all, delete-orphan')
     
@@ -797,63 +813,65 @@ class JobApplicationModel(db.Model):
         return f'<JobApplication {self.id}: Job {self.job_id}, User {self.user_id}>'
 
 class ChatSessionModel(db.Model):
-    """SQLAlchemy Chat Session model"""
+    """SQLAlchemy Chat Session model (messages live in ChatMessageModel)"""
     __tablename__ = 'chat_sessions'
     
     id = db.Column(db.String(100), primary_key=True)  # UUID string
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    messages = db.Column(db.JSON, nullable=False, default=list)  # Array of message objects
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)  # None for anonymous sessions
+    messages = db.Column(db.JSON, nullable=True, default=list)  # Legacy: history before chat_messages existed
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # Sliding TTL, extended on every message
     
-    def __init__(self, id, user_id, messages=None):
+    def __init__(self, id, user_id=None, expires_at=None):
         self.id = id
         self.user_id = user_id
-        self.messages = messages or []
+        self.messages = []
+        self.expires_at = expires_at
     
-    def add_message(self, role, message):
-        """Add message to session"""
-        if not self.messages:
-            self.messages = []
-        
-        self.messages.append({
-            'role': role,
-            'message': message,
-            'timestamp': datetime.utcnow().isoformat()
-        })
-        self.updated_at = datetime.utcnow()
-        db.session.commit()
+    def is_expired(self, now=None):
+        """Check whether the session outlived its TTL"""
+        return self.expires_at is not None and self.expires_at <= (now or datetime.utcnow())
     
     def to_dict(self):
-        """Convert chat session to dictionary"""
+        """Convert chat session to dictionary (without messages)"""
         return {
             'session_id': self.id,
             'user_id': self.user_id,
-            'messages': self.messages or [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
         }
+
+class ChatMessageModel(db.Model):
+    """SQLAlchemy Chat Message model: append-only conversation history"""
+    __tablename__ = 'chat_messages'
     
-    @classmethod
-    def create(cls, session_id, user_id):
-        """Create new chat session"""
-        session = cls(id=session_id, user_id=user_id)
-        db.session.add(session)
-        db.session.commit()
-        return session
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), db.ForeignKey('chat_sessions.id', ondelete='CASCADE'), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # user, assistant
+    message = db.Column(db.Text, nullable=False)
+    provider = db.Column(db.String(50), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
-    def save(self):
-        """Save chat session to database"""
-        db.session.add(self)
-        db.session.commit()
+    # History pages: one session, ordered by id
+    __table_args__ = (db.Index('ix_chat_messages_session_id_id', 'session_id', 'id'),)
     
-    def delete(self):
-        """Delete chat session from database"""
-        db.session.delete(self)
-        db.session.commit()
+    def __init__(self, session_id, role, message, provider=None):
+        self.session_id = session_id
+        self.role = role
+        self.message = message
+        self.provider = provider
     
-    def __repr__(self):
-        return f'<ChatSession {self.id}: User {self.user_id}>'
+    def to_dict(self):
+        """Convert chat message to dictionary"""
+        return {
+            'id': self.id,
+            'role': self.role,
+            'message': self.message,
+            'provider': self.provider,
+            'timestamp': self.created_at.isoformat() if self.created_at else None
+        }
 
 class ErasmusProjectModel(db.Model):
     """SQLAlchemy Erasmus Project model"""
@@ -878,6 +896,9 @@ class ErasmusProjectModel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination index: active projects, newest first
+    __table_args__ = (db.Index('ix_erasmus_projects_status_created_id', 'status', 'created_at', 'id'),)
+    
     # Relationships
     faculty = db.relationship('FacultyModel', foreign_keys=[faculty_slug])
     creator = db.relationship('UserModel', foreign_keys=[created_by])
@@ -972,7 +993,10 @@ class FavoriteFacultyModel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     # Unique constraint: user can only favorite a faculty once
-    __table_args__ = (db.UniqueConstraint('user_id', 'faculty_slug', name='unique_user_faculty_favorite'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'faculty_slug', name='unique_user_faculty_favorite'),
+        db.Index('ix_favorite_faculties_user_created_id', 'user_id', 'created_at', 'id'),
+    )
     
     # Relationships
     user = db.relationship('UserModel', foreign_keys=[user_id])
@@ -1025,6 +1049,9 @@ class FacultyInquiryModel(db.Model):
     replied_at = db.Column(db.DateTime, nullable=True)
     reply_message = db.Column(db.Text, nullable=True)
     
+    # Keyset pagination index: per-faculty inbox, newest first
+    __table_args__ = (db.Index('ix_faculty_inquiries_faculty_created_id', 'faculty_slug', 'created_at', 'id'),)
+    
     # Relationships
     faculty = db.relationship('FacultyModel', foreign_keys=[faculty_slug])
     user = db.relationship('UserModel', foreign_keys=[user_id])
@@ -1082,3 +1109,120 @@ class FacultyInquiryModel(db.Model):
     def __repr__(self):
         return f'<FacultyInquiry {self.id}: {self.subject} -> {self.faculty_slug}>'
 
+
+class OutboxMessageModel(db.Model):
+    """SQLAlchemy outbox model: email/push deliveries queued by request handlers
+    and sent by the background worker (worker.py)"""
+    __tablename__ = 'outbox_messages'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # email, push
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # next attempt not before
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    # Worker claim query: oldest due messages in a given status
+    __table_args__ = (db.Index('ix_outbox_messages_status_available', 'status', 'available_at', 'id'),)
+    
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.status = 'pending'
+        self.attempts = 0
+        self.available_at = datetime.utcnow()
+    
+    def to_dict(self):
+        """Convert outbox message to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'availableAt': self.available_at.isoformat() if self.available_at else None,
+            'lastError': self.last_error,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'sentAt': self.sent_at.isoformat() if self.sent_at else None
+        }
+    
+    def __repr__(self):
+        return f'<OutboxMessage {self.id}: {self.kind} ({self.status})>'
+
+
+class RevokedTokenModel(db.Model):
+    """SQLAlchemy revoked token model: JWT ids invalidated before their expiry
+    (logout). Rows are purged once the token would have expired anyway."""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __init__(self, jti, user_id, expires_at):
+        self.jti = jti
+        self.user_id = user_id
+        self.expires_at = expires_at
+        self.revoked_at = datetime.utcnow()
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti} (user {self.user_id})>'
+
+
+class RefreshTokenModel(db.Model):
+    """SQLAlchemy refresh token model: only a SHA-256 hash of the token is stored.
+    Each refresh rotates the token; tokens of one login share a family_id so a
+    replayed (already rotated) token revokes the whole family."""
+    __tablename__ = 'refresh_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    family_id = db.Column(db.String(32), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+    replaced_by_id = db.Column(db.Integer, nullable=True)  # Successor, when revoked by rotation
+    
+    def __init__(self, user_id, token_hash, family_id, expires_at):
+        self.user_id = user_id
+        self.token_hash = token_hash
+        self.family_id = family_id
+        self.expires_at = expires_at
+        self.created_at = datetime.utcnow()
+    
+    def __repr__(self):
+        return f'<RefreshToken {self.id} (user {self.user_id}, family {self.family_id})>'
+
+
+class RateLimitCounterModel(db.Model):
+    """SQLAlchemy rate limit counter: requests per key (e.g. login:ip:1.2.3.4) in one
+    fixed window, shared by all workers. Rows are purged after expires_at."""
+    __tablename__ = 'rate_limit_counters'
+    
+    key = db.Column(db.String(255), primary_key=True)
+    window_start = db.Column(db.Integer, primary_key=True, autoincrement=False)  # epoch seconds
+    count = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.Integer, nullable=False, index=True)  # epoch seconds
+    
+    def __repr__(self):
+        return f'<RateLimitCounter {self.key} @{self.window_start}: {self.count}>'
+
+
+class NotificationCounterModel(db.Model):
+    """SQLAlchemy unread notification counter: one row per user, kept in step with
+    notifications by ORM hooks (see notification_counters.py). counted_at is
+    when the value was last recounted; NULL means recount on next read."""
+    __tablename__ = 'notification_counters'
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+    counted_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<NotificationCounter user {self.user_id}: {self.unread} unread>'
@@ -0,0 +1,124 @@
+"""
+Per-user unread notification counters
+GET /api/notifications/unread-count reads one row of notification_counters by
+primary key instead of counting (or loading) the user's unread notifications.
+
+The counter is adjusted in the same transaction as the change, by mapper hooks
+on inserts, read/unread updates and deletes of notification rows, so every code
+path that goes through the ORM keeps it in step. Set-based UPDATE/DELETE
+statements bypass the hooks and must call adjust() themselves. A counter is
+created by its first read and recounted every NOTIFICATION_UNREAD_RECOUNT_SECONDS
+to repair drift (e.g. a notification committed while the first count ran).
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapper, attributes
+
+try:
+    from .models import NotificationModel, NotificationCounterModel
+except ImportError:
+    from models import NotificationModel, NotificationCounterModel  # type: ignore
+
+counters = NotificationCounterModel.__table__
+
+
+def adjust(connection, user_id, delta):
+    """Add delta to a user's unread counter (no-op until the counter exists; never below 0)"""
+    if not delta:
+        return
+    connection.execute(update(counters).where(counters.c.user_id == user_id).values(
+        unread=case((counters.c.unread + delta > 0, counters.c.unread + delta), else_=0)
+    ))
+
+
+def mark_stale(connection, user_id):
+    """Force a recount on the user's next read"""
+    connection.execute(update(counters).where(counters.c.user_id == user_id).values(counted_at=None))
+
+
+def _is_notification(mapper):
+    # Matched by table: models may be imported under two module names
+    return mapper.local_table.name == NotificationModel.__tablename__
+
+
+def _after_insert(mapper, connection, target):
+    if _is_notification(mapper) and not target.read:
+        adjust(connection, target.user_id, 1)
+
+
+def _after_update(mapper, connection, target):
+    if not _is_notification(mapper):
+        return
+    history = attributes.get_history(target, 'read')
+    if not history.has_changes():
+        return
+    if not history.deleted:
+        # Previous value was never loaded, so the change is unknown
+        mark_stale(connection, target.user_id)
+    elif bool(history.deleted[0]) != bool(target.read):
+        adjust(connection, target.user_id, -1 if target.read else 1)
+
+
+def _after_delete(mapper, connection, target):
+    if not _is_notification(mapper):
+        return
+    read = target.__dict__.get('read')
+    if read is None:
+        mark_stale(connection, target.user_id)
+    elif not read:
+        adjust(connection, target.user_id, -1)
+
+
+class NotificationCounters:
+    """Cached unread counts maintained on notification create/read/delete"""
+
+    def __init__(self, app=None):
+        self.app = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize notification counters with Flask app"""
+        self.app = app
+        app.extensions['notification_counters'] = self
+        self.recount_interval = timedelta(seconds=app.config.get('NOTIFICATION_UNREAD_RECOUNT_SECONDS', 3600))
+        for name, listener in (('after_insert', _after_insert), ('after_update', _after_update), ('after_delete', _after_delete)):
+            if not event.contains(Mapper, name, listener):
+                event.listen(Mapper, name, listener)
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    def adjust(self, user_id, delta):
+        """Adjust a counter within the current session transaction (after set-based statements)"""
+        adjust(self._session().connection(), user_id, delta)
+
+    def mark_stale(self, user_id):
+        mark_stale(self._session().connection(), user_id)
+
+    def unread_count(self, user_id):
+        """Unread notifications of a user: a primary key lookup unless a recount is due"""
+        row = self._session().execute(
+            select(counters.c.unread, counters.c.counted_at).where(counters.c.user_id == user_id)
+        ).first()
+        if row is not None and row.counted_at is not None and row.counted_at > datetime.utcnow() - self.recount_interval:
+            return row.unread
+        return self.recount(user_id, exists=row is not None)
+
+    def recount(self, user_id, exists=True):
+        """Count unread notifications and store the result (committed)"""
+        session = self._session()
+        unread = session.query(NotificationModel.id).filter_by(user_id=user_id, read=False).count()
+        values = {'unread': unread, 'counted_at': datetime.utcnow()}
+        try:
+            if exists:
+                session.execute(update(counters).where(counters.c.user_id == user_id).values(**values))
+            else:
+                session.execute(counters.insert().values(user_id=user_id, **values))
+            session.commit()
+        except IntegrityError:
+            # Another request created the counter first
+            session.rollback()
+        return unread
@@ -0,0 +1,247 @@
+"""
+Real-time notification delivery (Server-Sent Events)
+GET /api/notifications/stream keeps one connection per open client and pushes
+each new notification row to it, instead of clients polling the list.
+
+Publishing is hooked into the ORM (after_insert of notification rows), so every
+code path that creates notifications publishes them, and only once committed:
+
+    postgres  pg_notify() on the inserting connection; PostgreSQL delivers it on
+              COMMIT (drops it on ROLLBACK) to every process LISTENing on the
+              channel, i.e. all gunicorn workers on all nodes and the outbox
+              worker. Each process holds one dedicated LISTEN connection.
+    memory    events are kept on the session and handed to this process's
+              subscribers after commit (SQLite / single-process development;
+              notifications created in another process are not pushed).
+
+Each stream subscribes a bounded queue; a client too slow to drain it loses
+events and recovers them by reconnecting with Last-Event-ID.
+
+A stream occupies its request slot for up to NOTIFICATION_STREAM_MAX_SECONDS,
+so streams are capped per user (429) and per worker process (503), both with
+Retry-After. gunicorn.conf.py sets the per-worker cap to 0 for threaded (sync)
+workers, whose few threads must keep serving ordinary requests; clients there
+keep polling.
+"""
+import json
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Mapper, Session, object_session
+from flask import current_app, has_app_context, jsonify
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+
+try:
+    from .models import NotificationModel
+except ImportError:
+    from models import NotificationModel  # type: ignore
+
+CHANNEL = 'notifications'
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+SESSION_EVENTS_KEY = 'notification_stream_events'
+
+
+def _is_notification(mapper):
+    # Matched by table: models may be imported under two module names
+    return mapper.local_table.name == NotificationModel.__tablename__
+
+
+def _broker():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('notification_stream')
+
+
+def _after_insert(mapper, connection, target):
+    if _is_notification(mapper):
+        broker = _broker()
+        if broker is not None:
+            broker.stage(connection, target)
+
+
+def _after_commit(session):
+    events = session.info.pop(SESSION_EVENTS_KEY, None)
+    if events:
+        broker = _broker()
+        if broker is not None:
+            for payload in events:
+                broker.dispatch(payload)
+
+
+def _after_transaction_end(session, transaction):
+    # Rolled back or closed without commit (after_commit has already run otherwise)
+    if transaction.parent is None:
+        session.info.pop(SESSION_EVENTS_KEY, None)
+
+
+class TooManyStreams(TooManyRequests):
+    """The user already has NOTIFICATION_STREAM_MAX_PER_USER streams open"""
+    description = 'Too many open notification streams'
+
+
+class StreamsUnavailable(ServiceUnavailable):
+    """This worker is at NOTIFICATION_STREAM_MAX_PER_WORKER streams (or serves none)"""
+    description = 'Notification stream is not available, please poll instead'
+
+
+class NotificationBroker:
+    """Per-process subscriber registry fed by LISTEN/NOTIFY or in-process events"""
+
+    def __init__(self, app=None):
+        self.app = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize notification stream with Flask app"""
+        self.app = app
+        app.extensions['notification_stream'] = self
+        backend = app.config.get('NOTIFICATION_STREAM_BACKEND', 'auto').lower()
+        if backend == 'auto':
+            database_url = app.config.get('SQLALCHEMY_DATABASE_URI') or 'sqlite://'
+            backend = 'postgres' if make_url(database_url).get_backend_name() == 'postgresql' else 'memory'
+        if backend not in ('postgres', 'memory'):
+            raise ValueError(f"Unknown NOTIFICATION_STREAM_BACKEND '{backend}' (expected auto, postgres or memory)")
+        self.backend = backend
+        self.queue_size = app.config.get('NOTIFICATION_STREAM_QUEUE_SIZE', 100)
+        self.reconnect_max_seconds = app.config.get('NOTIFICATION_STREAM_RECONNECT_MAX_SECONDS', 30)
+        self.max_per_user = app.config.get('NOTIFICATION_STREAM_MAX_PER_USER', 3)
+        self.max_per_worker = app.config.get('NOTIFICATION_STREAM_MAX_PER_WORKER', 100)
+        self.retry_after = app.config.get('NOTIFICATION_STREAM_RETRY_AFTER_SECONDS', 60)
+        self._subscribers = {}  # user_id -> set of queues
+        self._lock = threading.Lock()
+        self._listener = None
+        self.listening = False
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        @app.errorhandler(TooManyStreams)
+        @app.errorhandler(StreamsUnavailable)
+        def stream_limit_reached(error):
+            response = jsonify({'success': False, 'message': error.description})
+            response.status_code = error.code
+            response.headers['Retry-After'] = str(self.retry_after)
+            return response
+
+        for target, name, listener in (
+            (Mapper, 'after_insert', _after_insert),
+            (Session, 'after_commit', _after_commit),
+            (Session, 'after_transaction_end', _after_transaction_end),
+        ):
+            if not event.contains(target, name, listener):
+                event.listen(target, name, listener)
+
+    # Publishing
+
+    def stage(self, connection, notification):
+        """Publish a just-inserted notification once its transaction commits"""
+        payload = {'user_id': notification.user_id, 'notification': notification.to_dict()}
+        if self.backend == 'postgres' and connection.dialect.name == 'postgresql':
+            message = json.dumps(payload, ensure_ascii=False)
+            if len(message.encode('utf-8')) > MAX_NOTIFY_PAYLOAD:
+                # Subscribers load the row instead
+                message = json.dumps({'user_id': notification.user_id, 'id': notification.id})
+            connection.execute(text('SELECT pg_notify(:channel, :payload)'), {'channel': CHANNEL, 'payload': message})
+        else:
+            session = object_session(notification)
+            if session is not None:
+                session.info.setdefault(SESSION_EVENTS_KEY, []).append(payload)
+        self.published += 1
+
+    def dispatch(self, payload):
+        """Hand an event to this process's streams of its user"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(payload.get('user_id'), ()))
+        for subscription in subscriptions:
+            try:
+                subscription.put_nowait(payload)
+                self.delivered += 1
+            except queue.Full:
+                self.dropped += 1
+
+    # Subscribing
+
+    def subscribe(self, user_id):
+        """Queue receiving the user's new notifications until unsubscribe(); raises at the stream limits"""
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if sum(len(subscriptions) for subscriptions in self._subscribers.values()) >= self.max_per_worker:
+                self.rejected += 1
+                raise StreamsUnavailable(retry_after=self.retry_after)
+            if len(self._subscribers.get(user_id, ())) >= self.max_per_user:
+                self.rejected += 1
+                raise TooManyStreams(retry_after=self.retry_after)
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            if self.backend == 'postgres' and (self._listener is None or not self._listener.is_alive()):
+                self._listener = threading.Thread(target=self._listen, name='notification-listener', daemon=True)
+                self._listener.start()
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def connections(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def _listen(self):
+        """LISTEN on a dedicated connection and dispatch notifies; reconnect with backoff"""
+        delay = 1
+        while True:
+            raw = None
+            try:
+                with self.app.app_context():
+                    raw = self.app.extensions['sqlalchemy'].engine.raw_connection()
+                # Keep the connection out of the pool for good
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                self.listening = True
+                delay = 1
+                while True:
+                    readable, _, _ = select.select([connection], [], [], 60)
+                    if not readable:
+                        # Idle: make sure the connection is still alive
+                        with connection.cursor() as cursor:
+                            cursor.execute('SELECT 1')
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.dispatch(json.loads(connection.notifies.pop(0).payload))
+            except Exception as e:
+                print(f"⚠️  Notification listener disconnected: {str(e)}")
+            finally:
+                self.listening = False
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'listening': self.listening,
+            'connections': self.connections(),
+            'max_per_worker': self.max_per_worker,
+            'rejected': self.rejected,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped
+        }
@@ -1,16 +1,37 @@
 from authlib.integrations.flask_client import OAuth
-from flask import Flask, session, redirect, url_for
+from flask import Flask, session, redirect, url_for, g
 from functools import wraps
 import jwt
 import datetime
 import os
+import time
+import uuid
+
+try:
+    from .auth_cache import TTLCache
+    from .jwt_keys import JWTKeyRing
+    from .models import UserModel
+    from .refresh_tokens import InvalidRefreshTokenError
+except ImportError:
+    from auth_cache import TTLCache  # type: ignore
+    from jwt_keys import JWTKeyRing  # type: ignore
+    from models import UserModel  # type: ignore
+    from refresh_tokens import InvalidRefreshTokenError  # type: ignore
+
+# `aud` of notification stream tickets; access tokens carry none
+STREAM_TICKET_AUDIENCE = 'notification-stream'
 
 class OAuth2Service:
     """OAuth2 Authentication Service"""
     
-    def __init__(self, app=None):
+    def __init__(self, app=None, revocation_list=None, refresh_tokens=None):
         self.oauth = None
         self.app = None
+        self.revocation_list = revocation_list
+        self.refresh_tokens = refresh_tokens
+        self.keys = JWTKeyRing()
+        self.token_cache = TTLCache(max_entries=0)
+        self.profile_cache = TTLCache(max_entries=0)
         if app:
             self.init_app(app)
     
@@ -18,6 +39,17 @@ class OAuth2Service:
         """Initialize OAuth2 with Flask app"""
         self.app = app
         self.oauth = OAuth(app)
+        self.keys = JWTKeyRing(app)
+        
+        # Verified claims per token, and serialized profiles per user id
+        self.token_cache = TTLCache(
+            max_entries=app.config.get('JWT_CACHE_MAX_ENTRIES', 10000),
+            ttl_seconds=app.config.get('JWT_CACHE_TTL_SECONDS', 300)
+        )
+        self.profile_cache = TTLCache(
+            max_entries=app.config.get('USER_PROFILE_CACHE_MAX_ENTRIES', 5000),
+            ttl_seconds=app.config.get('USER_PROFILE_CACHE_TTL_SECONDS', 30)
+        )
         
         # Register OAuth providers
         # Example: Google OAuth (can add more providers)
@@ -33,33 +65,170 @@ class OAuth2Service:
             )
     
     def generate_token(self, user_id, email, role='student'):
-        """Generate JWT token for user"""
+        """Generate short-lived JWT access token for user"""
         if not self.app:
             raise RuntimeError("OAuth2Service not initialized with Flask app")
-        secret_key = self.app.config.get('SECRET_KEY')
-        expiration_days = self.app.config.get('JWT_EXPIRATION_DAYS', 30)
+        kid, signing_key = self.keys.signing_key()
+        expiration_minutes = self.app.config.get('JWT_ACCESS_TOKEN_MINUTES', 15)
         
         token = jwt.encode({
             'user_id': user_id,
             'email': email,
             'role': role,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=expiration_days)
-        }, secret_key, algorithm='HS256')
+            'jti': uuid.uuid4().hex,  # lets the token be revoked before it expires
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(minutes=expiration_minutes)
+        }, signing_key, algorithm=self.keys.algorithm, headers={'kid': kid} if kid else None)
         
         return token
     
+    def generate_token_pair(self, user_id, email, role='student'):
+        """
+        Access token plus a rotating refresh token (starts a new login)
+        
+        Returns:
+            dict: token, refreshToken, expiresIn (access token lifetime in seconds)
+        """
+        return {
+            'token': self.generate_token(user_id, email, role),
+            'refreshToken': self.refresh_tokens.issue(user_id),
+            'expiresIn': self.app.config.get('JWT_ACCESS_TOKEN_MINUTES', 15) * 60
+        }
+    
+    def refresh_token_pair(self, refresh_token):
+        """
+        Rotate a refresh token and issue a fresh access token
+        
+        Email and role are re-read from the database, so role changes take
+        effect on the next refresh.
+        
+        Returns:
+            dict: success with token, refreshToken, expiresIn; or success False and message
+        """
+        try:
+            user_id, new_refresh_token = self.refresh_tokens.rotate(refresh_token)
+        except InvalidRefreshTokenError as e:
+            return {'success': False, 'message': str(e)}
+        
+        user = self.current_user(user_id)
+        if user is None:
+            self.refresh_tokens.revoke(new_refresh_token)
+            return {'success': False, 'message': 'User not found'}
+        return {
+            'success': True,
+            'token': self.generate_token(user.id, user.email, user.role),
+            'refreshToken': new_refresh_token,
+            'expiresIn': self.app.config.get('JWT_ACCESS_TOKEN_MINUTES', 15) * 60
+        }
+    
     def verify_token(self, token):
-        """Verify JWT token"""
+        """Verify JWT token (claims of recently verified tokens are served from cache)"""
         if not self.app:
             raise RuntimeError("OAuth2Service not initialized with Flask app")
-        try:
-            secret_key = self.app.config.get('SECRET_KEY')
-            data = jwt.decode(token, secret_key, algorithms=['HS256'])
-            return data
-        except jwt.ExpiredSignatureError:
+        data = self.token_cache.get(token)
+        if data is None:
+            try:
+                # The header only selects the key; the algorithm is fixed by config
+                key = self.keys.verification_key(jwt.get_unverified_header(token).get('kid'))
+                if key is None:
+                    return None
+                data = jwt.decode(token, key, algorithms=[self.keys.algorithm])
+            except jwt.ExpiredSignatureError:
+                return None
+            except jwt.InvalidTokenError:
+                return None
+            # Never serve claims past the token's own expiry
+            remaining = data['exp'] - time.time() if 'exp' in data else None
+            self.token_cache.put(token, data, ttl_seconds=remaining)
+        
+        # Tokens issued before jti was added cannot be revoked
+        if self.revocation_list and data.get('jti') and self.revocation_list.is_revoked(data['jti']):
             return None
+        return data
+    
+    def revoke_token(self, token):
+        """
+        Revoke a token before its expiry (logout)
+        
+        Returns:
+            bool: True if the token was valid and is now revoked
+        """
+        data = self.verify_token(token)
+        if not data or not data.get('jti') or not self.revocation_list:
+            return False
+        self.revocation_list.revoke(
+            data['jti'],
+            data.get('user_id'),
+            datetime.datetime.utcfromtimestamp(data['exp'])
+        )
+        self.token_cache.invalidate(token)
+        return True
+    
+    def generate_stream_ticket(self, user_id):
+        """
+        Short-lived, single-use ticket for GET /api/notifications/stream
+        
+        EventSource cannot send an Authorization header, so the stream URL
+        carries this ticket instead of the access token (URLs end up in access
+        logs). Its audience keeps verify_token from accepting it.
+        """
+        if not self.app:
+            raise RuntimeError("OAuth2Service not initialized with Flask app")
+        kid, signing_key = self.keys.signing_key()
+        return jwt.encode({
+            'user_id': user_id,
+            'aud': STREAM_TICKET_AUDIENCE,
+            'jti': uuid.uuid4().hex,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(
+                seconds=self.app.config.get('NOTIFICATION_STREAM_TICKET_SECONDS', 30)
+            )
+        }, signing_key, algorithm=self.keys.algorithm, headers={'kid': kid} if kid else None)
+    
+    def redeem_stream_ticket(self, ticket):
+        """Claims of a stream ticket, which is used up; None if invalid, expired or already used"""
+        if not self.app:
+            raise RuntimeError("OAuth2Service not initialized with Flask app")
+        try:
+            key = self.keys.verification_key(jwt.get_unverified_header(ticket).get('kid'))
+            if key is None:
+                return None
+            data = jwt.decode(ticket, key, algorithms=[self.keys.algorithm], audience=STREAM_TICKET_AUDIENCE,
+                              options={'require': ['exp', 'jti']})
         except jwt.InvalidTokenError:
             return None
+        if self.revocation_list and not self.revocation_list.claim(
+            data['jti'], data.get('user_id'), datetime.datetime.utcfromtimestamp(data['exp'])
+        ):
+            return None
+        return data
+    
+    def current_user(self, user_id):
+        """
+        UserModel for the authenticated user, loaded at most once per request
+        
+        Returns None if the user does not exist.
+        """
+        loaded = g.setdefault('_current_users', {})
+        if user_id not in loaded:
+            db = self.app.extensions['sqlalchemy']
+            loaded[user_id] = db.session.get(UserModel, user_id) if user_id is not None else None
+        return loaded[user_id]
+    
+    def get_user_profile(self, user_id):
+        """Serialized profile (UserModel.to_dict) from a short-TTL cache, or None"""
+        profile = self.profile_cache.get(user_id)
+        if profile is None:
+            user = self.current_user(user_id)
+            if user is None:
+                return None
+            profile = user.to_dict()
+            self.profile_cache.put(user_id, profile)
+        return profile
+    
+    def invalidate_user(self, user_id):
+        """Drop cached identity data after the user's profile changed"""
+        self.profile_cache.invalidate(user_id)
+        if '_current_users' in g:
+            g._current_users.pop(user_id, None)
     
     def get_authorization_url(self, provider='google', redirect_uri=None):
         """Get OAuth2 authorization URL"""
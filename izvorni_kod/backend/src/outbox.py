@@ -0,0 +1,237 @@
+"""
+Durable outbox for email and push deliveries
+Request handlers enqueue messages in the same transaction as their own changes;
+the worker process (worker.py) drains the table in batches with retries.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, and_
+
+try:
+    from .models import OutboxMessageModel, FCMTokenModel
+except ImportError:
+    from models import OutboxMessageModel, FCMTokenModel  # type: ignore
+
+KIND_EMAIL = 'email'
+KIND_PUSH = 'push'
+KIND_TOPIC_SYNC = 'topic_sync'
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery can never succeed (e.g. service not configured); do not retry"""
+    pass
+
+
+class Outbox:
+    """Transactional outbox: enqueue from handlers, deliver from the worker"""
+
+    def __init__(self, app=None, email_service=None, firebase_service=None, push_topics=None):
+        self.app = None
+        self.email_service = email_service
+        self.firebase_service = firebase_service
+        self.push_topics = push_topics
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize outbox with Flask app"""
+        self.app = app
+        app.extensions['outbox'] = self
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', 50)
+        self.max_attempts = app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        self.retry_base_seconds = app.config.get('OUTBOX_RETRY_BASE_SECONDS', 30)
+        self.lock_timeout_seconds = app.config.get('OUTBOX_LOCK_TIMEOUT_SECONDS', 300)
+
+    def _db(self):
+        return self.app.extensions['sqlalchemy']
+
+    # ------------------------------------------------------------------
+    # Enqueue (request side). The caller commits, so the message is stored
+    # atomically with the change that triggered it.
+    # ------------------------------------------------------------------
+
+    def enqueue_email(self, to, subject, body, html_body=None):
+        """Queue an email; added to the current session, not committed"""
+        return self._enqueue(KIND_EMAIL, {
+            'to': to,
+            'subject': subject,
+            'body': body,
+            'html_body': html_body
+        })
+
+    def enqueue_push(self, user_id, title, body, data=None):
+        """Queue a push notification to all of a user's devices; not committed"""
+        return self._enqueue(KIND_PUSH, {
+            'user_id': user_id,
+            'title': title,
+            'body': body,
+            # FCM data payload values must be strings
+            'data': {key: str(value) for key, value in (data or {}).items()}
+        })
+
+    def enqueue_topic_sync(self, user_id, released=None):
+        """Queue an FCM topic membership sync for a user's devices; not committed"""
+        return self._enqueue(KIND_TOPIC_SYNC, {
+            'user_id': user_id,
+            'released': released or {}
+        })
+
+    def _enqueue(self, kind, payload):
+        message = OutboxMessageModel(kind=kind, payload=payload)
+        self._db().session.add(message)
+        return message
+
+    # ------------------------------------------------------------------
+    # Delivery (worker side)
+    # ------------------------------------------------------------------
+
+    def claim_batch(self, batch_size=None):
+        """
+        Lock up to `batch_size` due messages for this worker
+
+        Messages stuck in 'processing' longer than the lock timeout (a worker
+        died mid-batch) are reclaimed. On PostgreSQL, SKIP LOCKED lets several
+        workers drain the table concurrently.
+        """
+        session = self._db().session
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.lock_timeout_seconds)
+
+        messages = session.query(OutboxMessageModel).filter(or_(
+            and_(OutboxMessageModel.status == 'pending', OutboxMessageModel.available_at <= now),
+            and_(OutboxMessageModel.status == 'processing', OutboxMessageModel.locked_at < stale_before)
+        )).order_by(
+            OutboxMessageModel.available_at, OutboxMessageModel.id
+        ).limit(batch_size or self.batch_size).with_for_update(skip_locked=True).all()
+
+        for message in messages:
+            message.status = 'processing'
+            message.locked_at = now
+        session.commit()
+        return messages
+
+    def process_batch(self, batch_size=None):
+        """
+        Claim and deliver one batch
+
+        Returns:
+            dict: counts of sent, retried and failed messages
+        """
+        session = self._db().session
+        messages = self.claim_batch(batch_size)
+        result = {'claimed': len(messages), 'sent': 0, 'retried': 0, 'failed': 0}
+        if not messages:
+            return result
+
+        # Resolve device tokens for every push in the batch with one query
+        push_user_ids = {m.payload.get('user_id') for m in messages if m.kind == KIND_PUSH}
+        tokens_by_user = {}
+        if push_user_ids:
+            rows = session.query(FCMTokenModel.user_id, FCMTokenModel.fcm_token).filter(
+                FCMTokenModel.user_id.in_(push_user_ids)
+            ).all()
+            for user_id, fcm_token in rows:
+                tokens_by_user.setdefault(user_id, []).append(fcm_token)
+
+        # Send every email in the batch over one pooled SMTP connection
+        email_results = self._send_emails([m for m in messages if m.kind == KIND_EMAIL])
+
+        for message in messages:
+            try:
+                if message.kind == KIND_EMAIL:
+                    self._check_email_result(email_results[message.id])
+                elif message.kind == KIND_PUSH:
+                    self._deliver_push(message.payload, tokens_by_user.get(message.payload.get('user_id'), []))
+                elif message.kind == KIND_TOPIC_SYNC:
+                    self._deliver_topic_sync(message.payload)
+                else:
+                    raise PermanentDeliveryError(f'Unknown outbox message kind: {message.kind}')
+                self._mark_sent(message)
+                result['sent'] += 1
+            except PermanentDeliveryError as e:
+                message.attempts += 1
+                self._mark_failed(message, str(e))
+                result['failed'] += 1
+            except Exception as e:
+                if self._schedule_retry(message, str(e)):
+                    result['retried'] += 1
+                else:
+                    result['failed'] += 1
+            # Commit per message so a crash mid-batch does not resend finished ones
+            session.commit()
+
+        return result
+
+    def drain(self, max_batches=None):
+        """Process batches until nothing is due (used by `worker.py --once`)"""
+        totals = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            result = self.process_batch()
+            batches += 1
+            for key in totals:
+                totals[key] += result[key]
+            if result['claimed'] == 0:
+                break
+        return totals
+
+    def _send_emails(self, messages):
+        """Map outbox message id -> send result (None when email is not configured)"""
+        if not messages:
+            return {}
+        if not self.email_service or not self.email_service.initialized:
+            return {message.id: None for message in messages}
+        results = self.email_service.send_bulk([message.payload for message in messages])
+        return {message.id: result for message, result in zip(messages, results)}
+
+    def _check_email_result(self, result):
+        if result is None:
+            raise PermanentDeliveryError('Email service not configured')
+        if not result.get('success'):
+            raise RuntimeError(result.get('message', 'Email send failed'))
+
+    def _deliver_push(self, payload, fcm_tokens):
+        if not self.firebase_service or not self.firebase_service.initialized:
+            raise PermanentDeliveryError('Firebase not initialized')
+        if not fcm_tokens:
+            # User has no registered devices: nothing to deliver
+            return
+        result = self.firebase_service.send_multicast_notification(
+            fcm_tokens,
+            payload['title'],
+            payload['body'],
+            payload.get('data') or {}
+        )
+        if not result.get('success'):
+            raise RuntimeError(result.get('message', 'Push send failed'))
+
+    def _deliver_topic_sync(self, payload):
+        if not self.push_topics or not self.push_topics.enabled:
+            raise PermanentDeliveryError('Firebase not initialized')
+        self.push_topics.sync_user(payload['user_id'], payload.get('released'))
+
+    def _mark_sent(self, message):
+        message.status = 'sent'
+        message.sent_at = datetime.utcnow()
+        message.locked_at = None
+        message.last_error = None
+
+    def _mark_failed(self, message, error):
+        message.status = 'failed'
+        message.locked_at = None
+        message.last_error = error
+        print(f"❌ Outbox message {message.id} ({message.kind}) failed: {error}")
+
+    def _schedule_retry(self, message, error):
+        """Back off exponentially; give up after OUTBOX_MAX_ATTEMPTS"""
+        message.attempts += 1
+        if message.attempts >= self.max_attempts:
+            self._mark_failed(message, error)
+            return False
+        delay = self.retry_base_seconds * (2 ** (message.attempts - 1))
+        message.status = 'pending'
+        message.locked_at = None
+        message.available_at = datetime.utcnow() + timedelta(seconds=delay)
+        message.last_error = error
+        print(f"⚠️  Outbox message {message.id} ({message.kind}) attempt {message.attempts} failed, retrying in {delay}s: {error}")
+        return True
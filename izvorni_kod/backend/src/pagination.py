@@ -0,0 +1,145 @@
+"""
+Cursor pagination shared by the listing blueprints
+Cursors are opaque URL-safe strings; clients pass back `nextCursor` as `cursor`.
+Requests with neither `cursor` nor `limit` (clients that predate pagination)
+get the whole list, in the order the endpoint used before it was paginated.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import request, current_app
+from sqlalchemy import or_, and_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a malformed or tampered cursor"""
+    pass
+
+
+def encode_cursor(payload):
+    """Encode a cursor payload dict as an opaque URL-safe string"""
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor string back into its payload dict"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise InvalidCursorError('Invalid cursor')
+    if not isinstance(payload, dict):
+        raise InvalidCursorError('Invalid cursor')
+    return payload
+
+
+def get_pagination_args():
+    """
+    Read `cursor` and `limit` from the query string
+
+    Returns:
+        tuple: (cursor or None, limit clamped to PAGINATION_MAX_LIMIT);
+        (None, None) when the request sends neither, i.e. unpaginated
+    """
+    default_limit = current_app.config.get('PAGINATION_DEFAULT_LIMIT', 50)
+    max_limit = current_app.config.get('PAGINATION_MAX_LIMIT', 200)
+
+    cursor = request.args.get('cursor', '').strip() or None
+    if cursor is None and 'limit' not in request.args:
+        return None, None
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except (TypeError, ValueError):
+        limit = default_limit
+
+    return cursor, max(1, min(limit, max_limit))
+
+
+def paginate_keyset(query, model, cursor=None, limit=50, unpaginated_order=None):
+    """
+    Newest-first keyset pagination on (created_at, id)
+
+    Args:
+        query: SQLAlchemy query over `model` (filters applied, no ordering)
+        model: Mapped class with `created_at` and `id` columns
+        cursor: Cursor from a previous page, or None for the first page
+        limit: Page size, or None for every row
+        unpaginated_order: Ordering for limit=None (defaults to newest first)
+
+    Returns:
+        tuple: (list of model instances, next cursor or None)
+    """
+    if limit is None:
+        order = unpaginated_order or (model.created_at.desc(), model.id.desc())
+        return query.order_by(*order).all(), None
+
+    if cursor:
+        payload = decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(payload['c'])
+            last_id = int(payload['i'])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidCursorError('Invalid cursor')
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < last_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({'c': last.created_at.isoformat(), 'i': last.id})
+    return rows, next_cursor
+
+
+def _decode_offset(cursor):
+    if not cursor:
+        return 0
+    payload = decode_cursor(cursor)
+    try:
+        offset = int(payload['o'])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorError('Invalid cursor')
+    if offset < 0:
+        raise InvalidCursorError('Invalid cursor')
+    return offset
+
+
+def paginate_ordered(query, cursor=None, limit=50):
+    """
+    Pagination for queries whose ordering is not a stable key
+    (e.g. full-text relevance); the cursor carries an offset.
+
+    Returns:
+        tuple: (list of rows, next cursor or None)
+    """
+    if limit is None:
+        return query.all(), None
+    offset = _decode_offset(cursor)
+    rows = query.offset(offset).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({'o': offset + limit})
+    return rows, next_cursor
+
+
+def paginate_list(items, cursor=None, limit=50):
+    """
+    Pagination over an already materialized list (e.g. search index results)
+
+    Returns:
+        tuple: (slice of items, next cursor or None)
+    """
+    if limit is None:
+        return list(items), None
+    offset = _decode_offset(cursor)
+    page = items[offset:offset + limit]
+    next_cursor = encode_cursor({'o': offset + limit}) if offset + limit < len(items) else None
+    return page, next_cursor
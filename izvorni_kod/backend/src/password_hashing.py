@@ -0,0 +1,104 @@
+"""
+Password hashing off the request threads
+Hashes are computed on a small dedicated thread pool (hashlib's scrypt and
+pbkdf2 release the GIL), so a burst of logins or registrations cannot occupy
+every request thread with CPU work. When the pool and its queue are full the
+request fails fast with 503 + Retry-After instead of piling up.
+
+Under gevent (SERVER_MODE=gevent) the patched ThreadPoolExecutor would run the
+hashes as greenlets on the event loop, stalling every other request in the
+worker; gevent's own executor is used there, which keeps real OS threads.
+
+Hash method and cost come from config (werkzeug method strings such as
+"scrypt:32768:8:1" or "pbkdf2:sha256:600000"), optionally per role. Stored
+hashes made with other parameters are upgraded on the next successful login.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+try:
+    from gevent import monkey as gevent_monkey
+    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+except ImportError:
+    gevent_monkey = None
+
+from flask import jsonify
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHashingBusy(ServiceUnavailable):
+    """Every hashing worker is busy and the queue is full"""
+    description = 'Server is busy, please try again shortly'
+
+
+class PasswordHasher:
+    """Bounded executor for password hashing with configurable cost and rehash-on-login"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize password hasher with Flask app"""
+        self.app = app
+        app.extensions['password_hasher'] = self
+        workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER_SECONDS', 2)
+        self.acquire_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS', 0.5)
+        if gevent_monkey is not None and gevent_monkey.is_module_patched('threading'):
+            self._executor = NativeThreadPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        # Running + queued jobs; beyond this new requests get 503
+        self._slots = threading.BoundedSemaphore(workers + app.config.get('PASSWORD_HASH_QUEUE_SIZE', 8))
+
+        # Resolve each method to the prefix werkzeug writes into stored hashes
+        # ("scrypt" -> "scrypt:32768:8:1"), to detect hashes that need upgrading
+        self.default_method = self._canonical(app.config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+        self.role_methods = {
+            role: self._canonical(method)
+            for role, method in app.config.get('PASSWORD_HASH_METHODS_BY_ROLE', {}).items()
+        }
+
+        @app.errorhandler(PasswordHashingBusy)
+        def password_hashing_busy(error):
+            response = jsonify({'success': False, 'message': error.description})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(self.retry_after)
+            return response
+
+    @staticmethod
+    def _canonical(method):
+        return generate_password_hash('', method=method).split('$', 1)[0]
+
+    def method_for(self, role=None):
+        return self.role_methods.get(role, self.default_method)
+
+    def _run(self, fn, *args):
+        """Run on the hashing pool and wait; raises PasswordHashingBusy when saturated"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise PasswordHashingBusy(retry_after=self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password, role=None):
+        """Hash a password with the method configured for the role"""
+        return self._run(generate_password_hash, password, self.method_for(role))
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash (False if the user has no password)"""
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash, role=None):
+        """True if the hash was made with a different method or cost than configured"""
+        return bool(password_hash) and password_hash.split('$', 1)[0] != self.method_for(role)
@@ -0,0 +1,142 @@
+"""
+FCM multicast fan-out
+Splits a token list into chunks of at most 500 (the FCM multicast limit), sends
+the chunks concurrently from a bounded thread pool, and retries tokens that
+failed with transient errors (UNAVAILABLE, INTERNAL, quota) with exponential
+backoff. Tokens FCM reports as dead are collected so the caller can delete them.
+
+The `messaging` module is injected, so the engine can run against a stub that
+provides MulticastMessage, Notification and send_each_for_multicast.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+
+FCM_MULTICAST_LIMIT = 500
+TRANSIENT_CODES = {'UNAVAILABLE', 'INTERNAL', 'RESOURCE_EXHAUSTED', 'DEADLINE_EXCEEDED', 'UNKNOWN'}
+
+
+class PushFanout:
+    """Chunked, concurrent multicast with retries and dead-token detection"""
+
+    def __init__(self, messaging, chunk_size=FCM_MULTICAST_LIMIT, max_workers=4, max_retries=3,
+                 backoff_seconds=0.5, backoff_max_seconds=8.0, sleep=time.sleep):
+        self.messaging = messaging
+        self.chunk_size = max(1, min(chunk_size, FCM_MULTICAST_LIMIT))
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='fcm-fanout')
+        # send_multicast uses the retired batch endpoint; prefer per-message sends
+        self._send = getattr(messaging, 'send_each_for_multicast', None) or messaging.send_multicast
+
+    def send(self, tokens, title, body, data=None):
+        """
+        Send one notification to every token
+
+        Returns:
+            dict: success/failure counts, per-token responses (in token order),
+                  dead `invalid_tokens` and `transient_failures` left after retries
+        """
+        tokens = list(dict.fromkeys(token for token in tokens if token))
+        chunks = [tokens[i:i + self.chunk_size] for i in range(0, len(tokens), self.chunk_size)]
+        if len(chunks) <= 1:
+            chunk_results = [self._send_chunk(chunk, title, body, data) for chunk in chunks]
+        else:
+            chunk_results = list(self._executor.map(lambda chunk: self._send_chunk(chunk, title, body, data), chunks))
+
+        responses = []
+        invalid_tokens = []
+        transient_failures = 0
+        for chunk, results in zip(chunks, chunk_results):
+            for token in chunk:
+                success, message_id, error, kind = results[token]
+                responses.append({'success': success, 'message_id': message_id, 'error': error})
+                if kind == 'dead':
+                    invalid_tokens.append(token)
+                elif kind == 'transient':
+                    transient_failures += 1
+
+        success_count = sum(1 for response in responses if response['success'])
+        return {
+            'success_count': success_count,
+            'failure_count': len(responses) - success_count,
+            'chunks': len(chunks),
+            'responses': responses,
+            'invalid_tokens': invalid_tokens,
+            'transient_failures': transient_failures
+        }
+
+    def _send_chunk(self, chunk, title, body, data):
+        """Map token -> (success, message_id, error, failure kind) for one chunk"""
+        results = {}
+        pending = chunk
+        attempt = 0
+        while pending:
+            message = self.messaging.MulticastMessage(
+                notification=self.messaging.Notification(title=title, body=body),
+                data=data or {},
+                tokens=pending
+            )
+            try:
+                batch = self._send(message)
+            except Exception as e:
+                # The whole request failed (network, auth, quota)
+                if self._is_transient(e) and attempt < self.max_retries:
+                    attempt += 1
+                    self.sleep(self._backoff(attempt))
+                    continue
+                kind = 'transient' if self._is_transient(e) else 'error'
+                for token in pending:
+                    results[token] = (False, None, str(e), kind)
+                break
+
+            # INVALID_ARGUMENT for every token points at the payload, not the tokens
+            all_invalid = all(
+                not resp.success and getattr(resp.exception, 'code', None) == 'INVALID_ARGUMENT'
+                for resp in batch.responses
+            )
+            retry = []
+            for token, resp in zip(pending, batch.responses):
+                if resp.success:
+                    results[token] = (True, resp.message_id, None, None)
+                elif self._is_transient(resp.exception) and attempt < self.max_retries:
+                    retry.append(token)
+                else:
+                    kind = self._failure_kind(resp.exception, all_invalid)
+                    results[token] = (False, None, str(resp.exception), kind)
+            pending = retry
+            if pending:
+                attempt += 1
+                self.sleep(self._backoff(attempt))
+        return results
+
+    def _failure_kind(self, exception, all_invalid):
+        """'dead' (delete the token), 'transient' or 'error'"""
+        code = getattr(exception, 'code', None)
+        dead_types = tuple(
+            error_type for error_type in (
+                getattr(self.messaging, 'UnregisteredError', None),
+                getattr(self.messaging, 'SenderIdMismatchError', None)
+            ) if isinstance(error_type, type)
+        )
+        if code == 'NOT_FOUND' or (dead_types and isinstance(exception, dead_types)):
+            return 'dead'
+        if code == 'INVALID_ARGUMENT' and (not all_invalid or 'registration token' in str(exception).lower()):
+            return 'dead'
+        if self._is_transient(exception):
+            return 'transient'
+        return 'error'
+
+    @staticmethod
+    def _is_transient(exception):
+        code = getattr(exception, 'code', None)
+        if code is None:
+            # Not a FirebaseError: connection reset, timeout, ...
+            return exception is not None and not isinstance(exception, (ValueError, TypeError))
+        return code in TRANSIENT_CODES
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * (2 ** (attempt - 1)))
+        return delay * (0.5 + random.random() / 2)
@@ -0,0 +1,157 @@
+"""
+FCM topic membership for audience broadcasts
+Every registered device is subscribed to topics derived from its user:
+
+    all                          every device
+    role-<role>                  e.g. role-student
+    faculty-<faculty>            e.g. faculty-fer
+    faculty-<faculty>-<role>     e.g. faculty-fer-student ("all FER students")
+    favorite-<faculty slug>      users who favorited the faculty
+
+so a broadcast is one topic message instead of a send per device token. The
+topics a device is subscribed to are stored on fcm_tokens.topics; a sync
+(queued through the outbox after token registration, profile or favorite
+changes) subscribes/unsubscribes only the difference, one batched call per
+topic.
+"""
+import re
+import unicodedata
+
+try:
+    from .models import UserModel, FCMTokenModel, FavoriteFacultyModel
+except ImportError:
+    from models import UserModel, FCMTokenModel, FavoriteFacultyModel  # type: ignore
+
+# subscribe_to_topic / unsubscribe_from_topic accept at most 1000 tokens per call
+TOPIC_BATCH_SIZE = 1000
+
+
+def topic_part(value):
+    """Topic-safe slug: 'Fakultet elektrotehnike i računarstva' -> 'fakultet-elektrotehnike-i-racunarstva'"""
+    ascii_value = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9_.~]+', '-', ascii_value.lower()).strip('-')
+
+
+class PushTopics:
+    """Derive, sync and address FCM topics for users and audiences"""
+
+    def __init__(self, app=None, firebase_service=None):
+        self.app = None
+        self.firebase_service = firebase_service
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize push topics with Flask app"""
+        self.app = app
+        app.extensions['push_topics'] = self
+        # Separates environments sharing one Firebase project (e.g. "staging-")
+        self.prefix = app.config.get('FCM_TOPIC_PREFIX', '')
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    @property
+    def enabled(self):
+        return bool(self.firebase_service and self.firebase_service.initialized)
+
+    def audience_topic(self, role=None, faculty=None, favorite=None):
+        """Topic for a broadcast audience (no filters means every device)"""
+        if favorite:
+            return f'{self.prefix}favorite-{topic_part(favorite)}'
+        if faculty and role:
+            return f'{self.prefix}faculty-{topic_part(faculty)}-{topic_part(role)}'
+        if faculty:
+            return f'{self.prefix}faculty-{topic_part(faculty)}'
+        if role:
+            return f'{self.prefix}role-{topic_part(role)}'
+        return f'{self.prefix}all'
+
+    def topics_for_user(self, user, favorite_slugs=()):
+        topics = {self.audience_topic(), self.audience_topic(role=user.role)}
+        if user.faculty:
+            topics.add(self.audience_topic(faculty=user.faculty))
+            topics.add(self.audience_topic(role=user.role, faculty=user.faculty))
+        topics.update(self.audience_topic(favorite=slug) for slug in favorite_slugs)
+        return topics
+
+    def schedule_sync(self, user_id, released=None):
+        """
+        Queue a topic sync for the user's devices in the current session (not committed)
+
+        Args:
+            released: {fcm_token: [topics]} of devices being unregistered, to unsubscribe
+        """
+        if not self.enabled:
+            return None
+        return self.app.extensions['outbox'].enqueue_topic_sync(user_id, released)
+
+    def sync_user(self, user_id, released=None):
+        """
+        Bring every device of the user to its current topic set (worker side)
+
+        Returns:
+            dict: subscribed/unsubscribed (device, topic) counts
+
+        Raises:
+            RuntimeError: a topic call failed; devices done so far are committed
+        """
+        session = self._session()
+        user = session.get(UserModel, user_id)
+        devices = session.query(FCMTokenModel).filter_by(user_id=user_id).all()
+        desired = set()
+        if user is not None:
+            favorite_slugs = [slug for (slug,) in session.query(FavoriteFacultyModel.faculty_slug).filter_by(user_id=user_id)]
+            desired = self.topics_for_user(user, favorite_slugs)
+
+        # Group the differences by topic so each topic is one call per 1000 devices
+        subscribe, unsubscribe = {}, {}
+        for device in devices:
+            current = set(device.topics or [])
+            for topic in desired - current:
+                subscribe.setdefault(topic, []).append(device)
+            for topic in current - desired:
+                unsubscribe.setdefault(topic, []).append(device)
+        released_by_topic = {}
+        for fcm_token, topics in (released or {}).items():
+            for topic in topics:
+                released_by_topic.setdefault(topic, []).append(fcm_token)
+
+        counts = {'subscribed': 0, 'unsubscribed': 0}
+        errors = []
+        for topic, topic_devices in subscribe.items():
+            counts['subscribed'] += self._apply(self.firebase_service.subscribe_to_topic, topic, topic_devices, True, errors)
+        for topic, topic_devices in unsubscribe.items():
+            counts['unsubscribed'] += self._apply(self.firebase_service.unsubscribe_from_topic, topic, topic_devices, False, errors)
+        for topic, fcm_tokens in released_by_topic.items():
+            for i in range(0, len(fcm_tokens), TOPIC_BATCH_SIZE):
+                result = self.firebase_service.unsubscribe_from_topic(fcm_tokens[i:i + TOPIC_BATCH_SIZE], topic)
+                if not result.get('success'):
+                    errors.append(result.get('message'))
+                else:
+                    counts['unsubscribed'] += result['success_count']
+
+        session.commit()
+        if errors:
+            raise RuntimeError(f'Topic sync for user {user_id} incomplete: {errors[0]}')
+        return counts
+
+    def _apply(self, call, topic, devices, subscribed, errors):
+        """Run a (un)subscribe call in batches and record the new membership on each device"""
+        done = 0
+        for i in range(0, len(devices), TOPIC_BATCH_SIZE):
+            batch = devices[i:i + TOPIC_BATCH_SIZE]
+            result = call([device.fcm_token for device in batch], topic)
+            if not result.get('success'):
+                errors.append(result.get('message'))
+                continue
+            failed = set(result.get('failed_indexes', []))
+            for index, device in enumerate(batch):
+                if index in failed:
+                    continue
+                topics = set(device.topics or [])
+                topics = topics | {topic} if subscribed else topics - {topic}
+                # Assign a new list so the JSON column is marked dirty
+                device.topics = sorted(topics)
+                done += 1
+        return done
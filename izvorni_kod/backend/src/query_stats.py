@@ -0,0 +1,121 @@
+"""
+Per-request SQL instrumentation (opt-in via QUERY_STATS_ENABLED)
+Counts statements and DB time for each request using SQLAlchemy engine events,
+groups statements by shape to flag likely N+1 patterns, and reports the result
+as response headers and one JSON log line per request.
+"""
+import json
+import re
+import time
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+# Literals and IN-lists are collapsed so that the same statement issued for
+# different rows (the N+1 signature) maps to a single shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:[^()]*)\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalize a SQL statement so repeated per-row queries compare equal"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryStats:
+    """Collects SQL statement counts and timings for each request"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize query instrumentation with Flask app"""
+        self.app = app
+        app.extensions['query_stats'] = self
+        self.enabled = app.config.get('QUERY_STATS_ENABLED', False)
+        if not self.enabled:
+            return
+
+        self.threshold = app.config.get('QUERY_STATS_N_PLUS_ONE_THRESHOLD', 5)
+
+        with app.app_context():
+            engine = app.extensions['sqlalchemy'].engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        print(f"✅ Query stats enabled (N+1 threshold: {self.threshold} repeated statements)")
+
+    # The start time lives on the statement's execution context, not the pooled
+    # connection: a statement that fails never reaches after_cursor_execute and
+    # must not leave a stale entry behind for the connection's next statements
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_stats_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_stats_start', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+
+        # Statements outside a request (startup, CLI, workers) are not tracked
+        if not has_request_context():
+            return
+        stats = g.get('query_stats')
+        if stats is None:
+            return
+        stats['count'] += 1
+        stats['time'] += elapsed
+        shape = statement_shape(statement)
+        stats['shapes'][shape] = stats['shapes'].get(shape, 0) + 1
+
+    def _start_request(self):
+        g.query_stats = {'count': 0, 'time': 0.0, 'shapes': {}}
+
+    def suspected_n_plus_one(self, stats):
+        """Statement shapes repeated at least `threshold` times in one request"""
+        repeated = [
+            {'statement': shape[:300], 'count': count}
+            for shape, count in stats['shapes'].items()
+            if count >= self.threshold
+        ]
+        return sorted(repeated, key=lambda item: item['count'], reverse=True)
+
+    def _finish_request(self, response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+
+        time_ms = round(stats['time'] * 1000, 2)
+        repeated = self.suspected_n_plus_one(stats)
+
+        response.headers['X-DB-Queries'] = str(stats['count'])
+        response.headers['X-DB-Time-ms'] = str(time_ms)
+        if repeated:
+            response.headers['X-DB-N-Plus-One'] = str(len(repeated))
+
+        # One JSON line per request; Cloud Run picks up `severity` as the log level
+        print(json.dumps({
+            'severity': 'WARNING' if repeated else 'INFO',
+            'message': 'db_query_stats',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'db_queries': stats['count'],
+            'db_time_ms': time_ms,
+            'distinct_statements': len(stats['shapes']),
+            'suspected_n_plus_one': repeated
+        }), flush=True)
+        return response
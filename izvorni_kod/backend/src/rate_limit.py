@@ -0,0 +1,260 @@
+"""
+Rate limiting for login and registration
+Sliding-window counters keyed by client IP and by submitted email. Each window
+keeps a count for the current and previous fixed window; the estimate weights
+the previous count by how much of it still overlaps the sliding window. Limits
+are "count/seconds" strings, e.g. RATE_LIMIT_LOGIN_PER_IP = "20/60".
+
+RATE_LIMIT_BACKEND=memory counts per worker process; RATE_LIMIT_BACKEND=database
+shares counters between workers and instances through rate_limit_counters.
+Requests are rejected with 429 + Retry-After before the view runs, so abusive
+traffic never reaches password hashing.
+
+Identities in failures_by only count requests the view answered with 401 (a
+wrong password), so nobody can lock a known address out by logging in as it.
+"""
+from functools import wraps
+import math
+import threading
+import time
+
+from flask import request, jsonify, make_response
+from sqlalchemy import select, delete
+
+try:
+    from .models import RateLimitCounterModel
+except ImportError:
+    from models import RateLimitCounterModel  # type: ignore
+
+
+def parse_limit(value):
+    """'20/60' -> (20, 60); empty or '0' disables the limit"""
+    if not value or value in ('0', 'off'):
+        return None
+    count, _, seconds = str(value).partition('/')
+    return int(count), int(seconds or 60)
+
+
+class MemoryRateLimitBackend:
+    """Per-process counters: {key: [window_start, current, previous, window]}"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def hit(self, key, window, now):
+        """Count one request; returns (previous window count, current window count)"""
+        start = int(now // window * window)
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[0] < start:
+                # Roll forward: the old current window becomes previous if adjacent
+                previous = entry[1] if entry is not None and entry[0] == start - window else 0
+                entry = [start, 0, previous, window]
+                self._counters[key] = entry
+            entry[1] += 1
+            result = (entry[2], entry[1])
+            if len(self._counters) > self.max_keys or now - self._last_sweep >= 60:
+                self._sweep(now)
+        return result
+
+    def peek(self, key, window, now):
+        """(previous window count, current window count) without counting"""
+        start = int(now // window * window)
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                return 0, 0
+            if entry[0] == start:
+                return entry[2], entry[1]
+            return (entry[1] if entry[0] == start - window else 0), 0
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        stale = [key for key, entry in self._counters.items() if entry[0] + 2 * entry[3] <= now]
+        for key in stale:
+            del self._counters[key]
+
+
+class DatabaseRateLimitBackend:
+    """Counters in rate_limit_counters, incremented atomically with an upsert"""
+
+    def __init__(self, app):
+        self.app = app
+        self._last_purge = 0.0
+        self.purge_interval = app.config.get('RATE_LIMIT_PURGE_INTERVAL_SECONDS', 300)
+
+    def _engine(self):
+        return self.app.extensions['sqlalchemy'].engine
+
+    def _insert(self, dialect):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f'Database rate limit backend does not support {dialect}')
+        return insert
+
+    def hit(self, key, window, now):
+        """Count one request; returns (previous window count, current window count)"""
+        start = int(now // window * window)
+        table = RateLimitCounterModel.__table__
+        engine = self._engine()
+        insert = self._insert(engine.dialect.name)
+        upsert = insert(table).values(key=key, window_start=start, count=1, expires_at=start + 2 * window)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c.key, table.c.window_start],
+            set_={'count': table.c.count + 1}
+        )
+        # Own connection: never commits or rolls back the request's session
+        with engine.begin() as conn:
+            conn.execute(upsert)
+            counts = dict(conn.execute(
+                select(table.c.window_start, table.c.count).where(
+                    table.c.key == key,
+                    table.c.window_start.in_([start - window, start])
+                )
+            ).all())
+            if now - self._last_purge >= self.purge_interval:
+                self._last_purge = now
+                conn.execute(delete(table).where(table.c.expires_at <= int(now)))
+        return counts.get(start - window, 0), counts.get(start, 0)
+
+    def peek(self, key, window, now):
+        """(previous window count, current window count) without counting"""
+        start = int(now // window * window)
+        table = RateLimitCounterModel.__table__
+        with self._engine().connect() as conn:
+            counts = dict(conn.execute(
+                select(table.c.window_start, table.c.count).where(
+                    table.c.key == key,
+                    table.c.window_start.in_([start - window, start])
+                )
+            ).all())
+        return counts.get(start - window, 0), counts.get(start, 0)
+
+
+class RateLimiter:
+    """Sliding-window rate limits applied to views with @limit"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = None
+        self.rejected = 0
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize rate limiter with Flask app"""
+        self.app = app
+        app.extensions['rate_limiter'] = self
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.trusted_proxies = app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+        backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'database':
+            self.backend = DatabaseRateLimitBackend(app)
+        else:
+            if backend != 'memory':
+                print(f"⚠️  Unknown RATE_LIMIT_BACKEND '{backend}', using memory")
+            self.backend = MemoryRateLimitBackend(app.config.get('RATE_LIMIT_MEMORY_MAX_KEYS', 100000))
+
+    def client_ip(self):
+        """Client address; with N trusted proxies in front, the Nth X-Forwarded-For entry from the right"""
+        route = request.access_route
+        if self.trusted_proxies and request.headers.get('X-Forwarded-For') and len(route) >= self.trusted_proxies:
+            return route[-self.trusted_proxies]
+        return request.remote_addr or 'unknown'
+
+    def _identities(self, by):
+        for kind in by:
+            if kind == 'ip':
+                yield kind, self.client_ip()
+            elif kind == 'email':
+                data = request.get_json(silent=True)
+                email = data.get('email') if isinstance(data, dict) else None
+                if isinstance(email, str) and email.strip():
+                    yield kind, email.strip().lower()
+
+    def check(self, scope, by, count=True):
+        """
+        Count this request against the scope's limits
+
+        Args:
+            count: False to only check whether one more counted request fits
+
+        Returns:
+            int or None: seconds to wait if a limit is exceeded, else None
+        """
+        now = time.time()
+        for kind, identity in self._identities(by):
+            limit = parse_limit(self.app.config.get(f'RATE_LIMIT_{scope.upper()}_PER_{kind.upper()}'))
+            if limit is None:
+                continue
+            max_requests, window = limit
+            key = f'{scope}:{kind}:{identity}'
+            try:
+                if count:
+                    previous, current = self.backend.hit(key, window, now)
+                else:
+                    previous, current = self.backend.peek(key, window, now)
+                    current += 1
+            except Exception as e:
+                # Fail open: an unavailable counter store must not lock everyone out
+                print(f"Warning: Rate limit check failed: {str(e)}")
+                return None
+
+            elapsed = now % window
+            if previous * (1 - elapsed / window) + current > max_requests:
+                return self._retry_after(previous, current, max_requests, window, elapsed)
+        return None
+
+    @staticmethod
+    def _retry_after(previous, current, max_requests, window, elapsed):
+        if current >= max_requests or previous == 0:
+            # Wait for the current window to become the previous one
+            return max(1, math.ceil(window - elapsed))
+        # Wait until the previous window's weight has decayed enough
+        wait = window * (1 - (max_requests - current) / previous) - elapsed
+        return max(1, math.ceil(wait))
+
+    def record(self, scope, by):
+        """Count a request that already ran (e.g. a failed login) against the scope's limits"""
+        self.check(scope, by)
+
+    def limit(self, scope, by=('ip',), failures_by=()):
+        """
+        Decorator: reject with 429 when RATE_LIMIT_<SCOPE>_PER_<IP|EMAIL> is exceeded
+
+        Args:
+            scope: limit name, e.g. 'login'
+            by: identities to count, any of 'ip' and 'email' (from the JSON body)
+            failures_by: identities to count only when the view answers 401
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                retry_after = self.check(scope, by)
+                if retry_after is None and failures_by:
+                    retry_after = self.check(scope, failures_by, count=False)
+                if retry_after is not None:
+                    self.rejected += 1
+                    response = jsonify({
+                        'success': False,
+                        'message': 'Too many attempts, please try again later'
+                    })
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+                if not failures_by:
+                    return f(*args, **kwargs)
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 401:
+                    self.record(scope, failures_by)
+                return response
+            return decorated
+        return decorator
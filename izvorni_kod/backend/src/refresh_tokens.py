@@ -0,0 +1,159 @@
+"""
+Rotating refresh tokens
+Access JWTs are short-lived and verified without the database; clients trade a
+refresh token for a new access/refresh pair at POST /api/auth/refresh. Every
+refresh token is single-use: presenting one that was already rotated means it
+leaked, so its whole family (one login) is revoked.
+
+Except right after a rotation: two tabs refreshing with the same stored token,
+or a retry whose response was lost, present the token again within moments.
+Within JWT_REFRESH_TOKEN_REUSE_GRACE_SECONDS of its rotation (and while the
+login is still live) such a token gets another successor instead.
+"""
+from datetime import datetime, timedelta
+import hashlib
+import secrets
+import time
+import uuid
+
+try:
+    from .models import RefreshTokenModel
+except ImportError:
+    from models import RefreshTokenModel  # type: ignore
+
+
+class InvalidRefreshTokenError(Exception):
+    """Refresh token is unknown, expired, revoked or was already used"""
+    pass
+
+
+def hash_token(raw_token):
+    return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+
+class RefreshTokenStore:
+    """Issue, rotate and revoke refresh tokens (stored as SHA-256 hashes)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._last_purge = 0.0
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize refresh token store with Flask app"""
+        self.app = app
+        app.extensions['refresh_tokens'] = self
+        self.lifetime = timedelta(days=app.config.get('JWT_REFRESH_TOKEN_DAYS', 30))
+        self.purge_interval = app.config.get('JWT_REFRESH_TOKEN_PURGE_INTERVAL_SECONDS', 3600)
+        self.reuse_grace = timedelta(seconds=app.config.get('JWT_REFRESH_TOKEN_REUSE_GRACE_SECONDS', 10))
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    def issue(self, user_id, family_id=None):
+        """
+        Create and commit a refresh token
+
+        Returns:
+            str: the raw token (only its hash is stored)
+        """
+        self.maybe_purge()
+        raw_token, _ = self._add(user_id, family_id or uuid.uuid4().hex)
+        self._session().commit()
+        return raw_token
+
+    def rotate(self, raw_token):
+        """
+        Consume a refresh token and issue its successor in the same family
+
+        Returns:
+            tuple: (user_id, new raw token)
+
+        Raises:
+            InvalidRefreshTokenError: unknown, expired or reused token
+        """
+        self.maybe_purge()
+        db_session = self._session()
+        # Row lock: two concurrent refreshes with the same token cannot both succeed
+        record = db_session.query(RefreshTokenModel).filter_by(
+            token_hash=hash_token(raw_token or '')
+        ).with_for_update().first()
+
+        if record is None:
+            db_session.rollback()
+            raise InvalidRefreshTokenError('Invalid refresh token')
+        if record.revoked_at is not None:
+            if self._in_reuse_grace(record):
+                # Another tab or a retried request rotated it moments ago
+                raw_sibling, _ = self._add(record.user_id, record.family_id)
+                db_session.commit()
+                return record.user_id, raw_sibling
+            # Reuse of a rotated token: assume it was stolen and end the login
+            self._revoke_family(record.family_id)
+            db_session.commit()
+            raise InvalidRefreshTokenError('Refresh token was already used; please log in again')
+        if record.expires_at <= datetime.utcnow():
+            db_session.rollback()
+            raise InvalidRefreshTokenError('Refresh token expired')
+
+        raw_successor, successor = self._add(record.user_id, record.family_id)
+        db_session.flush()
+        record.revoked_at = datetime.utcnow()
+        record.replaced_by_id = successor.id
+        db_session.commit()
+        return record.user_id, raw_successor
+
+    def revoke(self, raw_token):
+        """Revoke the login (token family) a refresh token belongs to; returns False if unknown"""
+        db_session = self._session()
+        record = db_session.query(RefreshTokenModel).filter_by(token_hash=hash_token(raw_token or '')).first()
+        if record is None:
+            return False
+        self._revoke_family(record.family_id)
+        db_session.commit()
+        return True
+
+    def _add(self, user_id, family_id):
+        raw_token = secrets.token_urlsafe(32)
+        record = RefreshTokenModel(
+            user_id=user_id,
+            token_hash=hash_token(raw_token),
+            family_id=family_id,
+            expires_at=datetime.utcnow() + self.lifetime
+        )
+        self._session().add(record)
+        return raw_token, record
+
+    def _in_reuse_grace(self, record):
+        """Rotated (not revoked by logout/reuse) moments ago, and its login is still live"""
+        if record.replaced_by_id is None or record.revoked_at < datetime.utcnow() - self.reuse_grace:
+            return False
+        return self._session().query(RefreshTokenModel.id).filter(
+            RefreshTokenModel.family_id == record.family_id,
+            RefreshTokenModel.revoked_at.is_(None)
+        ).first() is not None
+
+    def _revoke_family(self, family_id):
+        self._session().query(RefreshTokenModel).filter(
+            RefreshTokenModel.family_id == family_id,
+            RefreshTokenModel.revoked_at.is_(None)
+        ).update({'revoked_at': datetime.utcnow()}, synchronize_session=False)
+
+    def maybe_purge(self):
+        """Delete expired tokens at most once per purge interval per process"""
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        db_session = self._session()
+        try:
+            count = db_session.query(RefreshTokenModel).filter(
+                RefreshTokenModel.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db_session.commit()
+            if count:
+                print(f"🧹 Purged {count} expired refresh tokens")
+        except Exception as e:
+            db_session.rollback()
+            print(f"Warning: Failed to purge expired refresh tokens: {str(e)}")
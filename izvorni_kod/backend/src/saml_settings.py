@@ -0,0 +1,153 @@
+"""
+Parsed SAML settings and cached IdP metadata for AAI@EduHr
+OneLogin_Saml2_Auth accepts a ready OneLogin_Saml2_Settings object, so settings
+are validated and certificates formatted once, not on every login/callback.
+
+IdP metadata (AAI_METADATA_URL) is merged over the static IDP_* settings. It is
+refetched in the background every AAI_METADATA_REFRESH_SECONDS with
+If-None-Match/If-Modified-Since and saved to AAI_METADATA_CACHE_PATH; when the
+IdP cannot be reached the last saved copy is used (also after a restart).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+try:
+    from onelogin.saml2.settings import OneLogin_Saml2_Settings
+    from onelogin.saml2.idp_metadata_parser import OneLogin_Saml2_IdPMetadataParser
+except ImportError:
+    OneLogin_Saml2_Settings = None  # type: ignore
+    OneLogin_Saml2_IdPMetadataParser = None  # type: ignore
+
+
+class SAMLSettingsCache:
+    """Current OneLogin_Saml2_Settings, rebuilt only when the IdP metadata changes"""
+
+    def __init__(self, app, base_settings, idp_entity_id=None):
+        self.app = app
+        self.base_settings = base_settings
+        self.idp_entity_id = idp_entity_id
+        self.metadata_url = app.config.get('AAI_METADATA_URL', '')
+        self.refresh_seconds = app.config.get('AAI_METADATA_REFRESH_SECONDS', 21600)
+        self.retry_seconds = app.config.get('AAI_METADATA_RETRY_SECONDS', 300)
+        self.timeout = app.config.get('AAI_METADATA_TIMEOUT_SECONDS', 10)
+        self.cache_path = app.config.get('AAI_METADATA_CACHE_PATH') or os.path.join(
+            app.instance_path, 'aai_idp_metadata.xml'
+        )
+        self._settings = None
+        self._sp_metadata = None
+        self._metadata_hash = None
+        self._validators = {}  # ETag / Last-Modified of the saved metadata
+        self._next_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self.fetches = 0
+        self.not_modified = 0
+        self.builds = 0
+
+        if not self._load_saved_metadata():
+            self._build(base_settings)
+
+    @property
+    def refresh_enabled(self):
+        return bool(self.metadata_url) and self.refresh_seconds > 0
+
+    def settings(self):
+        """
+        Parsed settings for OneLogin_Saml2_Auth (None if they are invalid)
+
+        Schedules a background metadata refresh when due; never blocks on it.
+        """
+        if self.refresh_enabled and time.monotonic() >= self._next_refresh and self._refresh_lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh, name='aai-metadata-refresh', daemon=True).start()
+        return self._settings
+
+    def sp_metadata(self):
+        """This Service Provider's metadata XML (generated once)"""
+        if self._sp_metadata is None:
+            sp_settings = OneLogin_Saml2_Settings(self.base_settings, sp_validation_only=True)
+            self._sp_metadata = sp_settings.get_sp_metadata()
+        return self._sp_metadata
+
+    def _build(self, settings_dict):
+        try:
+            self._settings = OneLogin_Saml2_Settings(settings_dict)
+            self.builds += 1
+            return True
+        except Exception as e:
+            # Keep the previous settings (if any)
+            print(f"Warning: Invalid SAML settings: {str(e)}")
+            return False
+
+    def _apply_metadata(self, xml):
+        idp_settings = OneLogin_Saml2_IdPMetadataParser.parse(xml, entity_id=self.idp_entity_id)
+        if not idp_settings.get('idp'):
+            raise ValueError(f'no IdP descriptor for {self.idp_entity_id} in metadata')
+        merged = OneLogin_Saml2_IdPMetadataParser.merge_settings(self.base_settings, idp_settings)
+        if not self._build(merged):
+            raise ValueError('settings merged from metadata are invalid')
+        self._metadata_hash = hashlib.sha256(xml).hexdigest()
+
+    def _load_saved_metadata(self):
+        if not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, 'rb') as metadata_file:
+                self._apply_metadata(metadata_file.read())
+            if os.path.exists(self.cache_path + '.json'):
+                with open(self.cache_path + '.json') as validators_file:
+                    self._validators = json.load(validators_file)
+            return True
+        except Exception as e:
+            print(f"Warning: Ignoring saved IdP metadata {self.cache_path}: {str(e)}")
+            return False
+
+    def _save_metadata(self, xml):
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        for path, data in ((self.cache_path, xml), (self.cache_path + '.json', json.dumps(self._validators).encode('utf-8'))):
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as out:
+                out.write(data)
+            os.replace(tmp_path, path)
+
+    def _refresh(self):
+        """Conditional GET of the IdP metadata; rebuild settings only if it changed"""
+        try:
+            headers = {}
+            if self._validators.get('etag'):
+                headers['If-None-Match'] = self._validators['etag']
+            if self._validators.get('last_modified'):
+                headers['If-Modified-Since'] = self._validators['last_modified']
+            self.fetches += 1
+            response = requests.get(self.metadata_url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                self.not_modified += 1
+            else:
+                response.raise_for_status()
+                xml = response.content
+                if hashlib.sha256(xml).hexdigest() != self._metadata_hash:
+                    self._apply_metadata(xml)
+                    print(f"✅ Loaded IdP metadata from {self.metadata_url}")
+                self._validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                self._save_metadata(xml)
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        except Exception as e:
+            # Keep serving the current (saved or static) settings
+            self._next_refresh = time.monotonic() + self.retry_seconds
+            print(f"Warning: Failed to refresh IdP metadata from {self.metadata_url}: {str(e)}")
+        finally:
+            self._refresh_lock.release()
+
+    def stats(self):
+        return {
+            'metadata_loaded': self._metadata_hash is not None,
+            'fetches': self.fetches,
+            'not_modified': self.not_modified,
+            'builds': self.builds
+        }
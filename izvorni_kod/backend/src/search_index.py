@@ -0,0 +1,294 @@
+"""
+In-process inverted index for association and faculty search
+Built once at startup and kept up to date by the create/update/delete routes
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+import re
+import threading
+import time
+import unicodedata
+
+from sqlalchemy import func
+
+try:
+    from .models import AssociationModel, FacultyModel
+except ImportError:
+    from models import AssociationModel, FacultyModel  # type: ignore
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Characters that NFKD does not decompose into base letter + combining mark
+SPECIAL_FOLDS = str.maketrans({'đ': 'd', 'Đ': 'd', 'ł': 'l', 'ß': 'ss'})
+
+
+def normalize_text(text):
+    """Lowercase text and strip diacritics so 'Čakovec' matches 'cakovec'"""
+    if not text:
+        return ''
+    text = str(text).translate(SPECIAL_FOLDS).lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Split text into normalized word tokens"""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+class _KindIndex:
+    """Postings, stored documents and substring lookup table for one model type"""
+
+    def __init__(self):
+        self.documents = {}  # id -> serialized dict returned by search
+        self.filters = {}  # id -> value used for the optional equality filter
+        self.doc_terms = {}  # id -> set of words indexed for that document
+        self.postings = defaultdict(set)  # word -> set of document ids
+        # Sorted (suffix, word) pairs: every suffix of every word seen so far.
+        # A query token matches all words that have it as a substring, which
+        # keeps the old `query in field` semantics without scanning documents.
+        self.suffixes = []
+        self.vocabulary = set()
+        self.fingerprint = None
+
+    def add(self, doc_id, words, document, filter_value, bulk=False):
+        """Index a document; with bulk=True suffixes stay unsorted until finish_bulk()"""
+        self.remove(doc_id)
+        self.documents[doc_id] = document
+        self.filters[doc_id] = filter_value
+        self.doc_terms[doc_id] = words
+        for word in words:
+            self.postings[word].add(doc_id)
+            if word not in self.vocabulary:
+                self.vocabulary.add(word)
+                for i in range(len(word)):
+                    if bulk:
+                        self.suffixes.append((word[i:], word))
+                    else:
+                        insort(self.suffixes, (word[i:], word))
+
+    def finish_bulk(self):
+        """Sort suffixes once after bulk adds (insort per suffix is quadratic)"""
+        self.suffixes.sort()
+
+    def remove(self, doc_id):
+        words = self.doc_terms.pop(doc_id, None)
+        if words is None:
+            return
+        self.documents.pop(doc_id, None)
+        self.filters.pop(doc_id, None)
+        for word in words:
+            ids = self.postings.get(word)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    # Stale suffix entries are skipped at query time and
+                    # dropped on the next full rebuild
+                    del self.postings[word]
+
+    def matching_ids(self, token):
+        """Ids of documents containing a word that has `token` as a substring"""
+        ids = set()
+        i = bisect_left(self.suffixes, (token,))
+        while i < len(self.suffixes) and self.suffixes[i][0].startswith(token):
+            postings = self.postings.get(self.suffixes[i][1])
+            if postings:
+                ids |= postings
+            i += 1
+        return ids
+
+
+class SearchIndex:
+    """Inverted index over association and faculty text fields"""
+
+    ASSOCIATIONS = 'associations'
+    FACULTIES = 'faculties'
+
+    def __init__(self, app=None):
+        self.app = None
+        self.refresh_seconds = 30
+        self._lock = threading.RLock()
+        # Only one request rebuilds at a time; the others keep the current index
+        self._rebuild_lock = threading.Lock()
+        self._kinds = {
+            self.ASSOCIATIONS: _KindIndex(),
+            self.FACULTIES: _KindIndex()
+        }
+        self._built = False
+        self._last_check = 0.0
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the index on the app and build it from the database"""
+        self.app = app
+        self.refresh_seconds = app.config.get('SEARCH_INDEX_REFRESH_SECONDS', 30)
+        app.extensions['search_index'] = self
+
+        with app.app_context():
+            try:
+                self.rebuild()
+                print(f"✅ Search index built: {len(self._kinds[self.ASSOCIATIONS].documents)} associations, "
+                      f"{len(self._kinds[self.FACULTIES].documents)} faculties")
+            except Exception as e:
+                # Tables may not exist yet (production before migrations);
+                # the index is built lazily on the first search instead
+                print(f"⚠️  Search index not built at startup: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Document extraction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _association_words(association):
+        words = set()
+        words.update(tokenize(association.name))
+        words.update(tokenize(association.short_description))
+        words.update(tokenize(association.description))
+        for tag in association.tags or []:
+            words.update(tokenize(tag))
+        return words
+
+    @staticmethod
+    def _faculty_words(faculty):
+        words = set()
+        words.update(tokenize(faculty.name))
+        words.update(tokenize(faculty.abbreviation))
+        contacts = faculty.contacts if isinstance(faculty.contacts, dict) else {}
+        words.update(tokenize(contacts.get('address')))
+        return words
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    def _fingerprint(self, model):
+        """Cheap change marker: row count and latest update time"""
+        count, last_update = self._session().query(
+            func.count(model.id), func.max(model.updated_at)
+        ).one()
+        return (count, last_update)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        """Rebuild both indexes from the database (requires app context)"""
+        associations = _KindIndex()
+        for association in self._session().query(AssociationModel).all():
+            associations.add(association.id, self._association_words(association),
+                             association.to_dict(), association.faculty, bulk=True)
+        associations.finish_bulk()
+        associations.fingerprint = self._fingerprint(AssociationModel)
+
+        faculties = _KindIndex()
+        for faculty in self._session().query(FacultyModel).all():
+            faculties.add(faculty.id, self._faculty_words(faculty),
+                          faculty.to_dict(), faculty.abbreviation, bulk=True)
+        faculties.finish_bulk()
+        faculties.fingerprint = self._fingerprint(FacultyModel)
+
+        with self._lock:
+            self._kinds[self.ASSOCIATIONS] = associations
+            self._kinds[self.FACULTIES] = faculties
+            self._built = True
+            self._last_check = time.monotonic()
+
+    def _ensure_fresh(self):
+        """
+        Rebuild if another worker changed the tables since the last check.
+        Runs at most once every SEARCH_INDEX_REFRESH_SECONDS; while one request
+        rebuilds, concurrent searches are answered from the previous index.
+        """
+        if not self._built:
+            # Nothing to serve yet: wait for whoever is building
+            with self._rebuild_lock:
+                if not self._built:
+                    self.rebuild()
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self.refresh_seconds:
+            return
+        self._last_check = now
+
+        if (self._fingerprint(AssociationModel) != self._kinds[self.ASSOCIATIONS].fingerprint or
+                self._fingerprint(FacultyModel) != self._kinds[self.FACULTIES].fingerprint):
+            if not self._rebuild_lock.acquire(blocking=False):
+                return
+            try:
+                self.rebuild()
+            finally:
+                self._rebuild_lock.release()
+
+    def index_association(self, association):
+        """Add or replace an association after it has been committed"""
+        with self._lock:
+            kind = self._kinds[self.ASSOCIATIONS]
+            kind.add(association.id, self._association_words(association),
+                     association.to_dict(), association.faculty)
+            kind.fingerprint = self._fingerprint(AssociationModel)
+
+    def remove_association(self, association_id):
+        """Remove an association after it has been deleted"""
+        with self._lock:
+            kind = self._kinds[self.ASSOCIATIONS]
+            kind.remove(association_id)
+            kind.fingerprint = self._fingerprint(AssociationModel)
+
+    def index_faculty(self, faculty):
+        """Add or replace a faculty after it has been committed"""
+        with self._lock:
+            kind = self._kinds[self.FACULTIES]
+            kind.add(faculty.id, self._faculty_words(faculty),
+                     faculty.to_dict(), faculty.abbreviation)
+            kind.fingerprint = self._fingerprint(FacultyModel)
+
+    def remove_faculty(self, faculty_id):
+        """Remove a faculty after it has been deleted"""
+        with self._lock:
+            kind = self._kinds[self.FACULTIES]
+            kind.remove(faculty_id)
+            kind.fingerprint = self._fingerprint(FacultyModel)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, kind_name, query, filter_value=None):
+        """
+        Find documents matching every token of the query
+
+        Args:
+            kind_name: SearchIndex.ASSOCIATIONS or SearchIndex.FACULTIES
+            query: Free text; each token must appear (as a substring of a word)
+                   in one of the indexed fields
+            filter_value: Optional exact match on association faculty /
+                          faculty abbreviation
+
+        Returns:
+            list: Serialized documents ordered by id
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        try:
+            self._ensure_fresh()
+        except Exception as e:
+            print(f"Warning: Search index refresh failed: {str(e)}")
+
+        with self._lock:
+            kind = self._kinds[kind_name]
+            # Most selective token first keeps the intersections small
+            candidate_sets = sorted((kind.matching_ids(token) for token in set(tokens)), key=len)
+            ids = candidate_sets[0]
+            for other in candidate_sets[1:]:
+                if not ids:
+                    break
+                ids = ids & other
+
+            if filter_value is not None:
+                ids = [doc_id for doc_id in ids if kind.filters.get(doc_id) == filter_value]
+
+            return [kind.documents[doc_id] for doc_id in sorted(ids)]
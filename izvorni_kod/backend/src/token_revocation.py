@@ -0,0 +1,184 @@
+"""
+JWT revocation list
+Revoked token ids (jti) are stored in revoked_tokens. Each worker keeps a bloom
+filter of them, refreshed from the database every
+TOKEN_REVOCATION_REFRESH_SECONDS, so checking a token costs a few bit lookups;
+the database is only asked to confirm filter hits. A token revoked in another
+worker is rejected here after at most one refresh interval.
+"""
+from datetime import datetime, timedelta
+import hashlib
+import math
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+try:
+    from .models import RevokedTokenModel
+except ImportError:
+    from models import RevokedTokenModel  # type: ignore
+
+# Incremental loads re-read this much history, so a row whose revoked_at was
+# set before a concurrent load but committed after it is not missed
+LOAD_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationList:
+    """Revoked JWT ids: database store plus a per-worker bloom filter"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._filter = None
+        self._confirmed = set()  # jtis the database confirmed as revoked
+        self._watermark = None  # newest revoked_at loaded into the filter
+        self._last_refresh = 0.0
+        self._last_rebuild = 0.0
+        self._refresh_lock = threading.Lock()
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize revocation list with Flask app"""
+        self.app = app
+        app.extensions['token_revocation'] = self
+        self.capacity = app.config.get('TOKEN_REVOCATION_BLOOM_CAPACITY', 100000)
+        self.error_rate = app.config.get('TOKEN_REVOCATION_BLOOM_ERROR_RATE', 0.001)
+        self.refresh_seconds = app.config.get('TOKEN_REVOCATION_REFRESH_SECONDS', 30)
+        self.rebuild_seconds = app.config.get('TOKEN_REVOCATION_REBUILD_SECONDS', 3600)
+
+    def _session(self):
+        return self.app.extensions['sqlalchemy'].session
+
+    def revoke(self, jti, user_id, expires_at):
+        """Store a revoked token id (committed) and add it to this worker's filter"""
+        db_session = self._session()
+        if db_session.get(RevokedTokenModel, jti) is None:
+            db_session.add(RevokedTokenModel(jti, user_id, expires_at))
+            db_session.commit()
+        if self._filter is not None:
+            self._filter.add(jti)
+        self._confirmed.add(jti)
+
+    def claim(self, jti, user_id, expires_at) -> bool:
+        """Revoke a single-use token id; False if it was already used (atomic across workers)"""
+        db_session = self._session()
+        try:
+            db_session.add(RevokedTokenModel(jti, user_id, expires_at))
+            db_session.commit()
+        except IntegrityError:
+            db_session.rollback()
+            return False
+        if self._filter is not None:
+            self._filter.add(jti)
+        self._confirmed.add(jti)
+        return True
+
+    def is_revoked(self, jti) -> bool:
+        """Bloom filter check; the database only confirms filter hits"""
+        self.maybe_refresh()
+        self.checks += 1
+        if jti in self._confirmed:
+            return True
+        current = self._filter
+        if current is not None and jti not in current:
+            return False
+
+        # Filter hit, or no filter yet because the database was unreachable
+        self.filter_hits += 1
+        if self._session().get(RevokedTokenModel, jti) is not None:
+            self._confirmed.add(jti)
+            return True
+        self.false_positives += 1
+        return False
+
+    def maybe_refresh(self):
+        """Load newly revoked ids; rebuild from scratch periodically to drop expired ones"""
+        now = time.monotonic()
+        if self._filter is not None and now - self._last_refresh < self.refresh_seconds:
+            return
+        # One thread refreshes; the others keep using the current filter
+        if not self._refresh_lock.acquire(blocking=self._filter is None):
+            return
+        try:
+            if self._filter is not None and now - self._last_refresh < self.refresh_seconds:
+                return
+            if self._filter is None or now - self._last_rebuild >= self.rebuild_seconds:
+                self._rebuild()
+                self._last_rebuild = now
+            else:
+                self._load_since(self._watermark, self._filter)
+            self._last_refresh = now
+        except Exception as e:
+            self._session().rollback()
+            # Retry on the next refresh interval; filter hits still go to the database
+            self._last_refresh = now
+            print(f"Warning: Failed to refresh token revocation list: {str(e)}")
+        finally:
+            self._refresh_lock.release()
+
+    def _rebuild(self):
+        db_session = self._session()
+        now = datetime.utcnow()
+        # Expired tokens fail signature verification anyway
+        db_session.query(RevokedTokenModel).filter(
+            RevokedTokenModel.expires_at <= now
+        ).delete(synchronize_session=False)
+        db_session.commit()
+
+        live = db_session.query(RevokedTokenModel.jti).filter(RevokedTokenModel.expires_at > now).count()
+        bloom = BloomFilter(max(self.capacity, 2 * live), self.error_rate)
+        self._watermark = None
+        self._load_since(None, bloom)
+        self._filter = bloom
+        self._confirmed = set()
+
+    def _load_since(self, watermark, bloom):
+        query = self._session().query(RevokedTokenModel.jti, RevokedTokenModel.revoked_at)
+        if watermark is not None:
+            query = query.filter(RevokedTokenModel.revoked_at >= watermark - LOAD_OVERLAP)
+        for jti, revoked_at in query.yield_per(1000):
+            if jti not in bloom:
+                bloom.add(jti)
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+    def stats(self):
+        current = self._filter
+        return {
+            'filter_entries': current.count if current is not None else 0,
+            'filter_bits': current.size if current is not None else 0,
+            'hash_count': current.hash_count if current is not None else 0,
+            'checks': self.checks,
+            'filter_hits': self.filter_hits,
+            'false_positives': self.false_positives
+        }
@@ -0,0 +1,59 @@
+"""
+Shared fixtures: one application on a throwaway SQLite database
+"""
+import atexit
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = tempfile.mkdtemp(prefix='career-hub-tests-')
+atexit.register(shutil.rmtree, DB_DIR, ignore_errors=True)
+
+# Config reads the environment at import time
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DB_DIR, 'test.db')}"
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from src.app import create_app
+    app = create_app('development')
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    return app.extensions['sqlalchemy']
+
+
+_accounts = itertools.count()
+
+
+@pytest.fixture
+def register_user(client):
+    """Register a fresh account through the API; returns the response body (user, token, refreshToken)"""
+    def register(role='student', **fields):
+        n = next(_accounts)
+        body = {'email': f'user{n}@example.com', 'password': 'secret1', 'role': role}
+        if role in ('employer', 'faculty'):
+            body['username'] = f'user{n}'
+        else:
+            body.update(firstName='A', lastName='B')
+        body.update(fields)
+        response = client.post('/api/auth/register', json=body)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+    return register
@@ -0,0 +1,22 @@
+"""
+GET /api/chatbot/history: ChatStore's cursor errors are the blueprint's
+InvalidCursorError, so a malformed cursor is a 400, not a 500
+"""
+
+
+def test_malformed_history_cursor_is_rejected(client):
+    session_id = client.post('/api/chatbot/session').get_json()['session_id']
+
+    response = client.get(f'/api/chatbot/history?session_id={session_id}&cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_history_without_cursor(client):
+    session_id = client.post('/api/chatbot/session').get_json()['session_id']
+
+    response = client.get(f'/api/chatbot/history?session_id={session_id}')
+
+    assert response.status_code == 200
+    assert response.get_json()['messages'] == []
@@ -0,0 +1,252 @@
+"""
+ProviderRouter / ProviderHealth with fake providers and a fake clock: circuit
+breaker transitions, the p95 hedge trigger and failover
+"""
+import threading
+
+import pytest
+
+from src.chatbot_routing import ProviderHealth, ProviderRouter, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def health(clock, **options):
+    options.setdefault('failure_threshold', 3)
+    options.setdefault('cooldown_seconds', 30)
+    return ProviderHealth(clock=clock, **options)
+
+
+def trip(provider_health, failures=3):
+    for _ in range(failures):
+        provider_health.record(0.1, success=False)
+
+
+# Circuit breaker
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    provider = health(clock)
+
+    trip(provider, failures=2)
+    assert provider.state == CLOSED
+    trip(provider, failures=1)
+
+    assert provider.state == OPEN
+    assert provider.is_open()
+    assert not provider.allow_request()
+
+
+def test_breaker_opens_on_error_rate(clock):
+    provider = health(clock, failure_threshold=100, min_samples=4, error_rate_threshold=0.5, alpha=0.5)
+
+    for success in (True, True, False, True):
+        provider.record(0.1, success)
+    assert provider.state == CLOSED
+    provider.record(0.1, success=False)
+
+    assert provider.state == OPEN
+
+
+def test_breaker_half_opens_after_cooldown_with_one_probe(clock):
+    provider = health(clock)
+    trip(provider)
+
+    clock.advance(29.9)
+    assert not provider.allow_request()
+    clock.advance(0.1)
+
+    assert not provider.is_open()
+    assert provider.allow_request()
+    assert provider.state == HALF_OPEN
+    # Only one probe at a time
+    assert not provider.allow_request()
+
+
+def test_successful_probe_closes_the_breaker(clock):
+    provider = health(clock)
+    trip(provider)
+    clock.advance(30)
+    assert provider.allow_request()
+
+    provider.record(0.1, success=True)
+
+    assert provider.state == CLOSED
+    assert provider.consecutive_failures == 0
+    assert provider.allow_request()
+
+
+def test_failed_probe_reopens_for_a_full_cooldown(clock):
+    provider = health(clock)
+    trip(provider)
+    clock.advance(30)
+    assert provider.allow_request()
+
+    provider.record(0.1, success=False)
+
+    assert provider.state == OPEN
+    clock.advance(29)
+    assert not provider.allow_request()
+    clock.advance(1)
+    assert provider.allow_request()
+
+
+# Routing
+
+class FakeProviders:
+    """invoke(name) for ProviderRouter.call; behaviour per provider name"""
+
+    def __init__(self, **behaviours):
+        self.behaviours = behaviours
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name):
+        with self._lock:
+            self.calls.append(name)
+        behaviour = self.behaviours[name]
+        if isinstance(behaviour, Exception):
+            raise behaviour
+        if isinstance(behaviour, threading.Event):
+            behaviour.wait(5)
+            return {'success': True, 'message': f'late {name}'}
+        return behaviour
+
+
+def ok(name):
+    return {'success': True, 'message': f'from {name}'}
+
+
+@pytest.fixture
+def router(clock):
+    routers = []
+
+    def make(**options):
+        options.setdefault('failure_threshold', 3)
+        options.setdefault('cooldown_seconds', 30)
+        options.setdefault('min_samples', 5)
+        created = ProviderRouter(clock=clock, **options)
+        routers.append(created)
+        return created
+
+    yield make
+    for created in routers:
+        created._executor.shutdown(wait=True)
+
+
+def settle(provider_router):
+    """Wait for in-flight calls, so their health updates have run"""
+    provider_router._executor.shutdown(wait=True)
+
+
+def test_failover_on_error_response(router):
+    provider_router = router(hedging=False)
+    invoke = FakeProviders(a={'success': False, 'error': 'down'}, b=ok('b'))
+
+    response, name, hedged = provider_router.call(['a', 'b'], invoke)
+
+    assert (response, name, hedged) == (ok('b'), 'b', False)
+    assert invoke.calls == ['a', 'b']
+
+
+def test_failover_on_exception(router):
+    provider_router = router(hedging=False)
+    invoke = FakeProviders(a=RuntimeError('timeout'), b=ok('b'))
+
+    response, name, _ = provider_router.call(['a', 'b'], invoke)
+
+    assert (response, name) == (ok('b'), 'b')
+    settle(provider_router)
+    assert provider_router.health('a').consecutive_failures == 1
+
+
+def test_all_providers_failing_returns_the_last_error(router):
+    provider_router = router(hedging=False)
+    invoke = FakeProviders(a={'success': False, 'error': 'a down'}, b={'success': False, 'error': 'b down'})
+
+    response, name, hedged = provider_router.call(['a', 'b'], invoke)
+
+    assert (response['error'], name, hedged) == ('b down', 'b', False)
+
+
+def test_open_circuit_is_skipped_and_ordered_last(router):
+    provider_router = router(hedging=False)
+    trip(provider_router.health('a'))
+    invoke = FakeProviders(a=ok('a'), b=ok('b'))
+
+    assert provider_router.order('a', ['a', 'b']) == ['b', 'a']
+    response, name, _ = provider_router.call(['a', 'b'], invoke)
+
+    assert name == 'b'
+    assert invoke.calls == ['b']
+
+
+def test_no_allowed_provider(router):
+    provider_router = router(hedging=False)
+    trip(provider_router.health('a'))
+
+    assert provider_router.call(['a'], FakeProviders(a=ok('a'))) == (None, None, False)
+
+
+def test_hedge_delay_follows_p95(router):
+    provider_router = router(hedge_default_delay=1.0, hedge_min_delay=0.05)
+
+    assert provider_router.hedge_delay('a') == 1.0
+    for latency in (0.1, 0.1, 0.1, 0.2, 0.4):
+        provider_router.health('a').record(latency, success=True)
+    assert provider_router.hedge_delay('a') == 0.4
+    for _ in range(5):
+        provider_router.health('b').record(0.001, success=True)
+    assert provider_router.hedge_delay('b') == 0.05
+
+
+def test_slow_preferred_provider_is_hedged(router):
+    provider_router = router(hedge_min_delay=0.01)
+    for _ in range(5):
+        provider_router.health('a').record(0.01, success=True)
+    release = threading.Event()
+    invoke = FakeProviders(a=release, b=ok('b'))
+
+    try:
+        response, name, hedged = provider_router.call(['a', 'b'], invoke)
+    finally:
+        release.set()
+
+    assert (response, name, hedged) == (ok('b'), 'b', True)
+    assert invoke.calls == ['a', 'b']
+
+
+def test_fast_preferred_provider_is_not_hedged(router):
+    provider_router = router(hedge_default_delay=5.0)
+    invoke = FakeProviders(a=ok('a'), b=ok('b'))
+
+    response, name, hedged = provider_router.call(['a', 'b'], invoke)
+
+    assert (name, hedged) == ('a', False)
+    assert invoke.calls == ['a']
+
+
+def test_call_records_latency_with_the_injected_clock(router, clock):
+    provider_router = router(hedging=False)
+
+    def invoke(name):
+        clock.advance(0.25)
+        return ok(name)
+
+    provider_router.call(['a'], invoke)
+    settle(provider_router)
+
+    assert provider_router.health('a').ewma_latency == pytest.approx(0.25)
@@ -0,0 +1,87 @@
+"""
+POST /api/chatbot/stream stores the turn however the stream ends: completed,
+failed at the provider, or abandoned by the client mid-reply
+"""
+import json
+
+import pytest
+
+from src.chatbot_service import ChatbotProvider
+
+
+class ScriptedProvider(ChatbotProvider):
+    """Streams fixed chunks, optionally failing after them"""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def send_message(self, message, context=None):
+        return {'success': True, 'message': ''.join(self.chunks)}
+
+    def get_conversation_history(self, session_id):
+        return []
+
+    def stream_message(self, message, context=None):
+        yield from self.chunks
+        if self.error:
+            raise RuntimeError(self.error)
+
+
+@pytest.fixture
+def provider(app):
+    service = app.extensions['chatbot_service']
+
+    def register(chunks, error=None):
+        service.register_provider('scripted', ScriptedProvider(chunks, error))
+
+    yield register
+    service.providers.pop('scripted', None)
+
+
+def events(response):
+    """(event, data) pairs from an SSE body"""
+    parsed = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        parsed.append((fields.get('event'), json.loads(fields['data'])))
+    return parsed
+
+
+def history(client, session_id):
+    body = client.get(f'/api/chatbot/history?session_id={session_id}').get_json()
+    return [(item['role'], item['message']) for item in body['messages']]
+
+
+def test_completed_stream_stores_the_reply(client, provider):
+    provider(['Hel', 'lo'])
+
+    response = client.post('/api/chatbot/stream', json={'message': 'Hi', 'provider': 'scripted'})
+    parsed = events(response)
+
+    session_id = parsed[0][1]['session_id']
+    assert parsed[-1] == ('done', {'message': 'Hello', 'provider': 'scripted'})
+    assert history(client, session_id) == [('user', 'Hi'), ('assistant', 'Hello')]
+
+
+def test_failed_stream_stores_the_partial_reply(client, provider):
+    provider(['Hel'], error='upstream went away')
+
+    response = client.post('/api/chatbot/stream', json={'message': 'Hi', 'provider': 'scripted'})
+    parsed = events(response)
+
+    assert parsed[-1] == ('error', {'message': 'upstream went away'})
+    assert history(client, parsed[0][1]['session_id']) == [('user', 'Hi'), ('assistant', 'Hel')]
+
+
+def test_disconnected_client_still_stores_the_turn(client, provider):
+    provider(['Hel', 'lo', ' there'])
+
+    response = client.post('/api/chatbot/stream', json={'message': 'Hi', 'provider': 'scripted'}, buffered=False)
+    body = iter(response.response)
+    session_event = next(body)
+    next(body)  # first delta
+    response.close()  # client goes away: GeneratorExit at the next yield
+
+    session_id = json.loads(session_event.decode().split('data: ', 1)[1])['session_id']
+    assert history(client, session_id) == [('user', 'Hi'), ('assistant', 'Hel')]
@@ -0,0 +1,61 @@
+"""
+The employer dashboard (GET /api/jobs/applications) must load in a constant
+number of SQL statements, however many jobs and applications there are
+"""
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from src.models import UserModel, JobModel, JobApplicationModel
+
+def seed_employer(app, db, register_user, jobs, applications_per_job):
+    """Employer with `jobs` postings, each applied to by distinct students; returns a token"""
+    body = register_user('employer')
+    with app.app_context():
+        for j in range(jobs):
+            job = JobModel(f'Job {j}', 'Description', 'job', body['user']['id'], company='ACME')
+            db.session.add(job)
+            db.session.flush()
+            for _ in range(applications_per_job):
+                student = UserModel(f'student-{uuid.uuid4().hex}@example.com', first_name='A', last_name='B')
+                db.session.add(student)
+                db.session.flush()
+                db.session.add(JobApplicationModel(job.id, student.id, message='Hello'))
+        db.session.commit()
+    return body['token']
+
+
+def count_statements(app, db, call):
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return response, statements
+
+
+@pytest.mark.parametrize('jobs, applications_per_job', [(2, 2), (10, 5)])
+def test_applications_dashboard_statement_count_is_constant(app, client, db, register_user, jobs, applications_per_job):
+    token = seed_employer(app, db, register_user, jobs, applications_per_job)
+
+    response, statements = count_statements(app, db, lambda: client.get(
+        '/api/jobs/applications', headers={'Authorization': f'Bearer {token}'}
+    ))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == jobs * applications_per_job
+    assert all(item['user'] and item['job'] for item in body['items'])
+    # The token revocation list refreshes itself now and then; not the dashboard's cost
+    dashboard = [statement for statement in statements if 'revoked_tokens' not in statement]
+    # One SELECT with the job and applicant joined in, independent of the number of rows
+    assert len(dashboard) <= 2, dashboard
+    assert sum('job_applications' in statement for statement in dashboard) == 1, dashboard
@@ -0,0 +1,137 @@
+"""
+EmailService against a local SMTP server (aiosmtpd): bulk sends share one
+authenticated connection, pooled connections are recycled and a connection
+dropped while idle is replaced transparently
+"""
+import socket
+import threading
+
+import pytest
+from flask import Flask
+
+aiosmtpd = pytest.importorskip('aiosmtpd')
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+
+from src.email_service import EmailService  # noqa: E402
+
+
+class RecordingServer:
+    """Accepts every message and counts logins (one per SMTP connection)"""
+
+    def __init__(self):
+        self.messages = []
+        self.logins = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.messages.append(envelope)
+        return '250 OK'
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        with self._lock:
+            self.logins += 1
+        return AuthResult(success=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    recorder = RecordingServer()
+    controller = Controller(
+        recorder, hostname='127.0.0.1', port=free_port(),
+        authenticator=recorder.authenticate, auth_require_tls=False
+    )
+    controller.start()
+    yield controller, recorder
+    controller.stop()
+
+
+def make_service(controller, **config):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER=controller.hostname,
+        MAIL_PORT=controller.port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_USERNAME='noreply@example.com',
+        MAIL_PASSWORD='secret',
+        MAIL_DEFAULT_SENDER='noreply@example.com',
+        **config
+    )
+    service = EmailService(app)
+    assert service.initialized
+    return app, service
+
+
+def messages(count):
+    return [{'to': f'user{i}@example.com', 'subject': f'Subject {i}', 'body': 'Body'} for i in range(count)]
+
+
+def test_send_bulk_uses_one_connection(smtp_server):
+    controller, recorder = smtp_server
+    app, service = make_service(controller)
+
+    with app.app_context():
+        results = service.send_bulk(messages(20))
+
+    assert [result['success'] for result in results] == [True] * 20
+    assert len(recorder.messages) == 20
+    assert recorder.logins == 1
+
+
+def test_idle_connection_is_reused(smtp_server):
+    controller, recorder = smtp_server
+    app, service = make_service(controller)
+
+    with app.app_context():
+        for item in messages(5):
+            assert service.send_email(item['to'], item['subject'], item['body'])['success']
+
+    assert len(recorder.messages) == 5
+    assert recorder.logins == 1
+
+
+def test_connection_recycled_after_max_messages(smtp_server):
+    controller, recorder = smtp_server
+    app, service = make_service(controller, MAIL_POOL_MAX_MESSAGES_PER_CONNECTION=3)
+
+    with app.app_context():
+        for item in messages(7):
+            assert service.send_email(item['to'], item['subject'], item['body'])['success']
+
+    assert len(recorder.messages) == 7
+    # 3 + 3 + 1 messages
+    assert recorder.logins == 3
+
+
+def test_connection_recycled_after_idle_timeout(smtp_server):
+    controller, recorder = smtp_server
+    app, service = make_service(controller, MAIL_POOL_MAX_IDLE_SECONDS=0)
+
+    with app.app_context():
+        for item in messages(2):
+            assert service.send_email(item['to'], item['subject'], item['body'])['success']
+
+    assert recorder.logins == 2
+
+
+def test_connection_dropped_while_idle_is_replaced(smtp_server):
+    controller, recorder = smtp_server
+    app, service = make_service(controller)
+
+    with app.app_context():
+        assert service.send_email('a@example.com', 'First', 'Body')['success']
+        # Simulate the server closing the idle session
+        with service.pool.connection() as connection:
+            connection.host.sock.shutdown(socket.SHUT_RDWR)
+        assert service.send_email('b@example.com', 'Second', 'Body')['success']
+
+    assert [envelope.rcpt_tos for envelope in recorder.messages] == [['a@example.com'], ['b@example.com']]
+    assert recorder.logins == 2
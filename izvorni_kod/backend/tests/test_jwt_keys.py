@@ -0,0 +1,32 @@
+"""
+JWTKeyRing startup: RS256/EdDSA without a configured key only falls back to a
+temporary per-process key in debug or test runs
+"""
+import pytest
+from flask import Flask
+
+from src.jwt_keys import JWTKeyRing
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(JWT_ALGORITHM='EdDSA', **config)
+    return app
+
+
+def test_missing_key_fails_startup_in_production():
+    with pytest.raises(ValueError, match='JWT_PRIVATE_KEY_PATH'):
+        JWTKeyRing(make_app())
+
+
+@pytest.mark.parametrize('config', [{'DEBUG': True}, {'TESTING': True}])
+def test_missing_key_uses_a_temporary_key_in_debug_and_tests(config):
+    keys = JWTKeyRing(make_app(**config))
+
+    assert keys.can_sign
+
+
+def test_verify_only_node_needs_no_private_key():
+    keys = JWTKeyRing(make_app(JWT_JWKS_URL='https://auth.example.com/.well-known/jwks.json'))
+
+    assert not keys.can_sign
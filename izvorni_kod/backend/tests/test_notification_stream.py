@@ -0,0 +1,90 @@
+"""
+GET /api/notifications/stream holds its request slot for minutes, so open
+streams are capped per user (429) and per worker process (503). EventSource
+opens it with a single-use ticket, never with the access token in the URL
+"""
+import pytest
+
+def stream_ticket(client, token):
+    response = client.post('/api/notifications/stream/ticket', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    return response.get_json()['ticket']
+
+
+@pytest.fixture
+def streams(app, client):
+    broker = app.extensions['notification_stream']
+    original = broker.max_per_user, broker.max_per_worker
+    opened = []
+
+    def open_stream(token):
+        response = client.get(f'/api/notifications/stream?ticket={stream_ticket(client, token)}', buffered=False)
+        if response.status_code == 200:
+            # Start the generator so closing it unsubscribes
+            next(iter(response.response))
+            opened.append(response)
+        return response
+
+    yield broker, open_stream
+    # Suspended streams keep their request contexts pushed: close newest first
+    for response in reversed(opened):
+        response.close()
+    broker.max_per_user, broker.max_per_worker = original
+
+
+def test_streams_capped_per_user(register_user, streams):
+    broker, open_stream = streams
+    broker.max_per_user, broker.max_per_worker = 2, 100
+    token = register_user()['token']
+
+    assert [open_stream(token).status_code for _ in range(2)] == [200, 200]
+    response = open_stream(token)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(broker.retry_after)
+    # Another user is unaffected
+    assert open_stream(register_user()['token']).status_code == 200
+
+
+def test_streams_capped_per_worker(register_user, streams):
+    broker, open_stream = streams
+    broker.max_per_user, broker.max_per_worker = 5, broker.connections() + 1
+
+    assert open_stream(register_user()['token']).status_code == 200
+    response = open_stream(register_user()['token'])
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+
+def test_closing_a_stream_frees_its_slot(register_user, streams):
+    broker, open_stream = streams
+    broker.max_per_user, broker.max_per_worker = 1, 100
+    token = register_user()['token']
+
+    open_stream(token).close()
+    assert open_stream(token).status_code == 200
+
+
+def test_stream_ticket_is_single_use(client, register_user, streams):
+    broker, _ = streams
+    broker.max_per_user, broker.max_per_worker = 5, 100
+    ticket = stream_ticket(client, register_user()['token'])
+
+    first = client.get(f'/api/notifications/stream?ticket={ticket}', buffered=False)
+    assert first.status_code == 200
+    next(iter(first.response))
+    first.close()
+    assert client.get(f'/api/notifications/stream?ticket={ticket}').status_code == 401
+
+
+def test_access_token_is_not_accepted_in_the_url(client, register_user):
+    token = register_user()['token']
+
+    assert client.get(f'/api/notifications/stream?token={token}').status_code == 401
+    assert client.get(f'/api/notifications/stream?ticket={token}').status_code == 401
+
+
+def test_stream_ticket_is_not_an_access_token(client, register_user):
+    ticket = stream_ticket(client, register_user()['token'])
+
+    response = client.get('/api/notifications/unread-count', headers={'Authorization': f'Bearer {ticket}'})
+    assert response.status_code == 401
@@ -0,0 +1,54 @@
+"""
+Listing endpoints: clients that send neither cursor nor limit get the whole
+list in its original order; paginated clients follow nextCursor
+"""
+import itertools
+
+from src.models import FacultyModel
+
+_slugs = itertools.count()
+
+
+def seed_faculties(app, db, count):
+    slugs = [f'faculty-{next(_slugs)}' for _ in range(count)]
+    with app.app_context():
+        for slug in slugs:
+            db.session.add(FacultyModel(slug, slug.title(), 'faculty'))
+        db.session.commit()
+    return slugs
+
+
+def test_unpaginated_request_gets_every_row_in_insertion_order(app, client, db):
+    app.config['PAGINATION_DEFAULT_LIMIT'], original = 3, app.config['PAGINATION_DEFAULT_LIMIT']
+    try:
+        slugs = seed_faculties(app, db, 7)
+        body = client.get('/api/faculties').get_json()
+    finally:
+        app.config['PAGINATION_DEFAULT_LIMIT'] = original
+
+    returned = [item['slug'] for item in body['items']]
+    assert returned[-7:] == slugs
+    assert body['count'] == len(returned)
+    assert body['nextCursor'] is None
+
+
+def test_paginated_request_follows_next_cursor(app, client, db):
+    slugs = seed_faculties(app, db, 5)
+
+    returned, cursor = [], None
+    while True:
+        query = '/api/faculties?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(query).get_json()
+        assert len(body['items']) <= 2
+        returned += [item['slug'] for item in body['items']]
+        cursor = body['nextCursor']
+        if not cursor:
+            break
+
+    assert len(returned) == len(set(returned))
+    assert set(slugs) <= set(returned)
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/faculties?cursor=not-a-cursor')
+    assert response.status_code == 400
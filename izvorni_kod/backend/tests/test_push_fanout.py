@@ -0,0 +1,178 @@
+"""
+PushFanout against a stubbed `messaging` module: chunking to the FCM multicast
+limit, retrying only transient failures, and which dead tokens FirebaseService
+prunes in bulk
+"""
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from src.firebase_service import FirebaseService
+from src.models import FCMTokenModel
+from src.push_fanout import PushFanout
+
+
+class FirebaseError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class UnregisteredError(FirebaseError):
+    """firebase_admin maps the FCM UNREGISTERED error to NOT_FOUND"""
+
+    def __init__(self):
+        super().__init__('NOT_FOUND', 'Requested entity was not found.')
+
+
+def unavailable():
+    return FirebaseError('UNAVAILABLE', 'The service is currently unavailable.')
+
+
+def invalid_token():
+    return FirebaseError('INVALID_ARGUMENT', 'The registration token is not a valid FCM registration token')
+
+
+def invalid_payload():
+    return FirebaseError('INVALID_ARGUMENT', 'Invalid value at message.data')
+
+
+class SendResponse:
+    def __init__(self, exception=None):
+        self.exception = exception
+        self.success = exception is None
+        self.message_id = None if exception else 'projects/p/messages/1'
+
+
+class BatchResponse:
+    def __init__(self, responses):
+        self.responses = responses
+
+
+class StubMessaging:
+    """
+    Just enough of firebase_admin.messaging. `outcomes` maps a token to the
+    exceptions it fails with on successive attempts; afterwards it succeeds
+    """
+    UnregisteredError = UnregisteredError
+
+    def __init__(self, outcomes=None):
+        self.outcomes = {token: list(failures) for token, failures in (outcomes or {}).items()}
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def Notification(self, title, body):
+        return {'title': title, 'body': body}
+
+    def MulticastMessage(self, notification, data, tokens):
+        return {'notification': notification, 'data': data, 'tokens': tokens}
+
+    def send_each_for_multicast(self, message):
+        responses = []
+        with self._lock:
+            self.batches.append(list(message['tokens']))
+            for token in message['tokens']:
+                failures = self.outcomes.get(token)
+                responses.append(SendResponse(failures.pop(0) if failures else None))
+        return BatchResponse(responses)
+
+
+def fanout(messaging, **options):
+    return PushFanout(messaging, sleep=lambda seconds: None, **options)
+
+
+def test_tokens_are_sent_in_chunks_of_at_most_500():
+    messaging = StubMessaging()
+    tokens = [f'token-{i}' for i in range(1201)]
+
+    result = fanout(messaging, chunk_size=1000).send(tokens + tokens[:10], 'Title', 'Body')
+
+    assert sorted(len(batch) for batch in messaging.batches) == [201, 500, 500]
+    assert sorted(token for batch in messaging.batches for token in batch) == sorted(tokens)
+    assert (result['chunks'], result['success_count'], result['failure_count']) == (3, 1201, 0)
+
+
+def test_only_transient_failures_are_retried():
+    messaging = StubMessaging({
+        'flaky': [unavailable()],
+        'dead': [UnregisteredError()],
+        'down': [unavailable()] * 10,
+    })
+
+    result = fanout(messaging, max_retries=2).send(['ok', 'flaky', 'dead', 'down'], 'Title', 'Body')
+
+    assert messaging.batches == [['ok', 'flaky', 'dead', 'down'], ['flaky', 'down'], ['down']]
+    assert [response['success'] for response in result['responses']] == [True, True, False, False]
+    assert result['invalid_tokens'] == ['dead']
+    assert result['transient_failures'] == 1
+
+
+@pytest.fixture
+def firebase(app):
+    """FirebaseService whose fan-out talks to a StubMessaging instead of FCM"""
+    def make(messaging):
+        service = FirebaseService()
+        service.app = app
+        service.initialized = True
+        service.prune_invalid_tokens = True
+        service.fanout = fanout(messaging)
+        return service
+    return make
+
+
+def save_tokens(app, db, user_id, tokens):
+    with app.app_context():
+        db.session.add_all(FCMTokenModel(user_id, token) for token in tokens)
+        db.session.commit()
+
+
+def stored_tokens(app, user_id):
+    with app.app_context():
+        return {row.fcm_token for row in FCMTokenModel.query.filter_by(user_id=user_id)}
+
+
+def test_unregistered_and_invalid_tokens_are_pruned_in_bulk(app, db, register_user, firebase):
+    user_id = register_user()['user']['id']
+    unregistered = [f'unregistered-{i}' for i in range(400)]
+    invalid = [f'invalid-{i}' for i in range(200)]
+    save_tokens(app, db, user_id, unregistered + invalid + ['live'])
+    outcomes = {token: [UnregisteredError()] for token in unregistered}
+    outcomes.update((token, [invalid_token()]) for token in invalid)
+    service = firebase(StubMessaging(outcomes))
+
+    with app.app_context():
+        engine = db.engine
+    deletes = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('DELETE'):
+            deletes.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        with app.app_context():
+            result = service.send_multicast_notification(unregistered + invalid + ['live'], 'Title', 'Body')
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert result['success'] and result['success_count'] == 1
+    assert result['pruned'] == 600
+    # One DELETE per 500 tokens, not one per token
+    assert len(deletes) == 2
+    assert stored_tokens(app, user_id) == {'live'}
+
+
+def test_payload_wide_invalid_argument_prunes_nothing(app, db, register_user, firebase):
+    user_id = register_user()['user']['id']
+    tokens = ['device-a', 'device-b', 'device-c']
+    save_tokens(app, db, user_id, tokens)
+    service = firebase(StubMessaging({token: [invalid_payload()] for token in tokens}))
+
+    with app.app_context():
+        result = service.send_multicast_notification(tokens, 'Title', 'Body', data={'bad': 'payload'})
+
+    assert result['failure_count'] == 3
+    assert result['invalid_tokens'] == []
+    assert result['pruned'] == 0
+    assert stored_tokens(app, user_id) == set(tokens)
@@ -0,0 +1,41 @@
+"""
+Login rate limits: the per-email limit counts only failed logins, so logging
+in successfully (or as somebody else) cannot lock an address out
+"""
+import pytest
+
+
+@pytest.fixture
+def login_limits(app):
+    limiter = app.extensions['rate_limiter']
+    original = limiter.enabled, dict(app.config)
+    limiter.enabled = True
+    app.config.update(RATE_LIMIT_LOGIN_PER_EMAIL='3/900', RATE_LIMIT_LOGIN_PER_IP='100/60')
+    yield
+    limiter.enabled = original[0]
+    app.config.clear()
+    app.config.update(original[1])
+
+
+def login(client, email, password):
+    return client.post('/api/auth/login', json={'email': email, 'password': password})
+
+
+def test_successful_logins_do_not_count(client, register_user, login_limits):
+    email = register_user()['user']['email']
+
+    for _ in range(6):
+        assert login(client, email, 'secret1').status_code == 200
+
+
+def test_failed_logins_lock_the_email(client, register_user, login_limits):
+    email = register_user()['user']['email']
+
+    for _ in range(3):
+        assert login(client, email, 'wrong').status_code == 401
+
+    response = login(client, email, 'secret1')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    # Other addresses from the same client are unaffected
+    assert login(client, register_user()['user']['email'], 'secret1').status_code == 200
@@ -0,0 +1,62 @@
+"""
+Refresh token rotation: a token presented again right after its rotation (two
+tabs, a retried request) gets another successor; later reuse ends the login
+"""
+from datetime import timedelta
+
+import pytest
+
+def refresh(client, refresh_token):
+    response = client.post('/api/auth/refresh', json={'refreshToken': refresh_token})
+    return response.status_code, (response.get_json() or {}).get('refreshToken')
+
+
+@pytest.fixture
+def reuse_grace(app):
+    service = app.extensions['refresh_tokens']
+    original = service.reuse_grace
+
+    def set_grace(seconds):
+        service.reuse_grace = timedelta(seconds=seconds)
+
+    yield set_grace
+    service.reuse_grace = original
+
+
+def test_reuse_within_grace_gets_a_live_successor(client, register_user, reuse_grace):
+    reuse_grace(60)
+    token = register_user()['refreshToken']
+
+    first_status, first = refresh(client, token)
+    second_status, second = refresh(client, token)
+
+    assert (first_status, second_status) == (200, 200)
+    assert first != second
+    assert refresh(client, first)[0] == 200
+    assert refresh(client, second)[0] == 200
+
+
+def test_reuse_after_grace_revokes_the_family(client, register_user, reuse_grace):
+    reuse_grace(0)
+    token = register_user()['refreshToken']
+
+    status, successor = refresh(client, token)
+    assert status == 200
+
+    assert refresh(client, token)[0] == 401
+    # The whole login is gone, including the successor
+    assert refresh(client, successor)[0] == 401
+
+
+def test_reuse_after_logout_is_rejected(client, register_user, reuse_grace):
+    reuse_grace(60)
+    body = register_user()
+    token = body['refreshToken']
+
+    status, successor = refresh(client, token)
+    assert status == 200
+    response = client.post('/api/auth/logout', json={'refreshToken': successor},
+                           headers={'Authorization': f"Bearer {body['token']}"})
+    assert response.status_code == 200
+
+    assert refresh(client, token)[0] == 401
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Outbox worker: delivers emails and push notifications queued by the API
+
+Usage:
+    python worker.py          # poll forever (OUTBOX_POLL_INTERVAL_SECONDS)
+    python worker.py --once   # drain everything that is due, then exit
+"""
+import sys
+import os
+import signal
+import time
+
+# Add src directory to Python path
+src_path = os.path.join(os.path.dirname(__file__), 'src')
+sys.path.insert(0, src_path)
+
+from src.app import create_app
+
+running = True
+
+
+def stop(signum, frame):
+    """Finish the current batch, then exit"""
+    global running
+    running = False
+
+
+def main():
+    app = create_app()
+    outbox = app.extensions['outbox']
+    poll_interval = app.config.get('OUTBOX_POLL_INTERVAL_SECONDS', 2)
+
+    with app.app_context():
+        if '--once' in sys.argv:
+            totals = outbox.drain()
+            print(f"✅ Outbox drained: {totals['sent']} sent, {totals['retried']} retried, {totals['failed']} failed")
+            return
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        print(f"🚀 Outbox worker started (batch size {outbox.batch_size}, poll every {poll_interval}s)")
+
+        while running:
+            try:
+                result = outbox.process_batch()
+            except Exception as e:
+                app.extensions['sqlalchemy'].session.rollback()
+                print(f"❌ Outbox worker error: {str(e)}")
+                result = {'claimed': 0}
+            finally:
+                # Release the connection between polls
+                app.extensions['sqlalchemy'].session.remove()
+
+            if result['claimed']:
+                print(f"📬 Outbox batch: {result['sent']} sent, {result['retried']} retried, {result['failed']} failed")
+            else:
+                time.sleep(poll_interval)
+
+        print("👋 Outbox worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import { useEffect, useState } from 'react';
 import { Link, useLocation, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
+import { apiService } from '../services/api';
 import '../css/Header.css';
 import logoImage from '../assets/tamnoplavi.png';
 
@@ -7,6 +9,23 @@ const Header = () => {
    const location = useLocation();
    const navigate = useNavigate();
    const { user, isAuthenticated, logout } = useAuth();
+   const [unread, setUnread] = useState(0);
+
+   // Live unread badge: the stream reports the count on connect and pushes new notifications
+   useEffect(() => {
+      if (!isAuthenticated) {
+         setUnread(0);
+         return;
+      }
+      return apiService.subscribeToNotifications({
+         onUnreadCount: setUnread,
+         onNotification: (notification) => {
+            if (!notification.read) {
+               setUnread((count) => count + 1);
+            }
+         },
+      });
+   }, [isAuthenticated]);
 
    const isActive = (path: string) => {
       if (path === '/' && location.pathname === '/') return 'active';
@@ -50,6 +69,11 @@ const Header = () => {
                      <span className="user-greeting">
                         Zdravo, {user?.firstName}!
                      </span>
+                     {unread > 0 && (
+                        <span className="notification-badge" title="Nepročitane obavijesti">
+                           {unread > 99 ? '99+' : unread}
+                        </span>
+                     )}
                      <button onClick={handleLogout} className="btn-secondary">
                         Odjava
                      </button>
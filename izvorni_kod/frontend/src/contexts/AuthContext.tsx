@@ -44,6 +44,7 @@ export const AuthProvider = ({ children }: AuthProviderProps) => {
             } catch (error) {
                // Token is invalid, clear storage
                localStorage.removeItem('token');
+               localStorage.removeItem('refreshToken');
                localStorage.removeItem('user');
                setUser(null);
             }
@@ -60,6 +61,9 @@ export const AuthProvider = ({ children }: AuthProviderProps) => {
 
          if (response.success && response.token && response.user) {
             localStorage.setItem('token', response.token);
+            if (response.refreshToken) {
+               localStorage.setItem('refreshToken', response.refreshToken);
+            }
             localStorage.setItem('user', JSON.stringify(response.user));
             setUser(response.user);
          } else {
@@ -76,6 +80,9 @@ export const AuthProvider = ({ children }: AuthProviderProps) => {
 
          if (response.success && response.token && response.user) {
             localStorage.setItem('token', response.token);
+            if (response.refreshToken) {
+               localStorage.setItem('refreshToken', response.refreshToken);
+            }
             localStorage.setItem('user', JSON.stringify(response.user));
             setUser(response.user);
          } else {
@@ -93,6 +100,7 @@ export const AuthProvider = ({ children }: AuthProviderProps) => {
       } catch (error) {
          // Even if logout fails, clear local state
          localStorage.removeItem('token');
+         localStorage.removeItem('refreshToken');
          localStorage.removeItem('user');
          setUser(null);
       }
@@ -106,6 +114,7 @@ export const AuthProvider = ({ children }: AuthProviderProps) => {
       } catch (error) {
          // If refresh fails, user might be logged out
          localStorage.removeItem('token');
+         localStorage.removeItem('refreshToken');
          localStorage.removeItem('user');
          setUser(null);
          throw error;
@@ -1,6 +1,6 @@
 import { useState, useEffect, useMemo } from 'react';
 import type { FormEvent } from 'react';
-import { useNavigate, Link, useSearchParams } from 'react-router-dom';
+import { useNavigate, Link, useSearchParams, useLocation } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import Header from '../components/Header';
 import Footer from '../components/Footer';
@@ -11,6 +11,7 @@ import '../css/Hero.css';
 const LoginPage = () => {
   const navigate = useNavigate();
   const [searchParams] = useSearchParams();
+  const location = useLocation();
   const { login, refreshUser } = useAuth();
   const [formData, setFormData] = useState<LoginCredentials>({
     email: '',
@@ -35,9 +36,11 @@ const LoginPage = () => {
   const showGoogleLogin = true; // Allow Google login for all roles
   const showAAILogin = selectedRole === 'faculty' || selectedRole === 'fakultet'; // Show AAI option for faculty, but email/password is also allowed
 
-  // Handle OAuth callback if token is in URL
+  // Handle OAuth callback: tokens arrive in the URL fragment, which the browser
+  // never sends to a server or in a Referer header
   useEffect(() => {
-    const token = searchParams.get('token');
+    const callbackParams = new URLSearchParams(location.hash.slice(1));
+    const token = callbackParams.get('token');
     const oauthError = searchParams.get('error');
 
     if (oauthError) {
@@ -50,12 +53,16 @@ const LoginPage = () => {
 
     if (token) {
       // Token received from OAuth callback
-      const userStr = searchParams.get('user');
+      const userStr = callbackParams.get('user');
       if (userStr) {
         try {
           const decodedUserStr = decodeURIComponent(userStr);
           const user = JSON.parse(decodedUserStr);
           localStorage.setItem('token', token);
+          const refreshToken = callbackParams.get('refresh_token');
+          if (refreshToken) {
+            localStorage.setItem('refreshToken', refreshToken);
+          }
           localStorage.setItem('user', JSON.stringify(user));
           // Refresh user in context and wait for it to complete
           refreshUser().then(() => {
@@ -76,7 +83,7 @@ const LoginPage = () => {
         }
       }
     }
-  }, [searchParams, navigate, refreshUser]);
+  }, [searchParams, location.hash, navigate, refreshUser]);
 
   const handleSubmit = async (e: FormEvent) => {
     e.preventDefault();
@@ -35,6 +35,8 @@ export interface AuthResponse {
   message?: string;
   user?: User;
   token?: string;
+  refreshToken?: string;
+  expiresIn?: number;
   requires_aai?: boolean;
   aai_login_url?: string;
 }
@@ -57,6 +59,8 @@ export interface ListResponse<T> {
   success: boolean;
   count: number;
   items: T[];
+  // Set when the request passed `limit`/`cursor` and more items follow
+  nextCursor?: string | null;
 }
 
 export interface ItemResponse<T> {
@@ -90,14 +94,51 @@ export interface Faculty {
 
 class ApiService {
   private baseURL: string;
+  private refreshPromise: Promise<boolean> | null = null;
 
   constructor() {
     this.baseURL = API_URL;
   }
 
+  // Trade the stored refresh token for a new access/refresh pair.
+  // Concurrent 401s share one refresh call, since each refresh token is single-use.
+  private refreshTokens(): Promise<boolean> {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) {
+      return Promise.resolve(false);
+    }
+    if (!this.refreshPromise) {
+      this.refreshPromise = fetch(`${this.baseURL}/api/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refreshToken }),
+      })
+        .then(async (response) => {
+          const data = await response.json().catch(() => null);
+          if (!response.ok || !data?.token || !data?.refreshToken) {
+            // Another tab may have rotated the shared token meanwhile: use its pair
+            if (localStorage.getItem('refreshToken') !== refreshToken) {
+              return true;
+            }
+            localStorage.removeItem('refreshToken');
+            return false;
+          }
+          localStorage.setItem('token', data.token);
+          localStorage.setItem('refreshToken', data.refreshToken);
+          return true;
+        })
+        .catch(() => false)
+        .finally(() => {
+          this.refreshPromise = null;
+        });
+    }
+    return this.refreshPromise;
+  }
+
   private async request<T>(
     endpoint: string,
-    options: RequestInit = {}
+    options: RequestInit = {},
+    retried = false
   ): Promise<T> {
     const url = `${this.baseURL}${endpoint}`;
 
@@ -118,6 +159,11 @@ class ApiService {
     try {
       const response = await fetch(url, config);
 
+      // Access tokens are short-lived: refresh once and retry
+      if (response.status === 401 && token && !retried && await this.refreshTokens()) {
+        return this.request<T>(endpoint, options, true);
+      }
+
       // Handle non-JSON responses
       const contentType = response.headers.get('content-type');
       let data;
@@ -186,8 +232,22 @@ class ApiService {
   }
 
   async logout(): Promise<void> {
-    localStorage.removeItem('token');
-    localStorage.removeItem('user');
+    // Revoke the tokens server-side; local state is cleared either way
+    const refreshToken = localStorage.getItem('refreshToken');
+    try {
+      if (localStorage.getItem('token')) {
+        await this.request('/api/auth/logout', {
+          method: 'POST',
+          body: JSON.stringify({ refreshToken }),
+        });
+      }
+    } catch {
+      // Token already invalid or network error
+    } finally {
+      localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
+      localStorage.removeItem('user');
+    }
   }
 
   async initiateGoogleLogin(): Promise<void> {
@@ -509,6 +569,79 @@ class ApiService {
       body: JSON.stringify({ replyMessage }),
     });
   }
+
+  async getUnreadNotificationCount(): Promise<{ success: boolean; unread: number }> {
+    return this.request<{ success: boolean; unread: number }>('/api/notifications/unread-count');
+  }
+
+  // Push new notifications over Server-Sent Events; returns a function that closes the stream.
+  // EventSource cannot send the Authorization header, so every (re)connect opens the stream with
+  // a fresh single-use ticket. While the server refuses streams (429/503) or the connection is
+  // down, the unread count is polled on each reconnect attempt instead.
+  subscribeToNotifications(handlers: NotificationStreamHandlers): () => void {
+    let source: EventSource | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+    let lastEventId = '';
+    let delay = 1000;
+
+    const reconnect = () => {
+      if (closed) {
+        return;
+      }
+      timer = setTimeout(connect, delay);
+      delay = Math.min(delay * 2, 60000);
+    };
+
+    const connect = async () => {
+      let ticket: string;
+      try {
+        ({ ticket } = await this.request<{ success: boolean; ticket: string }>('/api/notifications/stream/ticket', {
+          method: 'POST',
+        }));
+      } catch {
+        reconnect();
+        return;
+      }
+      if (closed) {
+        return;
+      }
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) {
+        params.set('lastEventId', lastEventId);
+      }
+      const stream = new EventSource(`${this.baseURL}/api/notifications/stream?${params}`);
+      source = stream;
+      stream.addEventListener('ready', (event) => {
+        delay = 1000;
+        handlers.onUnreadCount?.(JSON.parse((event as MessageEvent).data).unread);
+      });
+      stream.addEventListener('notification', (event) => {
+        const message = event as MessageEvent;
+        lastEventId = message.lastEventId || lastEventId;
+        handlers.onNotification?.(JSON.parse(message.data));
+      });
+      // The server ended the stream, refused it or the network dropped. EventSource would retry
+      // with the used-up ticket, so close it and reconnect with a new one.
+      stream.onerror = () => {
+        stream.close();
+        source = null;
+        this.getUnreadNotificationCount()
+          .then((data) => handlers.onUnreadCount?.(data.unread))
+          .catch(() => {});
+        reconnect();
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (timer) {
+        clearTimeout(timer);
+      }
+      source?.close();
+    };
+  }
 }
 
 export interface Job {
@@ -573,6 +706,22 @@ export interface FavoriteFaculty {
   createdAt?: string;
 }
 
+export interface AppNotification {
+  id: number;
+  user_id: number;
+  title: string;
+  body: string;
+  type?: string | null;
+  data?: Record<string, unknown> | null;
+  read: boolean;
+  created_at?: string | null;
+}
+
+export interface NotificationStreamHandlers {
+  onNotification?: (notification: AppNotification) => void;
+  onUnreadCount?: (unread: number) => void;
+}
+
 export interface ChatMessage {
   role: 'user' | 'assistant';
   message: string;